@@ -5,18 +5,18 @@ from core.utils.rankings import *
 
 for season, season_display in settings.SEASONS:
     redo_rankings(
-        TOTY.objects.filter(season=settings.CURRENT_SEASON).all(),
+        TOTY.objects.filter(season=season).all(),
         season=season,
         cache_type="toty",
     )
-    # redo_rankings(NOTY.objects.filter(season=settings.CURRENT_SEASON).all(), season=season, cache_type='noty')
+    # redo_rankings(NOTY.objects.filter(season=season).all(), season=season, cache_type='noty')
     redo_rankings(
-        COTY.objects.filter(season=settings.CURRENT_SEASON).all(),
+        COTY.objects.filter(season=season).all(),
         season=season,
         cache_type="coty",
     )
     redo_rankings(
-        SOTY.objects.filter(season=settings.CURRENT_SEASON).all(),
+        SOTY.objects.filter(season=season).all(),
         season=season,
         cache_type="soty",
     )
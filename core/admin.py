@@ -18,6 +18,7 @@ from core.models import (
     QUAL,
     QualPoints,
     QualBar,
+    RankingJob,
     Reaff,
     Round,
     RoundStats,
@@ -47,10 +48,50 @@ from core.resources import (
     TeamResultResource,
     TournamentResource,
 )
+from core.utils.standings import DirtySet
 
 # Register your models here.
 
 
+class ReaffRecomputeMixin:
+    """
+    Recomputes the standings a reaff touches whenever it is edited.
+    dirty_method names the DirtySet method that marks a reaff's owners.
+    """
+
+    dirty_method = None
+
+    def recompute(self, *reaffs):
+        dirty_sets = {}
+
+        for reaff in reaffs:
+            if reaff.season not in dirty_sets:
+                dirty_sets[reaff.season] = DirtySet(reaff.season)
+            getattr(dirty_sets[reaff.season], self.dirty_method)(reaff)
+
+        for dirty in dirty_sets.values():
+            dirty.recompute()
+
+    def save_model(self, request, obj, form, change):
+        previous = type(obj).objects.filter(pk=obj.pk).first() if change else None
+
+        super().save_model(request, obj, form, change)
+
+        self.recompute(*[reaff for reaff in (previous, obj) if reaff])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+
+        self.recompute(obj)
+
+    def delete_queryset(self, request, queryset):
+        reaffs = list(queryset)
+
+        super().delete_queryset(request, queryset)
+
+        self.recompute(*reaffs)
+
+
 @admin.register(School)
 class SchoolAdmin(ImportExportModelAdmin):
     resource_class = SchoolResource
@@ -60,6 +101,14 @@ class SchoolAdmin(ImportExportModelAdmin):
     ordering = ["name"]
 
 
+@admin.register(SchoolLookup)
+class SchoolLookupAdmin(admin.ModelAdmin):
+    list_display = ("server_name", "school")
+    search_fields = ("server_name", "school__name")
+    autocomplete_fields = ("school",)
+    ordering = ("server_name",)
+
+
 @admin.register(Debater)
 class DebaterAdmin(ImportExportModelAdmin):
     resource_class = DebaterResource
@@ -78,9 +127,10 @@ class DebaterAdmin(ImportExportModelAdmin):
 
 
 @admin.register(Reaff)
-class ReaffAdmin(ImportExportModelAdmin):
+class ReaffAdmin(ReaffRecomputeMixin, ImportExportModelAdmin):
     resource_class = ReaffResource
     form = ReaffForm
+    dirty_method = "add_reaff"
 
 
 @admin.register(Tournament)
@@ -241,9 +291,10 @@ class TOTYAdmin(admin.ModelAdmin):
 
 
 @admin.register(TOTYReaff)
-class TOTYReaffAdmin(admin.ModelAdmin):
+class TOTYReaffAdmin(ReaffRecomputeMixin, admin.ModelAdmin):
     form = TOTYReaffForm
     autocomplete_fields = ["old_team", "new_team"]
+    dirty_method = "add_toty_reaff"
     list_display = (
         "season",
         "old_team_name",
@@ -350,6 +401,27 @@ class QualBarAdmin(admin.ModelAdmin):
     list_display = ("season", "points")
     search_fields = ("season",)
 
+@admin.register(RankingJob)
+class RankingJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "season",
+        "tournament",
+        "status",
+        "attempts",
+        "progress",
+        "worker",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("status", "season")
+    readonly_fields = (
+        "created_at",
+        "started_at",
+        "heartbeat_at",
+        "finished_at",
+        "error",
+    )
+
 @admin.register(Video)
 class VideoAdmin(admin.ModelAdmin):
     list_display = ("tournament", "round", "pm", "lo", "mg", "mo", "permissions")
@@ -383,5 +455,3 @@ class VideoAdmin(admin.ModelAdmin):
 
 admin.site.register(Round)
 admin.site.register(RoundStats)
-
-admin.site.register(SchoolLookup)
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = "core"
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel,unused-import
+        from core import signals
@@ -16,6 +16,7 @@ from core.models.standings.coty import COTY
 from core.models.standings.noty import NOTY
 from core.models.standings.qual import QUAL
 from core.models.standings.soty import SOTY
+from core.models.team import team_pair_key
 from core.models.tournament import Tournament
 from core.models.video import Video
 
@@ -127,6 +128,13 @@ class TeamForm(forms.ModelForm):
         if not len(cleaned_data.get("debaters")) == 2:
             raise forms.ValidationError("All teams must have 2 debaters")
 
+        if (
+            Team.objects.filter(pair_key=team_pair_key(cleaned_data["debaters"]))
+            .exclude(pk=self.instance.pk)
+            .exists()
+        ):
+            raise forms.ValidationError("A team with these debaters already exists")
+
 
 class TournamentDetailForm(forms.Form):
     num_teams = forms.IntegerField(label="Number of teams")
@@ -0,0 +1,203 @@
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from core.models.tournament import Tournament
+from core.utils.import_management import (
+    auto_debater_actions,
+    auto_school_actions,
+    create_entities,
+    get_dict,
+    get_num_novice_debaters,
+    get_num_teams,
+    import_results,
+)
+from core.utils.reconcile import SchoolResolver
+from core.utils.results import set_tournament_size
+from core.utils.standings import DirtySet
+
+
+def close_connections():
+    # Forked workers must not share the parent's database sockets; each
+    # opens its own connection on first use
+    connections.close_all()
+
+
+def run_import(task):
+    tournament_id, response, debater_actions, team_actions = task
+    started = time.monotonic()
+
+    with transaction.atomic():
+        tournament = Tournament.objects.select_for_update().get(id=tournament_id)
+        dirty = DirtySet(tournament.season)
+
+        # Saving reindexes the tournament, so an unchanged re-import skips it
+        if set_tournament_size(
+            tournament,
+            get_num_teams(response["teams"], int(response["num_rounds"])),
+            get_num_novice_debaters(response["teams"], int(response["num_rounds"])),
+            dirty,
+        ):
+            tournament.save()
+
+        import_results(debater_actions, team_actions, tournament, response, dirty)
+
+    return {
+        "tournament": tournament_id,
+        "season": dirty.season,
+        "teams": dirty.teams,
+        "debaters": dirty.debaters,
+        "rounds": len(response["rounds"]),
+        "seconds": time.monotonic() - started,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports tab-server JSON exports into existing tournaments, then "
+        "recomputes the standings they touched once"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="+",
+            help=(
+                "JSON files, or directories of them, named <tournament id>.json "
+                'unless the payload has a "tournament" id'
+            ),
+        )
+        parser.add_argument(
+            "--auto-link",
+            action="store_true",
+            help=(
+                "Accept the best fuzzy school and debater matches and create "
+                "the rest; otherwise files with names that don't match exactly "
+                "are skipped"
+            ),
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of worker processes importing results",
+        )
+        parser.add_argument(
+            "--no-recompute",
+            action="store_true",
+            help="Skip the standings recompute at the end",
+        )
+
+    def get_files(self, paths):
+        files = []
+
+        for path in map(Path, paths):
+            if path.is_dir():
+                files += sorted(path.glob("*.json"))
+            elif path.is_file():
+                files += [path]
+            else:
+                raise CommandError(f"No such file or directory: {path}")
+
+        return files
+
+    def load(self, path):
+        response = get_dict(path.read_text(encoding="utf-8"))
+
+        try:
+            tournament_id = int(response.get("tournament") or path.stem)
+        except ValueError as e:
+            raise CommandError(
+                f"{path}: name the file <tournament id>.json or set "
+                '"tournament" in the payload'
+            ) from e
+
+        if not Tournament.objects.filter(id=tournament_id).exists():
+            raise CommandError(f"{path}: tournament {tournament_id} does not exist")
+
+        return tournament_id, response
+
+    def reconcile(self, path, response, auto_link):
+        """
+        Creates or links the payload's schools, debaters and teams. This runs
+        one file at a time so imports never race to create the same records.
+        Returns None when names are left unresolved without auto_link.
+        """
+        with transaction.atomic():
+            school_actions, schools = auto_school_actions(
+                response["schools"], SchoolResolver(), auto_link
+            )
+            debater_actions, debaters = auto_debater_actions(
+                response["teams"], school_actions, auto_link
+            )
+
+            if not auto_link and (schools or debaters):
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Skipping {path}: {len(schools)} schools and "
+                        f"{len(debaters)} debaters don't match exactly"
+                    )
+                )
+                for name in schools:
+                    self.stdout.write(f"  school: {name}")
+                for name in debaters:
+                    self.stdout.write(f"  debater: {name}")
+                return None
+
+            return create_entities(school_actions, debater_actions, response["teams"])
+
+    def handle(self, *args, **options):
+        files = self.get_files(options["paths"])
+        started = time.monotonic()
+
+        # Every file is checked before anything is written
+        loaded = [(path, *self.load(path)) for path in files]
+
+        tasks = []
+        for path, tournament_id, response in loaded:
+            actions = self.reconcile(path, response, options["auto_link"])
+            if actions is not None:
+                tasks += [(tournament_id, response, *actions)]
+
+        dirty_sets = {}
+        total = len(tasks)
+
+        if options["jobs"] > 1:
+            close_connections()
+            with Pool(options["jobs"], initializer=close_connections) as pool:
+                summaries = pool.imap_unordered(run_import, tasks)
+                for done, summary in enumerate(summaries, 1):
+                    self.report(done, total, summary, dirty_sets)
+        else:
+            for done, task in enumerate(tasks, 1):
+                self.report(done, total, run_import(task), dirty_sets)
+
+        if not options["no_recompute"]:
+            for season, dirty in sorted(dirty_sets.items()):
+                if not dirty:
+                    continue
+
+                dirty.recompute(progress=self.stdout.write)
+                self.stdout.write(f"Recomputed {season} standings")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {total} of {len(files)} tournaments "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+        )
+
+    def report(self, done, total, summary, dirty_sets):
+        season = summary["season"]
+        if season not in dirty_sets:
+            dirty_sets[season] = DirtySet(season)
+        dirty_sets[season].add_teams(summary["teams"])
+        dirty_sets[season].add_debaters(summary["debaters"])
+
+        self.stdout.write(
+            f"[{done}/{total}] Tournament {summary['tournament']}: "
+            f"{summary['rounds']} rounds in {summary['seconds']:.1f}s"
+        )
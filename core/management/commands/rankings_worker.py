@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.utils.jobs import run_pending_jobs, worker_name
+
+
+class Command(BaseCommand):
+    help = "Processes queued standings recomputes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue once and exit instead of polling",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait between polls of an empty queue",
+        )
+
+    def handle(self, *args, **options):
+        worker = worker_name()
+
+        while True:
+            processed = run_pending_jobs(worker)
+
+            if processed:
+                self.stdout.write(f"Processed {processed} ranking jobs")
+
+            if options["once"]:
+                break
+
+            time.sleep(options["interval"])
@@ -0,0 +1,148 @@
+import time
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.utils.standings.batch import STANDING_TYPES, recompute_season
+from core.utils.standings.common import normalize_season
+from core.utils.standings.diff import TYPE_STANDINGS, diff_counts, diff_season
+
+
+def close_connections():
+    # Forked workers must not share the parent's database sockets; each
+    # opens its own connection on first use
+    connections.close_all()
+
+
+def run_task(task):
+    season, types = task
+    return recompute_season(season, types)
+
+
+def run_diff(task):
+    season, types = task
+    standings = [
+        name for standing_type in types for name in TYPE_STANDINGS[standing_type]
+    ]
+    return season, diff_season(season, standings)
+
+
+class Command(BaseCommand):
+    help = "Recomputes and re-ranks standings for one or more seasons"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seasons",
+            default=settings.CURRENT_SEASON,
+            help='Comma separated seasons, or "all" for every season in SEASONS',
+        )
+        parser.add_argument(
+            "--types",
+            default=",".join(STANDING_TYPES),
+            help=f"Comma separated standing types ({', '.join(STANDING_TYPES)})",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of worker processes",
+        )
+        parser.add_argument(
+            "--split-types",
+            action="store_true",
+            help="Run each standing type of a season as its own task",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without writing anything",
+        )
+
+    def get_seasons(self, value):
+        if value == "all":
+            return [season for season, _ in settings.SEASONS]
+
+        return [normalize_season(season) for season in value.split(",") if season]
+
+    def get_types(self, value):
+        types = [standing_type for standing_type in value.split(",") if standing_type]
+
+        unknown = set(types) - set(STANDING_TYPES)
+        if unknown:
+            raise CommandError(f"Unknown standing types: {', '.join(sorted(unknown))}")
+
+        return tuple(types)
+
+    def handle(self, *args, **options):
+        seasons = self.get_seasons(options["seasons"])
+        types = self.get_types(options["types"])
+
+        if options["split_types"]:
+            tasks = [
+                (season, (standing_type,))
+                for season in seasons
+                for standing_type in types
+            ]
+        else:
+            tasks = [(season, types) for season in seasons]
+
+        started = time.monotonic()
+        total = len(tasks)
+
+        if options["dry_run"]:
+            for season, diffs in map(run_diff, tasks):
+                self.report_diff(season, diffs, options["verbosity"])
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Dry run of {total} tasks across {len(seasons)} seasons "
+                    f"in {time.monotonic() - started:.1f}s; nothing was written"
+                )
+            )
+            return
+
+        if options["jobs"] > 1:
+            close_connections()
+            with Pool(options["jobs"], initializer=close_connections) as pool:
+                for done, summary in enumerate(pool.imap_unordered(run_task, tasks), 1):
+                    self.report(done, total, summary)
+        else:
+            for done, task in enumerate(tasks, 1):
+                self.report(done, total, run_task(task))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recomputed {total} tasks across {len(seasons)} seasons "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+        )
+
+    def report(self, done, total, summary):
+        counts = summary["counts"]
+        self.stdout.write(
+            f"[{done}/{total}] {summary['season']} {','.join(summary['types'])}: "
+            f"{counts.get('created', 0)} created, {counts.get('updated', 0)} updated, "
+            f"{counts.get('deleted', 0)} deleted in {summary['seconds']:.1f}s"
+        )
+
+    def report_diff(self, season, diffs, verbosity=1):
+        for name, diff in diffs.items():
+            counts = diff_counts(diff)
+            self.stdout.write(
+                f"{season} {name}: {counts['added']} added, "
+                f"{counts['removed']} removed, {counts['points']} points changed, "
+                f"{counts['place']} places changed"
+            )
+
+            if verbosity < 2:
+                continue
+
+            for owner_id, row in diff["added"]:
+                self.stdout.write(f"  + {owner_id} {row}")
+            for owner_id, row in diff["removed"]:
+                self.stdout.write(f"  - {owner_id} {row}")
+            for change in ("points", "place"):
+                for owner_id, before, after in diff[change]:
+                    self.stdout.write(f"  ~ {owner_id} {change} {before} -> {after}")
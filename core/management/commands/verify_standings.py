@@ -0,0 +1,94 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.standings.common import normalize_season
+from core.utils.standings.verify import VERIFIED, verify_season
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes seasons in memory and reports every stored standing row "
+        "that differs from a full recompute"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seasons",
+            default=settings.CURRENT_SEASON,
+            help='Comma separated seasons, or "all" for every season in SEASONS',
+        )
+        parser.add_argument(
+            "--standings",
+            default=",".join(VERIFIED),
+            help=f"Comma separated standings to check ({', '.join(VERIFIED)})",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Mismatches listed per standing (0 lists them all)",
+        )
+
+    def get_seasons(self, value):
+        if value == "all":
+            return [season for season, _ in settings.SEASONS]
+
+        return [normalize_season(season) for season in value.split(",") if season]
+
+    def get_standings(self, value):
+        standings = [name for name in value.split(",") if name]
+
+        unknown = set(standings) - set(VERIFIED)
+        if unknown:
+            raise CommandError(f"Unknown standings: {', '.join(sorted(unknown))}")
+
+        return standings
+
+    def handle(self, *args, **options):
+        seasons = self.get_seasons(options["seasons"])
+        standings = self.get_standings(options["standings"])
+        started = time.monotonic()
+        total = 0
+
+        for season in seasons:
+            for name, mismatches in verify_season(season, standings).items():
+                total += len(mismatches)
+                self.report(season, name, mismatches, options["limit"])
+
+        message = (
+            f"Checked {len(seasons)} seasons in {time.monotonic() - started:.1f}s: "
+            f"{total} mismatched rows"
+        )
+
+        if total:
+            raise CommandError(message)
+
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def report(self, season, name, mismatches, limit):
+        if not mismatches:
+            self.stdout.write(f"{season} {name}: OK")
+            return
+
+        self.stdout.write(
+            self.style.WARNING(f"{season} {name}: {len(mismatches)} mismatched rows")
+        )
+
+        shown = mismatches[:limit] if limit else mismatches
+        for mismatch in shown:
+            if mismatch["problem"] == "different":
+                details = ", ".join(
+                    f"{field} {stored} != {expected}"
+                    for field, (stored, expected) in mismatch["fields"].items()
+                )
+            elif mismatch["problem"] == "missing":
+                details = f"expected {mismatch['expected']}"
+            else:
+                details = f"stored {mismatch['stored']}"
+
+            self.stdout.write(f"  {mismatch['owner']} {mismatch['problem']}: {details}")
+
+        if len(shown) < len(mismatches):
+            self.stdout.write(f"  ... {len(mismatches) - len(shown)} more")
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.utils.standings.prerender import FRAGMENTS, prerender_season
+
+
+class Command(BaseCommand):
+    help = "Prerenders the cached standings tabs of the index page"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--season",
+            action="append",
+            dest="seasons",
+            help="Only warm this season (may be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        seasons = options["seasons"] or [season for season, _ in settings.SEASONS]
+
+        for season in seasons:
+            prerender_season(season)
+            self.stdout.write(f"Warmed {len(FRAGMENTS)} standings tabs for {season}")
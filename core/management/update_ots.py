@@ -4,6 +4,7 @@ from tqdm import tqdm
 
 from core.models import COTY, SOTY, TOTY, Debater, Team
 from core.utils.rankings import *
+from core.utils.standings import update_season_standings
 
 
 class Command(BaseCommand):
@@ -20,22 +21,13 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         season = options["season"]
 
-        for team in tqdm(Team.objects.all()):
-            self.stdout.write(f"Updating {team}")
-            update_toty(team)
+        self.stdout.write("Updating TOTY, SOTY and NOTY")
+        update_season_standings(season)
 
         for team in tqdm(Team.objects.all()):
             self.stdout.write(f"Updating {team}")
             update_qual_points(team)
 
-        for debater in tqdm(Debater.objects.all()):
-            self.stdout.write(f"Updating {debater}")
-            update_soty(debater)
-
-        for debater in tqdm(Debater.objects.all()):
-            self.stdout.write(f"Updating {debater}")
-            update_noty(debater)
-
         self.stdout.write("Ranking TOTY")
         redo_rankings(TOTY.objects.filter(season=season).all(), cache_type="toty")
         self.stdout.write("Ranking COTY")
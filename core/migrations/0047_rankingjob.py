@@ -0,0 +1,38 @@
+# Generated by Django 3.2 on 2026-10-18 17:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0046_auto_20250830_1900'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=16)),
+                ('teams', models.JSONField(blank=True, default=list)),
+                ('debaters', models.JSONField(blank=True, default=list)),
+                ('status', models.IntegerField(choices=[(0, 'Pending'), (1, 'Running'), (2, 'Done'), (3, 'Failed')], default=0)),
+                ('worker', models.CharField(blank=True, max_length=128)),
+                ('progress', models.CharField(blank=True, max_length=128)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('tournament', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ranking_jobs', to='core.tournament')),
+            ],
+            options={
+                'ordering': ('created_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='rankingjob',
+            index=models.Index(fields=['status', 'season'], name='core_rankin_status_e6dbdc_idx'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 3.2 on 2026-10-18 18:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_qual_summaries(apps, schema_editor):
+    QUAL = apps.get_model("core", "QUAL")
+    QualPoints = apps.get_model("core", "QualPoints")
+    QualSummary = apps.get_model("core", "QualSummary")
+
+    labels = dict(QUAL._meta.get_field("qual_type").choices)
+
+    debaters = {}
+    for season, debater_id, school_id, points in (
+        QualPoints.objects.exclude(debater__school=None)
+        .order_by("id")
+        .values_list("season", "debater_id", "debater__school_id", "points")
+    ):
+        debaters.setdefault((season, debater_id), [school_id, points, []])
+
+    for season, debater_id, school_id, qual_type in (
+        QUAL.objects.exclude(debater__school=None)
+        .order_by("id")
+        .values_list("season", "debater_id", "debater__school_id", "qual_type")
+    ):
+        debaters.setdefault((season, debater_id), [school_id, 0, []])[2] += [qual_type]
+
+    summaries = []
+    for (season, debater_id), (school_id, points, qual_types) in debaters.items():
+        qualled = bool(qual_types)
+
+        if points <= 0 and not qualled:
+            continue
+
+        summaries += [
+            QualSummary(
+                season=season,
+                school_id=school_id,
+                debater_id=debater_id,
+                points=points,
+                qualled=qualled,
+                qual_types=", ".join(
+                    labels[qual_type] for qual_type in qual_types if qual_type > 0
+                ),
+                contribution=min(66, points + (6 if qualled else 0)),
+            )
+        ]
+
+    QualSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0047_rankingjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QualSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=16)),
+                ('points', models.FloatField(default=0)),
+                ('qualled', models.BooleanField(default=False)),
+                ('qual_types', models.CharField(blank=True, max_length=255)),
+                ('contribution', models.FloatField(default=0)),
+                ('debater', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='qual_summaries', to='core.debater')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='qual_summaries', to='core.school')),
+            ],
+            options={
+                'ordering': ('-points', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='qualsummary',
+            index=models.Index(fields=['school', 'season'], name='core_qualsu_school__4b3122_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='qualsummary',
+            unique_together={('season', 'debater')},
+        ),
+        migrations.RunPython(build_qual_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2 on 2026-10-18 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0048_qualsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportPayload',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('url', models.CharField(blank=True, max_length=512)),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='importpayload',
+            index=models.Index(fields=['created_at'], name='core_import_created_fc5f96_idx'),
+        ),
+    ]
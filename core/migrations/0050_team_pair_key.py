@@ -0,0 +1,75 @@
+# Generated by Django 3.2 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+
+def pair_key(debater_ids):
+    ids = sorted(debater_ids)
+
+    if len(ids) == 1:
+        ids *= 2
+
+    if len(ids) != 2:
+        return None
+
+    return f"{ids[0]}:{ids[1]}"
+
+
+def dedupe_teams(apps, schema_editor):
+    Team = apps.get_model("core", "Team")
+    TeamResult = apps.get_model("core", "TeamResult")
+    Round = apps.get_model("core", "Round")
+    TOTY = apps.get_model("core", "TOTY")
+    TOTYReaff = apps.get_model("core", "TOTYReaff")
+
+    debaters = {}
+    for team_id, debater_id in Team.debaters.through.objects.values_list(
+        "team_id", "debater_id"
+    ):
+        debaters.setdefault(team_id, set()).add(debater_id)
+
+    teams = {}
+    for team_id in sorted(debaters):
+        key = pair_key(debaters[team_id])
+        if key:
+            teams.setdefault(key, []).append(team_id)
+
+    # Every duplicate team is merged into the oldest team with its debaters
+    for team_ids in teams.values():
+        keep, duplicates = team_ids[0], team_ids[1:]
+
+        if not duplicates:
+            continue
+
+        TeamResult.objects.filter(team_id__in=duplicates).update(team_id=keep)
+        Round.objects.filter(gov_id__in=duplicates).update(gov_id=keep)
+        Round.objects.filter(opp_id__in=duplicates).update(opp_id=keep)
+        TOTYReaff.objects.filter(old_team_id__in=duplicates).update(old_team_id=keep)
+        TOTYReaff.objects.filter(new_team_id__in=duplicates).update(new_team_id=keep)
+
+        # Standings are derived; the kept team's rows are rebuilt by the
+        # next recompute
+        TOTY.objects.filter(team_id__in=duplicates).delete()
+        Team.objects.filter(id__in=duplicates).delete()
+
+    Team.objects.bulk_update(
+        [Team(id=team_ids[0], pair_key=key) for key, team_ids in teams.items()],
+        ["pair_key"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0049_importpayload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='pair_key',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.RunPython(dedupe_teams, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0050_team_pair_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='team',
+            name='pair_key',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True, unique=True),
+        ),
+    ]
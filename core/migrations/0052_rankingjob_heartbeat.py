@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0051_team_pair_key_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rankingjob',
+            name='attempts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rankingjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from .debater import Debater, QualPoints, Reaff
+from .import_payload import ImportPayload
 from .results.speaker import SpeakerResult
+from .ranking_job import RankingJob
 from .results.team import TeamResult
 from .round import Round, RoundStats
 from .school import School, SchoolLookup
@@ -7,7 +9,7 @@ from .site_settings import SiteSetting
 from .standings.coty import COTY
 from .standings.noty import NOTY
 from .standings.online_qual import OnlineQUAL
-from .standings.qual import QUAL, QualBar
+from .standings.qual import QUAL, QualBar, QualSummary
 from .standings.soty import SOTY
 from .standings.toty import TOTY, TOTYReaff
 from .team import Team
@@ -38,4 +40,7 @@ __all__ = [
     "SiteSetting",
     "Video",
     "QualBar",
+    "QualSummary",
+    "RankingJob",
+    "ImportPayload",
 ]
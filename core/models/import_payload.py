@@ -0,0 +1,27 @@
+import hashlib
+
+from django.db import models
+
+
+class ImportPayload(models.Model):
+    """
+    A tab-server JSON export staged for the tournament import wizard, stored
+    once and addressed by the sha256 of its content
+    """
+
+    digest = models.CharField(max_length=64, unique=True)
+
+    url = models.CharField(max_length=512, blank=True)
+    content = models.TextField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at"])]
+
+    def __str__(self):
+        return f"{self.url or 'Import'} ({self.digest[:12]})"
+
+    @staticmethod
+    def digest_for(content):
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
@@ -0,0 +1,49 @@
+from django.db import models
+
+from core.models.tournament import Tournament
+
+
+class RankingJob(models.Model):
+    PENDING = 0
+    RUNNING = 1
+    DONE = 2
+    FAILED = 3
+
+    STATUSES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    season = models.CharField(max_length=16)
+
+    tournament = models.ForeignKey(
+        Tournament,
+        on_delete=models.SET_NULL,
+        related_name="ranking_jobs",
+        blank=True,
+        null=True,
+    )
+
+    teams = models.JSONField(default=list, blank=True)
+    debaters = models.JSONField(default=list, blank=True)
+
+    status = models.IntegerField(choices=STATUSES, default=PENDING)
+
+    worker = models.CharField(max_length=128, blank=True)
+    progress = models.CharField(max_length=128, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ("created_at",)
+        indexes = [models.Index(fields=["status", "season"])]
+
+    def __str__(self):
+        return f"{self.season} ({self.get_status_display()})"
@@ -1,6 +1,7 @@
 from django.db import models
 
 from core.models.debater import Debater
+from core.models.school import School
 from core.models.standings.base import AbstractStanding
 from core.models.tournament import Tournament
 
@@ -51,3 +52,30 @@ class QUAL(AbstractStanding):
 
     class Meta:
         unique_together = ("season", "debater", "qual_type")
+
+
+class QualSummary(models.Model):
+    """
+    One row per debater with qual points or a qual in a season, filed under
+    their school, so a school's qualification table is a single read.
+    Rebuilt whenever the season's quals are recomputed.
+    """
+
+    season = models.CharField(max_length=16)
+
+    school = models.ForeignKey(
+        School, on_delete=models.CASCADE, related_name="qual_summaries"
+    )
+    debater = models.ForeignKey(
+        Debater, on_delete=models.CASCADE, related_name="qual_summaries"
+    )
+
+    points = models.FloatField(default=0)
+    qualled = models.BooleanField(default=False)
+    qual_types = models.CharField(max_length=255, blank=True)
+    contribution = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ("-points", "id")
+        unique_together = ("season", "debater")
+        indexes = [models.Index(fields=["school", "season"])]
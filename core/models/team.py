@@ -1,24 +1,54 @@
 from django.db import models
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
 from django.shortcuts import reverse
 from django.utils.html import format_html
 
 from .debater import Debater
 
 
+def team_pair_key(debaters):
+    """
+    The canonical key of a team's debaters (or their ids): the sorted pair of
+    ids, with an iron-man team keyed as a pair of the same debater. Teams of
+    any other size have no key.
+    """
+    ids = sorted({getattr(debater, "id", debater) for debater in debaters})
+
+    if len(ids) == 1:
+        ids *= 2
+
+    if len(ids) != 2:
+        return None
+
+    return f"{ids[0]}:{ids[1]}"
+
+
 class Team(models.Model):
     name = models.CharField(max_length=128, blank=False)
 
     debaters = models.ManyToManyField(Debater, related_name="teams")
 
-    def update_name(self):
+    pair_key = models.CharField(
+        max_length=32, unique=True, blank=True, null=True, editable=False
+    )
+
+    @staticmethod
+    def name_for(debaters):
+        """Names a team from its debaters, ordered by id, with their schools"""
         school_name = ""
 
-        if self.debaters.first().school == self.debaters.last().school:
-            school_name = self.debaters.first().school.name
+        if debaters[0].school == debaters[-1].school:
+            school_name = debaters[0].school.name
         else:
-            school_name = f"{self.debaters.first().school.name} / {self.debaters.last().school.name}"
+            school_name = f"{debaters[0].school.name} / {debaters[-1].school.name}"
+
+        return (
+            f"{school_name} {''.join([debater.last_name[0] for debater in debaters])}"
+        )
 
-        self.name = f"{school_name} {''.join([debater.last_name[0] for debater in self.debaters.all()])}"
+    def update_name(self):
+        self.name = self.name_for(list(self.debaters.order_by("id")))
 
     @property
     def debaters_display(self):
@@ -62,3 +92,53 @@ class Team(models.Model):
 
     def __str__(self):
         return self.name
+
+
+def refresh_pair_keys(team_ids):
+    """
+    Rekeys teams from their current debaters. A team down to one debater
+    only keeps an iron-man key it already had (get_or_create_teams sets it
+    when creating one); otherwise it has no key, since that is usually a
+    step of a set() or of adding debaters one at a time, which must not
+    claim the key of the debater's own iron-man team.
+    """
+    current = dict(Team.objects.filter(id__in=team_ids).values_list("id", "pair_key"))
+    debaters = {team_id: set() for team_id in current}
+
+    for team_id, debater_id in Team.debaters.through.objects.filter(
+        team_id__in=debaters
+    ).values_list("team_id", "debater_id"):
+        debaters[team_id].add(debater_id)
+
+    keys = {}
+
+    for team_id, ids in debaters.items():
+        key = team_pair_key(ids)
+
+        if len(ids) == 1 and key != current[team_id]:
+            key = None
+
+        if key != current[team_id]:
+            Team.objects.filter(id=team_id).update(pair_key=key)
+
+        keys[team_id] = key
+
+    return keys
+
+
+@receiver(m2m_changed, sender=Team.debaters.through)
+def update_pair_keys(instance, action, reverse, pk_set, **kwargs):
+    # Clearing a debater's teams doesn't say which teams they were
+    if action == "pre_clear" and reverse:
+        instance.cleared_team_ids = list(instance.teams.values_list("id", flat=True))
+        return
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        instance.pair_key = refresh_pair_keys([instance.pk]).get(instance.pk)
+    elif action == "post_clear":
+        refresh_pair_keys(getattr(instance, "cleared_team_ids", []))
+    else:
+        refresh_pair_keys(pk_set)
@@ -3,11 +3,11 @@ from django.db import models
 from django.shortcuts import reverse
 
 from core.models.school import School
-from core.utils.points import (
-    novice_points_for_size,
-    online_points,
-    speaker_points_for_size,
-    team_points_for_size,
+from core.utils.points_table import (
+    novice_points,
+    online_place_points,
+    speaker_points,
+    team_points,
 )
 
 
@@ -258,25 +258,25 @@ class Tournament(models.Model):
         if not self.qual:
             return 0
 
-        return team_points_for_size(self.num_teams, place, ghost_points=ghost_points)
+        return team_points(self.num_teams, place, ghost_points=ghost_points)
 
     def get_toty_points(self, place, ghost_points=False):
         if not self.toty:
             return 0
 
-        return team_points_for_size(self.num_teams, place, ghost_points=ghost_points)
+        return team_points(self.num_teams, place, ghost_points=ghost_points)
 
     def get_online_qual_points(self, place):
         if not self.online_qual_points:
             return 0
 
-        return online_points(place)
+        return online_place_points(place)
 
     def get_soty_points(self, place):
         if not self.soty:
             return 0
 
-        return speaker_points_for_size(self.num_teams, place)
+        return speaker_points(self.num_teams, place)
 
     def get_season_display(self):
         if isinstance(self.season, int) or (isinstance(self.season, str) and self.season.isdigit()):
@@ -288,7 +288,7 @@ class Tournament(models.Model):
         if not self.noty:
             return 0
 
-        return novice_points_for_size(self.num_novice_debaters, place)
+        return novice_points(self.num_novice_debaters, place)
 
     def get_absolute_url(self):
         return reverse("core:tournament_detail", kwargs={"pk": self.id})
@@ -0,0 +1,73 @@
+"""
+Receivers keeping derived tables and caches in step with hand edits. They
+live here rather than in the models so models never import the utils that
+maintain those tables; CoreConfig.ready connects them.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models.debater import Debater, QualPoints, Reaff
+from core.models.school import School, SchoolLookup
+from core.models.standings.qual import QUAL, QualSummary
+from core.models.standings.toty import TOTYReaff
+from core.utils.standings.quals import refresh_qual_summaries
+from core.utils.reconcile import invalidate_school_aliases
+from core.utils.standings.reaffs import invalidate_reaffs
+
+
+@receiver(post_save, sender=QUAL)
+@receiver(post_delete, sender=QUAL)
+@receiver(post_save, sender=QualPoints)
+@receiver(post_delete, sender=QualPoints)
+def refresh_debater_qual_summary(sender, instance, raw=False, **kwargs):
+    # The engine writes in bulk and refreshes summaries itself; this covers
+    # rows saved or deleted one at a time, e.g. from the admin
+    if raw:
+        return
+
+    school_id = (
+        Debater.objects.filter(id=instance.debater_id)
+        .values_list("school_id", flat=True)
+        .first()
+    )
+
+    if school_id is not None:
+        refresh_qual_summaries(instance.season, {school_id})
+
+
+@receiver(post_save, sender=Debater)
+def move_qual_summaries(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    moved = set(
+        QualSummary.objects.filter(debater=instance)
+        .exclude(school_id=instance.school_id)
+        .values_list("season", "school_id")
+    )
+
+    for season, school_id in moved:
+        refresh_qual_summaries(season, {school_id, instance.school_id} - {None})
+
+
+@receiver(post_save, sender=Reaff)
+@receiver(post_delete, sender=Reaff)
+def invalidate_debater_reaffs(sender, instance, **kwargs):
+    if instance.season:
+        invalidate_reaffs("debater", instance.season)
+
+
+@receiver(post_save, sender=TOTYReaff)
+@receiver(post_delete, sender=TOTYReaff)
+def invalidate_team_reaffs(sender, instance, **kwargs):
+    if instance.season:
+        invalidate_reaffs("team", instance.season)
+
+
+@receiver(post_save, sender=School)
+@receiver(post_delete, sender=School)
+@receiver(post_save, sender=SchoolLookup)
+@receiver(post_delete, sender=SchoolLookup)
+def invalidate_aliases(sender, **kwargs):
+    invalidate_school_aliases()
@@ -63,27 +63,6 @@ def range_filter(start, end):
     return range(start, end)
 
 
-@register.filter
-def qual_display(debater, season):
-    return ", ".join(
-        [
-            qual.get_qual_type_display()
-            for qual in debater.quals.filter(season=season).all()
-            if qual.qual_type > 0
-        ]
-    )
-
-
-@register.filter
-def qual_contribution(debater, season):
-    points = debater.points
-
-    if debater.qualled:
-        points += 6
-
-    return min(66, points)
-
-
 @register.filter
 def relevant_debaters(school, season):
     return get_qualled_debaters(school, season)
@@ -0,0 +1,568 @@
+"""
+Tests for the tournament import pipeline
+"""
+
+import json
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.models.debater import Debater
+from core.models.import_payload import ImportPayload
+from core.models.results.team import TeamResult
+from core.models.round import Round, RoundStats
+from core.models.school import School, SchoolLookup
+from core.models.standings.soty import SOTY
+from core.models.standings.toty import TOTY
+from core.models.tournament import Tournament
+from core.tests.test_standings import (
+    LOCMEM_CACHE,
+    SeasonStandingsTestCase,
+    full_recompute,
+    placed_rows,
+)
+from core.utils.import_management import (
+    CREATE,
+    LINK,
+    create_round_stats,
+    create_schools,
+    create_rounds,
+    load_payload,
+    stage_payload,
+)
+from core.utils.reconcile import SchoolResolver, match_debaters
+from core.views.tournament_views import TournamentImportWizardView
+
+PAYLOAD = {
+    "num_rounds": 5,
+    "schools": [{"id": 1, "name": "Test School"}],
+    "teams": [
+        {
+            "id": 10,
+            "num_rounds": 5,
+            "school_id": 1,
+            "hybrid_school_id": -1,
+            "debaters": [
+                {"id": 100, "name": "First0 Last0", "status": 0},
+                {"id": 101, "name": "First1 Last1", "status": 1},
+            ],
+        }
+    ],
+}
+
+
+class ImportRoundsTest(SeasonStandingsTestCase):
+    """Rounds and round stats are bulk inserted from the id maps"""
+
+    def payload(self, num_rounds):
+        team_actions = {i: team.id for i, team in enumerate(self.teams)}
+        debater_actions = {i: debater.id for i, debater in enumerate(self.speakers)}
+
+        rounds = [
+            {
+                "id": 100 + i,
+                "round_number": str(i + 1),
+                "gov": i % len(self.teams),
+                "opp": (i + 1) % len(self.teams),
+                "victor": Round.GOV,
+            }
+            for i in range(num_rounds)
+        ]
+        stats = [
+            {
+                "round": 100 + i,
+                "debater": (i + j) % len(self.speakers),
+                "speaks": "27.5",
+                "ranks": str(j + 1),
+                "role": "pm",
+            }
+            for i in range(num_rounds)
+            for j in range(2)
+        ]
+
+        return team_actions, debater_actions, rounds, stats
+
+    def import_rounds(self, num_rounds, tournament=None, change=None):
+        team_actions, debater_actions, rounds, stats = self.payload(num_rounds)
+        tournament = tournament or self.tournaments[0]
+
+        if change:
+            change(rounds, stats)
+
+        with CaptureQueriesContext(connection) as queries:
+            round_actions = create_rounds(team_actions, tournament, rounds)
+            create_round_stats(debater_actions, round_actions, tournament, stats)
+
+        return round_actions, len(queries)
+
+    def test_rounds_and_stats_match_payload(self):
+        team_actions, debater_actions, rounds, stats = self.payload(12)
+        round_actions, _ = self.import_rounds(12)
+
+        self.assertEqual(sorted(round_actions), [round["id"] for round in rounds])
+        for round in rounds:
+            stored = Round.objects.get(id=round_actions[round["id"]])
+            self.assertEqual(
+                (stored.round_number, stored.gov_id, stored.opp_id),
+                (
+                    int(round["round_number"]),
+                    team_actions[round["gov"]],
+                    team_actions[round["opp"]],
+                ),
+            )
+
+        self.assertEqual(
+            sorted(
+                RoundStats.objects.filter(
+                    round__tournament=self.tournaments[0]
+                ).values_list("round_id", "debater_id", "ranks")
+            ),
+            sorted(
+                (
+                    round_actions[stat["round"]],
+                    debater_actions[stat["debater"]],
+                    Decimal(stat["ranks"]),
+                )
+                for stat in stats
+            ),
+        )
+
+    def test_query_count_does_not_grow_with_rounds(self):
+        _, small = self.import_rounds(3, self.tournaments[1])
+        _, large = self.import_rounds(60, self.tournaments[2])
+
+        self.assertEqual(small, large)
+        self.assertEqual(
+            Round.objects.filter(tournament=self.tournaments[2]).count(), 60
+        )
+
+    def stored_ids(self):
+        tournament = self.tournaments[0]
+        return (
+            dict(
+                Round.objects.filter(tournament=tournament).values_list("id", "victor")
+            ),
+            dict(
+                RoundStats.objects.filter(round__tournament=tournament).values_list(
+                    "id", "speaks"
+                )
+            ),
+        )
+
+    def test_unchanged_reimport_is_a_noop(self):
+        first, _ = self.import_rounds(12)
+        before = self.stored_ids()
+
+        second, queries = self.import_rounds(12)
+
+        self.assertEqual(queries, 2)
+        self.assertEqual(second, first)
+        self.assertEqual(self.stored_ids(), before)
+
+    def test_reimport_applies_only_changes(self):
+        def change(rounds, stats):
+            rounds[0]["victor"] = Round.OPP
+            stats[2]["speaks"] = 29.25
+            del rounds[-1]
+            del stats[-2:]
+
+        first, _ = self.import_rounds(12)
+        rounds_before, stats_before = self.stored_ids()
+
+        second, _ = self.import_rounds(12, change=change)
+        rounds_after, stats_after = self.stored_ids()
+
+        self.assertEqual(second, {key: first[key] for key in second})
+        self.assertEqual(set(rounds_after), set(rounds_before) - {first[111]})
+        self.assertEqual(rounds_after[first[100]], Round.OPP)
+        self.assertEqual(len(stats_after), len(stats_before) - 2)
+        self.assertLessEqual(set(stats_after), set(stats_before))
+        self.assertEqual(sorted(stats_after.values()).count(Decimal("29.25")), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ImportPayloadTest(TestCase):
+    """Fetched payloads are staged once and parsed once per wizard run"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_payload_is_content_addressed(self):
+        content = json.dumps(PAYLOAD).encode("utf-8")
+
+        digest = stage_payload(content, "https://tab.example.com")
+
+        self.assertEqual(stage_payload(content), digest)
+        self.assertEqual(ImportPayload.objects.get().digest, digest)
+        self.assertNotEqual(stage_payload(content + b" "), digest)
+
+    def test_parsed_payload_is_indexed_and_cached(self):
+        digest = stage_payload(json.dumps(PAYLOAD))
+
+        payload = load_payload(digest)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(load_payload(digest), payload)
+
+        self.assertEqual(payload["response"]["num_rounds"], 5)
+        self.assertEqual(list(payload["schools"]), [1])
+        self.assertEqual(list(payload["teams"]), [10])
+        self.assertEqual(payload["debaters"][101]["school_id"], 1)
+
+    def test_oversized_payload_is_not_cached(self):
+        digest = stage_payload(json.dumps(PAYLOAD))
+
+        with patch("core.utils.import_management.PAYLOAD_CACHE_MAX_SIZE", 100):
+            payload = load_payload(digest)
+
+        self.assertIsNone(cache.get(f"import_payload:{digest}"))
+        with self.assertNumQueries(1):
+            self.assertEqual(load_payload(digest), payload)
+
+
+class MatchDebatersTest(SeasonStandingsTestCase):
+    """Incoming debaters are scored against their schools in one batch"""
+
+    def test_ranked_candidates(self):
+        school, other = self.school.id, self.other_school.id
+
+        with self.assertNumQueries(1):
+            matches = match_debaters(
+                [
+                    ("first0  LAST0.", [school]),
+                    ("First1 Lsat1", [school, -1]),
+                    ("First0 Last0", [other, school]),
+                    ("Nobody Here", [school]),
+                    ("First0 Last0", [-1]),
+                ]
+            )
+
+        self.assertEqual(matches[0][0], (1.0, self.debaters[(school, 0)]))
+        self.assertEqual(matches[1][0][1], self.debaters[(school, 1)])
+        self.assertLess(matches[1][0][0], 1.0)
+        self.assertEqual(
+            [debater for _, debater in matches[2][:2]],
+            [self.debaters[(other, 0)], self.debaters[(school, 0)]],
+        )
+        self.assertEqual(matches[3], [])
+        self.assertEqual(matches[4], [])
+
+    def test_wizard_reconciliation_step(self):
+        payload = dict(
+            PAYLOAD,
+            schools=[{"id": 1, "name": "Test School"}, {"id": 2, "name": "Other"}],
+            teams=[
+                dict(PAYLOAD["teams"][0], id=10 + i, hybrid_school_id=2)
+                for i in range(30)
+            ],
+        )
+        steps = {
+            "0": {"0-tournament": str(self.tournaments[0].id)},
+            "1": {"payload": stage_payload(json.dumps(payload))},
+            "3": {
+                "schools": {
+                    "-1": {"school": -1, "name": ""},
+                    "1": {"school": self.school.id, "name": "Test School"},
+                    "2": {"school": -1, "name": "Other"},
+                }
+            },
+        }
+        view = TournamentImportWizardView()
+        view.storage = SimpleNamespace(get_step_data=steps.get)
+
+        with self.assertNumQueries(4):
+            initial = view.get_form_initial("4")
+
+        self.assertEqual(len(initial), 60)
+        self.assertEqual(initial[0]["debater"], self.debaters[(self.school.id, 0)])
+        self.assertEqual(initial[1]["school"], self.school)
+        self.assertEqual(initial[1]["server_hybrid_school_name"], "Other")
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SchoolResolverTest(TestCase):
+    """Incoming school names resolve through normalized aliases"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.maryland = School.objects.create(name="University of Maryland")
+        self.brandeis = School.objects.create(name="Brandeis University")
+        self.north = School.objects.create(name="North Carolina State")
+        SchoolLookup.objects.create(server_name="UMD", school=self.maryland)
+
+    def test_resolve(self):
+        names = [
+            "University of Maryland",
+            "UMD",
+            "Maryland University",
+            "the univ. of maryland",
+            "Brandies University",
+            "South Carolina State",
+            "",
+        ]
+
+        with self.assertNumQueries(3):
+            found = SchoolResolver().resolve(names)
+
+        self.assertEqual(
+            found,
+            {
+                "University of Maryland": self.maryland,
+                "UMD": self.maryland,
+                "Maryland University": self.maryland,
+                "the univ. of maryland": self.maryland,
+                "Brandies University": self.brandeis,
+            },
+        )
+
+        with self.assertNumQueries(1):
+            SchoolResolver().resolve(names)
+
+    def test_alias_changes_invalidate(self):
+        self.assertIsNone(SchoolResolver().resolve_id("Tar Heels"))
+
+        SchoolLookup.objects.create(server_name="Tar Heels", school=self.north)
+
+        self.assertEqual(SchoolResolver().resolve_id("Tar Heels"), self.north.id)
+
+    def test_bulk_and_cascade_deletes_invalidate(self):
+        self.assertEqual(SchoolResolver().resolve_id("UMD"), self.maryland.id)
+
+        SchoolLookup.objects.filter(server_name="UMD").delete()
+        self.assertIsNone(SchoolResolver().resolve_id("UMD"))
+
+        SchoolLookup.objects.create(server_name="Tar Heels", school=self.north)
+        self.assertEqual(SchoolResolver().resolve_id("Tar Heels"), self.north.id)
+
+        self.north.delete()
+        self.assertIsNone(SchoolResolver().resolve_id("Tar Heels"))
+
+    def test_create_schools_upserts_aliases(self):
+        SchoolLookup.objects.create(server_name="Brandeis", school=self.maryland)
+
+        actions = create_schools(
+            {
+                -1: {"school": -1, "name": ""},
+                1: {
+                    "id": 1,
+                    "action": LINK,
+                    "school": self.brandeis.id,
+                    "name": "Brandeis",
+                },
+                2: {
+                    "id": 2,
+                    "action": LINK,
+                    "school": self.north.id,
+                    "name": "NC State",
+                },
+                3: {
+                    "id": 3,
+                    "action": LINK,
+                    "school": self.maryland.id,
+                    "name": "University of Maryland",
+                },
+                4: {"id": 4, "action": CREATE, "school": -1, "name": "New School"},
+                5: {
+                    "id": 5,
+                    "action": CREATE,
+                    "school": -1,
+                    "name": "Brandeis University",
+                },
+            }
+        )
+
+        new_school = School.objects.get(name="New School")
+        self.assertEqual(
+            actions,
+            {
+                1: self.brandeis.id,
+                2: self.north.id,
+                3: self.maryland.id,
+                4: new_school.id,
+                5: self.brandeis.id,
+            },
+        )
+        self.assertEqual(
+            dict(SchoolLookup.objects.values_list("server_name", "school_id")),
+            {
+                "UMD": self.maryland.id,
+                "Brandeis": self.brandeis.id,
+                "NC State": self.north.id,
+            },
+        )
+        self.assertEqual(SchoolResolver().resolve_id("NC State"), self.north.id)
+
+
+@override_settings(
+    CURRENT_SEASON="2024",
+    LAST_NOTY_SEASON=2025,
+    QUAL_BAR=11.5,
+    ONLINE_QUAL_BAR=10,
+    ONLINE_SEASONS=("2020", "2021"),
+    CACHES=LOCMEM_CACHE,
+)
+class ImportTournamentsCommandTest(SeasonStandingsTestCase):
+    """Tab-server exports are imported offline and recomputed once"""
+
+    def export(self, directory, tournament):
+        payload = {
+            "num_rounds": 2,
+            "schools": [
+                {"id": 1, "name": "Test School"},
+                {"id": 2, "name": "Othr School"},
+            ],
+            "teams": [
+                {
+                    "id": 10,
+                    "num_rounds": 2,
+                    "school_id": 1,
+                    "hybrid_school_id": -1,
+                    "debaters": [
+                        {"id": 100, "name": "First0 Last0", "status": 0},
+                        {"id": 101, "name": "First1 Last1", "status": 0},
+                    ],
+                },
+                {
+                    "id": 11,
+                    "num_rounds": 2,
+                    "school_id": 2,
+                    "hybrid_school_id": -1,
+                    "debaters": [
+                        {"id": 102, "name": "First0 Last0", "status": 0},
+                        {"id": 103, "name": "Newbie Person", "status": 1},
+                    ],
+                },
+            ],
+            "rounds": [
+                {"id": 1, "round_number": 1, "gov": 10, "opp": 11, "victor": 1},
+                {"id": 2, "round_number": 2, "gov": 11, "opp": 10, "victor": 2},
+            ],
+            "stats": [
+                {"round": 1, "debater": 100, "speaks": 27, "ranks": 1, "role": "pm"},
+                {"round": 2, "debater": 103, "speaks": 25, "ranks": 2, "role": "lo"},
+            ],
+            "speaker_results": [{"debater": 100, "place": 1, "tie": False}],
+            "novice_speaker_results": [{"debater": 103, "place": 1, "tie": False}],
+            "team_results": [{"team": 10, "place": 1}, {"team": 11, "place": 2}],
+            "novice_team_results": [],
+        }
+
+        path = Path(directory) / f"{tournament.id}.json"
+        path.write_text(json.dumps(payload))
+        return path
+
+    def import_tournaments(self, *args):
+        out = StringIO()
+        call_command("import_tournaments", *args, stdout=out)
+        return out.getvalue()
+
+    def test_unmatched_names_skip_the_file(self):
+        tournament = self.tournaments[2]
+
+        with TemporaryDirectory() as directory:
+            self.export(directory, tournament)
+            output = self.import_tournaments(directory)
+
+        self.assertIn("Othr School", output)
+        self.assertIn("Newbie Person", output)
+        self.assertFalse(Round.objects.filter(tournament=tournament).exists())
+        self.assertFalse(Debater.objects.filter(first_name="Newbie").exists())
+
+    def test_auto_link_imports_and_recomputes(self):
+        full_recompute()
+        tournament = self.tournaments[2]
+
+        with TemporaryDirectory() as directory:
+            self.export(directory, tournament)
+            output = self.import_tournaments(directory, "--auto-link")
+
+        self.assertIn("Imported 1 of 1 tournaments", output)
+
+        newbie = Debater.objects.get(first_name="Newbie")
+        other_first = self.debaters[(self.other_school.id, 0)]
+        self.assertEqual(newbie.school, self.other_school)
+        self.assertEqual(newbie.status, Debater.NOVICE)
+
+        self.assertEqual(Round.objects.filter(tournament=tournament).count(), 2)
+        self.assertEqual(
+            sorted(
+                TeamResult.objects.filter(tournament=tournament).values_list(
+                    "place", flat=True
+                )
+            ),
+            [1, 2],
+        )
+        winner = TeamResult.objects.get(tournament=tournament, place=1).team
+        runner_up = TeamResult.objects.get(tournament=tournament, place=2).team
+        self.assertEqual(winner, self.teams[0])
+        self.assertEqual(set(runner_up.debaters.all()), {other_first, newbie})
+
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.num_novice_debaters, 1)
+
+        # The single recompute at the end matches a full one
+        incremental = (placed_rows(TOTY, "team"), placed_rows(SOTY, "debater"))
+        full_recompute()
+        self.assertEqual(
+            incremental, (placed_rows(TOTY, "team"), placed_rows(SOTY, "debater"))
+        )
+
+    def test_unchanged_reimport_writes_nothing(self):
+        tournament = self.tournaments[2]
+
+        with TemporaryDirectory() as directory:
+            self.export(directory, tournament)
+            self.import_tournaments(directory, "--auto-link")
+
+            before = (
+                list(Round.objects.order_by("id").values_list("id", "victor")),
+                list(TeamResult.objects.order_by("id").values_list("id", "team_id")),
+                Debater.objects.count(),
+            )
+
+            # Every name links exactly now, so no --auto-link is needed
+            output = self.import_tournaments(directory)
+
+        self.assertIn("Imported 1 of 1 tournaments", output)
+        self.assertNotIn("Recomputed", output)
+        self.assertEqual(
+            (
+                list(Round.objects.order_by("id").values_list("id", "victor")),
+                list(TeamResult.objects.order_by("id").values_list("id", "team_id")),
+                Debater.objects.count(),
+            ),
+            before,
+        )
+
+    def test_size_change_recomputes_unchanged_results(self):
+        tournament = self.tournaments[2]
+
+        with TemporaryDirectory() as directory:
+            self.export(directory, tournament)
+            self.import_tournaments(directory, "--auto-link")
+
+            # Standings as of a different team count than the export's
+            Tournament.objects.filter(id=tournament.id).update(num_teams=96)
+            full_recompute()
+            stale = placed_rows(TOTY, "team")
+
+            output = self.import_tournaments(directory)
+
+        self.assertIn("Recomputed 2024 standings", output)
+        incremental = placed_rows(TOTY, "team")
+        self.assertNotEqual(incremental, stale)
+
+        full_recompute()
+        self.assertEqual(incremental, placed_rows(TOTY, "team"))
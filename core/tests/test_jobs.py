@@ -0,0 +1,122 @@
+"""
+Tests for the ranking recompute job queue
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.utils import timezone
+
+from core.models import RankingJob
+from core.models.standings.soty import SOTY
+from core.models.standings.toty import TOTY
+from core.tests.test_standings import SeasonStandingsTestCase
+from core.utils.jobs import (
+    MAX_ATTEMPTS,
+    STALE_AFTER,
+    enqueue_recompute,
+    requeue_stale_jobs,
+    run_pending_jobs,
+    standings_updating,
+)
+from core.utils.standings import DirtySet
+
+
+@override_settings(
+    CURRENT_SEASON="2024",
+    LAST_NOTY_SEASON=2025,
+    QUAL_BAR=11.5,
+    ONLINE_QUAL_BAR=10,
+    ONLINE_SEASONS=("2020", "2021"),
+)
+class RankingJobTest(SeasonStandingsTestCase):
+    """Queued recomputes are coalesced per season and run by the worker"""
+
+    def enqueue(self, teams=(), debaters=()):
+        dirty = DirtySet("2024")
+        dirty.add_teams(teams)
+        dirty.add_debaters(debaters)
+        return enqueue_recompute(dirty, tournament=self.tournaments[0])
+
+    def test_empty_set_is_not_queued(self):
+        self.assertIsNone(self.enqueue())
+        self.assertFalse(RankingJob.objects.exists())
+
+    def test_pending_jobs_are_coalesced(self):
+        self.enqueue(teams=self.teams[:2])
+        self.enqueue(teams=self.teams[1:3], debaters=self.speakers[:4])
+
+        with patch.object(DirtySet, "recompute", autospec=True) as recompute:
+            self.assertEqual(run_pending_jobs("test-worker"), 2)
+
+        self.assertEqual(recompute.call_count, 1)
+        dirty = recompute.call_args[0][0]
+        self.assertEqual(dirty.teams, {team.id for team in self.teams[:3]})
+        self.assertEqual(dirty.debaters, {d.id for d in self.speakers[:4]})
+        self.assertEqual(
+            set(RankingJob.objects.values_list("status", flat=True)),
+            {RankingJob.DONE},
+        )
+
+    def test_worker_updates_standings(self):
+        self.enqueue(teams=self.teams, debaters=self.speakers)
+
+        self.assertTrue(standings_updating(self.tournaments[0]))
+        run_pending_jobs("test-worker")
+
+        self.assertFalse(standings_updating(self.tournaments[0]))
+        self.assertTrue(TOTY.objects.filter(season="2024", place=1).exists())
+        self.assertTrue(SOTY.objects.filter(season="2024", place=1).exists())
+
+    def test_failed_job_records_error(self):
+        job = self.enqueue(teams=self.teams[:1])
+
+        with patch.object(DirtySet, "recompute", side_effect=ValueError("boom")):
+            run_pending_jobs("test-worker")
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, RankingJob.FAILED)
+        self.assertEqual(job.attempts, MAX_ATTEMPTS)
+        self.assertIn("boom", job.error)
+        self.assertFalse(standings_updating(self.tournaments[0]))
+
+    def test_failed_attempt_is_retried(self):
+        job = self.enqueue(teams=self.teams[:1])
+
+        with patch.object(
+            DirtySet, "recompute", side_effect=[ValueError("boom"), None]
+        ):
+            run_pending_jobs("test-worker")
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, RankingJob.DONE)
+        self.assertEqual(job.attempts, 2)
+
+    def test_only_silent_workers_are_requeued(self):
+        long_ago = timezone.now() - STALE_AFTER * 2
+        running = {"status": RankingJob.RUNNING, "started_at": long_ago}
+
+        alive = self.enqueue(teams=self.teams[:1])
+        silent = self.enqueue(teams=self.teams[1:2])
+        exhausted = self.enqueue(teams=self.teams[2:3])
+
+        RankingJob.objects.filter(id=alive.id).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=1), **running
+        )
+        RankingJob.objects.filter(id=silent.id).update(
+            heartbeat_at=long_ago, attempts=1, **running
+        )
+        RankingJob.objects.filter(id=exhausted.id).update(
+            heartbeat_at=long_ago, attempts=MAX_ATTEMPTS, **running
+        )
+
+        self.assertEqual(requeue_stale_jobs(), 2)
+        self.assertEqual(
+            dict(RankingJob.objects.values_list("id", "status")),
+            {
+                alive.id: RankingJob.RUNNING,
+                silent.id: RankingJob.PENDING,
+                exhausted.id: RankingJob.FAILED,
+            },
+        )
@@ -0,0 +1,50 @@
+"""
+Tests for the precomputed points tables
+"""
+
+from django.test import SimpleTestCase
+
+from core.utils import points, points_table
+
+SIZES = range(-2, 2 * points_table.MAX_SIZE)
+PLACES = range(-2, 2 * points_table.MAX_PLACE)
+
+
+class PointsTableTest(SimpleTestCase):
+    """The lookup tables agree with the formulas they were built from"""
+
+    def test_team_points(self):
+        for ghost_points in (False, True):
+            for size in SIZES:
+                for place in PLACES:
+                    self.assertEqual(
+                        points_table.team_points(size, place, ghost_points),
+                        points.team_points_for_size(size, place, ghost_points),
+                        (size, place, ghost_points),
+                    )
+
+    def test_speaker_points(self):
+        for size in SIZES:
+            for place in PLACES:
+                self.assertEqual(
+                    points_table.speaker_points(size, place),
+                    points.speaker_points_for_size(size, place),
+                    (size, place),
+                )
+
+    def test_novice_points(self):
+        for size in SIZES:
+            for place in PLACES:
+                self.assertEqual(
+                    points_table.novice_points(size, place),
+                    points.novice_points_for_size(size, place),
+                    (size, place),
+                )
+
+    def test_online_points(self):
+        for place in PLACES:
+            self.assertEqual(
+                points_table.online_place_points(place),
+                points.online_points(place),
+                place,
+            )
@@ -0,0 +1,247 @@
+"""
+Tests for differential result writes and the data-entry wizard commit
+"""
+
+from types import SimpleNamespace
+
+from django.test import override_settings
+
+from core.models import QUAL, Debater, RankingJob
+from core.models.results.speaker import SpeakerResult
+from core.models.results.team import TeamResult
+from core.tests.test_standings import SeasonStandingsTestCase
+from core.utils.results import sync_speaker_results, sync_team_results
+from core.utils.standings import DirtySet
+from core.views.tournament_views import TournamentDataEntryWizardView
+
+
+def team_rows(tournament):
+    return sorted(
+        TeamResult.objects.filter(tournament=tournament).values_list(
+            "team_id", "type_of_place", "place", "ghost_points"
+        )
+    )
+
+
+def speaker_rows(tournament):
+    return sorted(
+        SpeakerResult.objects.filter(tournament=tournament).values_list(
+            "debater_id", "type_of_place", "place", "tie"
+        )
+    )
+
+
+class SyncResultsTest(SeasonStandingsTestCase):
+    """Only the difference between stored and desired results is written"""
+
+    def test_unchanged_results_write_nothing(self):
+        tournament = self.tournaments[0]
+        desired = team_rows(tournament)
+        dirty = DirtySet("2024")
+
+        with self.assertNumQueries(1):
+            counts = sync_team_results(tournament, desired, dirty)
+
+        self.assertEqual(counts, {"created": 0, "updated": 0, "deleted": 0})
+        self.assertFalse(dirty)
+
+    def test_changes_mark_only_affected_teams(self):
+        tournament = self.tournaments[0]
+        moved, dropped, reassigned = self.teams[1], self.teams[3], self.teams[2]
+        desired = [
+            (dropped.id, *row[1:]) if row[0] == reassigned.id else row
+            for row in team_rows(tournament)
+            if row[0] not in (moved.id, dropped.id)
+        ] + [(moved.id, Debater.VARSITY, -1, False)] * 2
+
+        dirty = DirtySet("2024")
+        counts = sync_team_results(tournament, desired, dirty)
+
+        self.assertEqual(counts, {"created": 1, "updated": 1, "deleted": 2})
+        self.assertEqual(team_rows(tournament), sorted(set(desired)))
+        self.assertEqual(dirty.teams, {moved.id, dropped.id, reassigned.id})
+
+    def test_speaker_swap(self):
+        tournament = self.tournaments[1]
+        rows = speaker_rows(tournament)
+        first, second = [row for row in rows if row[1] == Debater.VARSITY][:2]
+        desired = [row for row in rows if row not in (first, second)] + [
+            (second[0], first[1], first[2], first[3]),
+            (first[0], second[1], second[2], True),
+        ]
+
+        dirty = DirtySet("2024")
+        counts = sync_speaker_results(tournament, desired, dirty)
+
+        self.assertEqual(counts, {"created": 0, "updated": 2, "deleted": 0})
+        self.assertEqual(speaker_rows(tournament), sorted(desired))
+        self.assertEqual(dirty.debaters, {first[0], second[0]})
+
+
+@override_settings(CURRENT_SEASON="2024")
+class DataEntryCommitTest(SeasonStandingsTestCase):
+    """The data-entry wizard commits results as one diff"""
+
+    def form_dict(self, tournament, teams, speakers):
+        team_forms = [
+            {
+                "debater_one": team.debaters.first(),
+                "debater_two": team.debaters.last(),
+                "ghost_points": False,
+            }
+            for team in teams
+        ]
+
+        return {
+            "0": SimpleNamespace(cleaned_data={"tournament": tournament}),
+            "1": SimpleNamespace(
+                cleaned_data={"num_teams": tournament.num_teams, "num_novices": 20}
+            ),
+            "2": SimpleNamespace(cleaned_data=team_forms),
+            "3": SimpleNamespace(
+                cleaned_data=[
+                    {"speaker": speaker, "tie": False} for speaker in speakers
+                ]
+            ),
+            "4": SimpleNamespace(cleaned_data=[{}]),
+            "5": SimpleNamespace(cleaned_data=[]),
+            "6": SimpleNamespace(cleaned_data=[{"debater_one": None}]),
+        }
+
+    def test_done_applies_diff_and_queues_changes(self):
+        tournament = self.tournaments[0]
+        teams = [self.teams[2], self.teams[0], self.teams[3]]
+        speakers = [self.speakers[5], self.speakers[6]]
+
+        TournamentDataEntryWizardView().done(
+            [], self.form_dict(tournament, teams, speakers)
+        )
+
+        self.assertEqual(
+            team_rows(tournament),
+            sorted(
+                (team.id, Debater.VARSITY, place, False)
+                for place, team in enumerate(teams, 1)
+            ),
+        )
+        self.assertEqual(
+            speaker_rows(tournament),
+            sorted(
+                (speaker.id, Debater.VARSITY, place, False)
+                for place, speaker in enumerate(speakers, 1)
+            ),
+        )
+
+        job = RankingJob.objects.get()
+        self.assertIn(self.teams[4].id, job.teams)
+        self.assertIn(self.teams[2].id, job.teams)
+
+    def test_size_change_marks_every_result(self):
+        tournament = self.tournaments[0]
+        teams = TeamResult.objects.filter(tournament=tournament).order_by("place")
+        speakers = SpeakerResult.objects.filter(tournament=tournament).order_by(
+            "place"
+        )
+        team_before, speaker_before = team_rows(tournament), speaker_rows(tournament)
+
+        form_dict = self.form_dict(tournament, [], [])
+        form_dict["1"].cleaned_data["num_teams"] = tournament.num_teams + 16
+        form_dict["2"].cleaned_data = [
+            {
+                "debater_one": result.team.debaters.first(),
+                "debater_two": result.team.debaters.last(),
+                "ghost_points": result.ghost_points,
+            }
+            for result in teams
+        ]
+        for step, type_of_place in (("3", Debater.VARSITY), ("5", Debater.NOVICE)):
+            form_dict[step].cleaned_data = [
+                {"speaker": result.debater, "tie": result.tie}
+                for result in speakers.filter(type_of_place=type_of_place)
+            ]
+
+        TournamentDataEntryWizardView().done([], form_dict)
+
+        self.assertEqual(team_rows(tournament), team_before)
+        self.assertEqual(speaker_rows(tournament), speaker_before)
+
+        job = RankingJob.objects.get()
+        self.assertEqual(set(job.teams), {row[0] for row in team_before})
+        self.assertEqual(set(job.debaters), {row[0] for row in speaker_before})
+
+        # Resubmitting the same size and results queues nothing
+        TournamentDataEntryWizardView().done([], form_dict)
+        self.assertEqual(RankingJob.objects.count(), 1)
+
+    def test_tournament_quals_are_dropped(self):
+        tournament = self.tournaments[0]
+        teams = [self.teams[2], self.teams[3]]
+        for team in (self.teams[0], self.teams[2]):
+            QUAL.objects.create(
+                season="2024",
+                debater=team.debaters.first(),
+                qual_type=QUAL.NORTHAMS,
+                tournament=tournament,
+            )
+
+        with override_settings(CURRENT_SEASON="2025"):
+            TournamentDataEntryWizardView().done(
+                [], self.form_dict(tournament, teams, [])
+            )
+
+        self.assertFalse(QUAL.objects.filter(tournament=tournament).exists())
+        self.assertFalse(RankingJob.objects.exists())
+
+        QUAL.objects.create(
+            season="2024",
+            debater=self.teams[2].debaters.first(),
+            qual_type=QUAL.NORTHAMS,
+            tournament=tournament,
+        )
+        TournamentDataEntryWizardView().done([], self.form_dict(tournament, teams, []))
+
+        self.assertFalse(QUAL.objects.filter(tournament=tournament).exists())
+        self.assertIn(self.teams[2].id, RankingJob.objects.get().teams)
+
+
+class DataEntryInitialTest(SeasonStandingsTestCase):
+    """The data-entry wizard loads a tournament's results once per step"""
+
+    def view(self, tournament):
+        view = TournamentDataEntryWizardView()
+        view.storage = SimpleNamespace(
+            get_step_data=lambda step: {"0-tournament": str(tournament.id)}
+        )
+        return view
+
+    def test_team_step_is_two_queries(self):
+        tournament = self.tournaments[0]
+        expected = [
+            {
+                "debater_one": result.team.debaters.first(),
+                "debater_two": result.team.debaters.last(),
+                "ghost_points": result.ghost_points,
+            }
+            for result in TeamResult.objects.filter(
+                tournament=tournament, type_of_place=Debater.VARSITY, place__gt=0
+            ).order_by("place")
+        ]
+
+        with self.assertNumQueries(2):
+            initial = self.view(tournament).get_form_initial("2")
+
+        self.assertEqual(initial, expected)
+
+    def test_speaker_step(self):
+        tournament = self.tournaments[1]
+        expected = [
+            {"speaker": result.debater, "tie": result.tie}
+            for result in SpeakerResult.objects.filter(
+                tournament=tournament, type_of_place=Debater.VARSITY
+            ).order_by("place")
+        ]
+
+        with self.assertNumQueries(1):
+            initial = self.view(tournament).get_form_initial("3")
+
+        self.assertEqual(initial, expected)
@@ -0,0 +1,203 @@
+"""
+Tests for the what-if standings simulator
+"""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.models import QUAL, QualPoints
+from core.models.results.team import TeamResult
+from core.models.standings.soty import SOTY
+from core.models.standings.toty import TOTY
+from core.tests.test_standings import (
+    LOCMEM_CACHE,
+    SeasonStandingsTestCase,
+    full_recompute,
+)
+from core.utils.rankings import clear_rankings_cache
+from core.utils.standings.simulator import (
+    SimulationError,
+    StandingsSimulator,
+    season_baseline,
+)
+
+
+@override_settings(
+    CURRENT_SEASON="2024",
+    SEASONS=(("2024", "2024-2025"),),
+    LAST_NOTY_SEASON=2025,
+    QUAL_BAR=11.5,
+    ONLINE_QUAL_BAR=10,
+    ONLINE_SEASONS=("2020", "2021"),
+)
+class StandingsSimulatorTest(SeasonStandingsTestCase):
+    """Projected standings layer hypothetical results over stored ones"""
+
+    def setUp(self):
+        super().setUp()
+        full_recompute()
+
+    def test_no_hypotheticals_matches_stored(self):
+        projection = StandingsSimulator("2024").simulate(
+            teams=[team.id for team in self.teams],
+            debaters=[debater.id for debater in self.speakers],
+        )
+
+        for row in projection["toty"] + projection["soty"]:
+            self.assertEqual(row["current"], row["projected"])
+
+        for row in projection["qual"]:
+            if row["current"] is not None:
+                self.assertEqual(row["current"]["points"], row["projected"]["points"])
+
+    def test_hypothetical_win(self):
+        counts = [
+            model.objects.count()
+            for model in (TOTY, SOTY, TeamResult, QUAL, QualPoints)
+        ]
+
+        projection = StandingsSimulator("2024").simulate(
+            team_results=[
+                {
+                    "team": self.teams[1].id,
+                    "place": 1,
+                    "num_teams": 100,
+                    "autoqual_bar": 2,
+                }
+            ],
+            speaker_results=[
+                {"debater": self.speakers[5].id, "place": 1, "num_teams": 100}
+            ],
+        )
+
+        (team,) = projection["toty"]
+        self.assertEqual(team["projected"]["place"], 1)
+        self.assertGreater(team["projected"]["points"], team["current"]["points"])
+
+        (speaker,) = projection["soty"]
+        self.assertGreater(speaker["projected"]["points"], 0)
+
+        members = set(self.teams[1].debaters.values_list("id", flat=True))
+        self.assertTrue(
+            all(
+                row["projected"]["qualled"]
+                for row in projection["qual"]
+                if row["debater"] in members
+            )
+        )
+        self.assertEqual(
+            counts,
+            [
+                model.objects.count()
+                for model in (TOTY, SOTY, TeamResult, QUAL, QualPoints)
+            ],
+        )
+
+    def test_replaces_result_at_same_tournament(self):
+        result = TeamResult.objects.get(
+            tournament=self.tournaments[2], team=self.teams[2]
+        )
+
+        projection = StandingsSimulator("2024").simulate(
+            team_results=[
+                {
+                    "team": self.teams[2].id,
+                    "place": result.place,
+                    "ghost_points": result.ghost_points,
+                    "tournament": self.tournaments[2].id,
+                }
+            ]
+        )
+
+        (team,) = projection["toty"]
+        self.assertEqual(team["current"], team["projected"])
+
+    def test_replaced_results_can_lose_points_qual(self):
+        projection = StandingsSimulator("2024").simulate(
+            team_results=[
+                {"team": self.teams[1].id, "place": -1, "tournament": tournament.id}
+                for tournament in self.tournaments
+            ]
+        )
+
+        members = set(self.teams[1].debaters.values_list("id", flat=True))
+        rows = [row for row in projection["qual"] if row["debater"] in members]
+        self.assertEqual(len(rows), 2)
+        for row in rows:
+            self.assertTrue(row["current"]["qualled"])
+            self.assertFalse(row["projected"]["qualled"])
+
+    @override_settings(ONLINE_SEASONS=("2024",))
+    def test_online_season_qualifies_on_online_points(self):
+        full_recompute()
+
+        def qualled(entry):
+            projection = StandingsSimulator("2024").simulate(
+                team_results=[dict(entry, team=self.teams[1].id)]
+            )
+            return [row["projected"]["qualled"] for row in projection["qual"]]
+
+        self.assertFalse(any(qualled({"place": 1, "num_teams": 100})))
+        self.assertTrue(
+            all(qualled({"place": 2, "num_teams": 8, "online_qual_points": True}))
+        )
+
+    def test_unknown_tournament(self):
+        with self.assertRaises(SimulationError):
+            StandingsSimulator("2024").simulate(
+                team_results=[{"team": self.teams[0].id, "place": 1, "tournament": 0}]
+            )
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_baseline_is_reused_until_rerank(self):
+        baseline = season_baseline("2024")
+
+        with self.assertNumQueries(0):
+            self.assertIs(season_baseline("2024"), baseline)
+
+        clear_rankings_cache("2024", "toty")
+        self.assertIsNot(season_baseline("2024"), baseline)
+
+    def test_endpoint(self):
+        url = reverse("core:standings_simulate")
+        body = json.dumps({"team_results": []})
+
+        response = self.client.post(url, body, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+        user = get_user_model().objects.create_superuser(
+            username="director", email="director@example.com", password="password"
+        )
+
+        csrf_client = Client(enforce_csrf_checks=True)
+        csrf_client.force_login(user)
+        response = csrf_client.post(url, body, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_login(user)
+        response = self.client.post(
+            url,
+            json.dumps(
+                {
+                    "team_results": [
+                        {"team": self.teams[1].id, "place": 1, "num_teams": 64}
+                    ]
+                }
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["toty"][0]["team"], self.teams[1].id)
+
+        response = self.client.post(url, "{", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            url,
+            json.dumps({"team_results": [{"place": 1}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,999 @@
+"""
+Tests for the season-level standings engines
+"""
+
+from datetime import date
+from io import StringIO
+
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import CommandError, call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.admin import TOTYReaffAdmin
+from core.models import QUAL, Debater, QualPoints, Reaff, School, Team, Tournament
+from core.models.results.speaker import SpeakerResult
+from core.models.results.team import TeamResult
+from core.models.standings.coty import COTY
+from core.models.standings.noty import NOTY
+from core.models.standings.online_qual import OnlineQUAL
+from core.models.standings.soty import SOTY
+from core.models.standings.toty import TOTY, TOTYReaff
+from core.utils import rankings
+from core.utils.standings import (
+    DirtySet,
+    compute_soty,
+    compute_toty,
+    score_season,
+    update_season_soty,
+    update_season_speakers,
+    update_season_standings,
+    update_season_toty,
+)
+from core.utils.standings.columns import group_markers
+from core.utils.standings.common import top_markers
+from core.utils.standings.diff import diff_counts, diff_season
+from core.utils.standings.dirty import affected_range
+from core.utils.points import team_points_for_size
+from core.utils.standings.prerender import (
+    FRAGMENTS,
+    index_request,
+    prerender_fragment,
+    standings_context,
+)
+from core.utils.standings.quals import update_season_quals
+from core.utils.standings.reaffs import season_reaffs
+from core.utils.standings.verify import verify_season
+
+
+def standing_rows(model, owner_field):
+    return {
+        getattr(row, f"{owner_field}_id"): (
+            row.points,
+            row.marker_one,
+            row.marker_two,
+            row.marker_three,
+            row.marker_four,
+            row.marker_five,
+            row.tournament_one_id,
+            row.tournament_two_id,
+            row.tournament_three_id,
+        )
+        for row in model.objects.filter(season="2024")
+    }
+
+
+class SeasonStandingsTestCase(TestCase):
+    """Builds a small season with reaffs, hybrids and excluded schools"""
+
+    def setUp(self):
+        # Reaff indexes are cached by season and ids are reused between tests
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.school = School.objects.create(name="Test School")
+        self.other_school = School.objects.create(name="Other School")
+        self.excluded_school = School.objects.create(
+            name="Excluded School", included_in_oty=False
+        )
+
+        self.tournaments = [
+            Tournament.objects.create(
+                host=self.school,
+                date=date(2024, 10 + i, 1),
+                season="2024",
+                num_teams=24 + 16 * i,
+                num_novice_debaters=20,
+            )
+            for i in range(3)
+        ]
+
+        self.debaters = {}
+        for school in (self.school, self.other_school, self.excluded_school):
+            for i in range(6):
+                self.debaters[(school.id, i)] = Debater.objects.create(
+                    first_name=f"First{i}", last_name=f"Last{i}", school=school
+                )
+
+        self.teams = [
+            self.make_team(self.school, 0, self.school, 1),
+            self.make_team(self.school, 2, self.school, 3),
+            self.make_team(self.other_school, 0, self.other_school, 1),
+            self.make_team(self.school, 4, self.other_school, 2),
+            self.make_team(self.excluded_school, 0, self.excluded_school, 1),
+            self.make_team(self.school, 0, self.school, 5),
+        ]
+
+        places = [
+            (0, [1, 4, 9]),
+            (1, [2, 2, -1]),
+            (2, [3, 1, 5]),
+            (3, [4, 3, 2]),
+            (4, [5, 5, 1]),
+            (5, [6, 6, 3]),
+        ]
+
+        for team_index, team_places in places:
+            for tournament, place in zip(self.tournaments, team_places):
+                TeamResult.objects.create(
+                    tournament=tournament,
+                    team=self.teams[team_index],
+                    type_of_place=Debater.VARSITY,
+                    place=place,
+                    ghost_points=place == 5,
+                )
+
+        TOTYReaff.objects.create(
+            season="2024",
+            old_team=self.teams[0],
+            new_team=self.teams[5],
+            reaff_date=date(2024, 12, 1),
+        )
+
+        Tournament.objects.filter(id=self.tournaments[0].id).update(noty=True)
+        self.tournaments[0].refresh_from_db()
+
+        speakers = list(self.debaters.values())
+        for i, tournament in enumerate(self.tournaments):
+            for place in range(1, 9):
+                SpeakerResult.objects.create(
+                    tournament=tournament,
+                    debater=speakers[(place * (i + 1)) % len(speakers)],
+                    type_of_place=Debater.VARSITY,
+                    place=place,
+                    tie=place == 4,
+                )
+            for place in range(1, 4):
+                SpeakerResult.objects.create(
+                    tournament=tournament,
+                    debater=speakers[place + i],
+                    type_of_place=Debater.NOVICE,
+                    place=place,
+                )
+
+        Reaff.objects.create(
+            season="2024",
+            old_debater=speakers[2],
+            new_debater=speakers[3],
+            reaff_date=date(2024, 12, 1),
+        )
+        self.speakers = speakers
+
+    def make_team(self, school_one, index_one, school_two, index_two):
+        team = Team.objects.create(name="Team")
+        team.debaters.add(
+            self.debaters[(school_one.id, index_one)],
+            self.debaters[(school_two.id, index_two)],
+        )
+        return team
+
+
+class SeasonTOTYEngineTest(SeasonStandingsTestCase):
+    """The season TOTY engine matches the per-team update_toty path"""
+
+    def test_matches_per_team_path(self):
+        for team in Team.objects.all():
+            rankings.update_toty(team, season="2024")
+        expected = standing_rows(TOTY, "team")
+
+        TOTY.objects.all().delete()
+        update_season_toty("2024")
+
+        self.assertEqual(standing_rows(TOTY, "team"), expected)
+
+    def test_reaff_and_exclusions(self):
+        standings = compute_toty("2024")
+
+        self.assertEqual(standings[self.teams[0].id], [])
+        self.assertEqual(standings[self.teams[4].id], [])
+        self.assertNotIn(self.teams[3].id, standings)
+        self.assertEqual(len(standings[self.teams[5].id]), 5)
+
+    def test_rerun_is_a_no_op(self):
+        update_season_toty("2024")
+        summary = update_season_toty("2024")
+
+        self.assertEqual(summary, {"created": 0, "updated": 0, "deleted": 0})
+
+    def test_stale_rows_are_removed(self):
+        update_season_toty("2024")
+        TeamResult.objects.filter(team=self.teams[1]).delete()
+
+        update_season_toty("2024")
+
+        self.assertFalse(TOTY.objects.filter(team=self.teams[1]).exists())
+
+
+@override_settings(LAST_NOTY_SEASON=2025)
+class SeasonSpeakerEngineTest(SeasonStandingsTestCase):
+    """The season SOTY/NOTY engine matches update_soty and update_noty"""
+
+    def test_matches_per_debater_path(self):
+        for debater in Debater.objects.all():
+            rankings.update_soty(debater, season="2024")
+        for debater in Debater.objects.all():
+            rankings.update_noty(debater, season="2024")
+        expected_soty = standing_rows(SOTY, "debater")
+        expected_noty = standing_rows(NOTY, "debater")
+
+        SOTY.objects.all().delete()
+        NOTY.objects.all().delete()
+        update_season_speakers("2024")
+
+        self.assertTrue(expected_noty)
+        self.assertEqual(standing_rows(SOTY, "debater"), expected_soty)
+        self.assertEqual(standing_rows(NOTY, "debater"), expected_noty)
+
+    def test_reaff_merges_old_debater(self):
+        standings = compute_soty("2024")
+
+        self.assertEqual(standings[self.speakers[2].id], [])
+        merged = {marker[2] for marker in standings[self.speakers[3].id]}
+        old_results = set(
+            SpeakerResult.objects.filter(
+                debater=self.speakers[2], type_of_place=Debater.VARSITY
+            ).values_list("id", flat=True)
+        )
+        self.assertTrue(old_results & merged)
+
+    @override_settings(LAST_NOTY_SEASON=2020)
+    def test_noty_skipped_after_last_noty_season(self):
+        summary = update_season_speakers("2024")
+
+        self.assertEqual(summary["noty"], {"created": 0, "updated": 0, "deleted": 0})
+        self.assertFalse(NOTY.objects.exists())
+
+
+class ReaffIndexTest(SeasonStandingsTestCase):
+    """Season reaffs are resolved in memory, chains included"""
+
+    def test_chain_merges_every_step(self):
+        Reaff.objects.create(
+            season="2024",
+            old_debater=self.speakers[3],
+            new_debater=self.speakers[4],
+            reaff_date=date(2025, 1, 1),
+        )
+
+        reaffs = season_reaffs("debater", "2024")
+        self.assertTrue(reaffs.is_reaffed(self.speakers[2].id))
+        self.assertEqual(
+            set(reaffs.sources(self.speakers[4].id)),
+            {self.speakers[2].id, self.speakers[3].id},
+        )
+
+        standings = compute_soty("2024", debater_ids=[self.speakers[2].id])
+        self.assertEqual(standings[self.speakers[2].id], [])
+        self.assertEqual(standings[self.speakers[3].id], [])
+
+        merged = {marker[2] for marker in standings[self.speakers[4].id]}
+        self.assertTrue(
+            merged
+            <= set(
+                SpeakerResult.objects.filter(
+                    debater__in=self.speakers[2:5], type_of_place=Debater.VARSITY
+                ).values_list("id", flat=True)
+            )
+        )
+
+        for debater in Debater.objects.all():
+            rankings.update_soty(debater, season="2024")
+        expected = standing_rows(SOTY, "debater")
+
+        SOTY.objects.all().delete()
+        update_season_soty("2024")
+
+        self.assertEqual(standing_rows(SOTY, "debater"), expected)
+
+    def test_loaded_once_until_edited(self):
+        season_reaffs("team", "2024")
+
+        with self.assertNumQueries(0):
+            reaffs = season_reaffs("team", "2024")
+        self.assertTrue(reaffs.is_reaffed(self.teams[0].id))
+
+        TOTYReaff.objects.get().delete()
+        self.assertFalse(season_reaffs("team", "2024"))
+
+        reaff = TOTYReaff.objects.create(
+            season="2024",
+            old_team=self.teams[1],
+            new_team=self.teams[5],
+            reaff_date=date(2024, 12, 1),
+        )
+        self.assertTrue(season_reaffs("team", "2024").is_reaffed(self.teams[1].id))
+
+        reaff.delete()
+        self.assertFalse(season_reaffs("team", "2024"))
+
+    def test_bulk_and_cascade_deletes_invalidate(self):
+        self.assertTrue(season_reaffs("debater", "2024"))
+        Reaff.objects.filter(season="2024").delete()
+        self.assertFalse(season_reaffs("debater", "2024"))
+
+        self.assertTrue(season_reaffs("team", "2024"))
+        self.teams[0].delete()
+        self.assertFalse(season_reaffs("team", "2024"))
+
+
+@override_settings(LAST_NOTY_SEASON=2025)
+class ColumnarScoringTest(SeasonStandingsTestCase):
+    """The columnar season pipeline lands on the same standings"""
+
+    def test_matches_season_engines(self):
+        update_season_toty("2024")
+        update_season_speakers("2024")
+        expected = [
+            standing_rows(model, owner)
+            for model, owner in ((TOTY, "team"), (SOTY, "debater"), (NOTY, "debater"))
+        ]
+
+        TOTY.objects.all().delete()
+        SOTY.objects.all().delete()
+        NOTY.objects.all().delete()
+        update_season_standings("2024")
+
+        self.assertEqual(
+            [
+                standing_rows(model, owner)
+                for model, owner in (
+                    (TOTY, "team"),
+                    (SOTY, "debater"),
+                    (NOTY, "debater"),
+                )
+            ],
+            expected,
+        )
+
+    def test_grouped_top_k_matches_top_markers(self):
+        owners = [1, 2, 1, 1, 2, 1, 1]
+        points = [3, 5, 7, 3, 5, 0, 7]
+        result_ids = [10, 11, 12, 13, 14, 15, 16]
+
+        columns = {"team_id": owners, "tournament_id": result_ids, "id": result_ids}
+        grouped = group_markers(columns, "team_id", points, [True] * 7, 3)
+
+        for owner in (1, 2):
+            markers = [
+                (point, result_id, result_id)
+                for o, point, result_id in zip(owners, points, result_ids)
+                if o == owner
+            ]
+            self.assertEqual(grouped[owner], top_markers(markers, 3))
+
+    def test_qual_markers_cover_every_result(self):
+        scored = score_season("2024")
+
+        self.assertEqual(
+            sum(len(markers) for markers in scored["qual"].values()),
+            TeamResult.objects.filter(
+                tournament__season="2024",
+                tournament__qual=True,
+                type_of_place=Debater.VARSITY,
+            ).count(),
+        )
+
+
+@override_settings(
+    SEASONS=(("2024", "2024-2025"),),
+    ONLINE_SEASONS=("2020", "2021"),
+    LAST_NOTY_SEASON=2025,
+)
+class RedoRankingsTest(SeasonStandingsTestCase):
+    """redo_rankings places standings in one pass with competition ranking"""
+
+    def test_places_and_ties(self):
+        points = [10, 8, 8, 5, 0, 5, 5, 3]
+        rows = [
+            TOTY.objects.create(season="2024", team=self.teams[i % 6], points=p)
+            for i, p in enumerate(points)
+        ]
+
+        rankings.redo_rankings(TOTY.objects.filter(season="2024"), season="2024")
+
+        placed = {
+            row.id: (row.place, row.tied) for row in TOTY.objects.filter(season="2024")
+        }
+        self.assertNotIn(rows[4].id, placed)
+        self.assertEqual(placed[rows[0].id], (1, False))
+        self.assertEqual(placed[rows[1].id], (2, True))
+        self.assertEqual(placed[rows[2].id], (2, True))
+        self.assertEqual(placed[rows[3].id], (4, True))
+        self.assertEqual(placed[rows[6].id], (4, True))
+        self.assertEqual(placed[rows[7].id], (7, False))
+
+    def test_assign_places(self):
+        placed = rankings.assign_places([9, 7, 7, 7, 2], points=lambda p: p)
+
+        self.assertEqual(
+            [(place, tied) for _, place, tied in placed],
+            [(1, False), (2, True), (2, True), (2, True), (5, False)],
+        )
+
+
+def full_recompute():
+    update_season_toty("2024")
+    update_season_speakers("2024")
+    for team in Team.objects.all():
+        rankings.update_qual_points(team, season="2024")
+    for model, cache_type in (
+        (TOTY, "toty"),
+        (SOTY, "soty"),
+        (NOTY, "noty"),
+        (COTY, "coty"),
+    ):
+        rankings.redo_rankings(
+            model.objects.filter(season="2024"),
+            season="2024",
+            cache_type=cache_type,
+        )
+
+
+def placed_rows(model, owner_field):
+    return {
+        getattr(row, f"{owner_field}_id"): (row.points, row.place, row.tied)
+        for row in model.objects.filter(season="2024")
+    }
+
+
+@override_settings(
+    CURRENT_SEASON="2024",
+    LAST_NOTY_SEASON=2025,
+    QUAL_BAR=11.5,
+    ONLINE_QUAL_BAR=10,
+    ONLINE_SEASONS=("2020", "2021"),
+)
+class DirtySetTest(SeasonStandingsTestCase):
+    """Incremental recomputes land on the same standings as a full one"""
+
+    def test_speaker_correction(self):
+        full_recompute()
+
+        result = SpeakerResult.objects.filter(
+            tournament=self.tournaments[2], type_of_place=Debater.VARSITY, place=8
+        ).first()
+        result.place = 9
+        result.save()
+
+        dirty = DirtySet("2024")
+        dirty.add_speaker_result(result)
+        dirty.recompute()
+        incremental = placed_rows(SOTY, "debater")
+
+        full_recompute()
+        self.assertEqual(incremental, placed_rows(SOTY, "debater"))
+
+    def test_team_correction(self):
+        full_recompute()
+
+        result = TeamResult.objects.get(
+            tournament=self.tournaments[0], team=self.teams[2]
+        )
+        result.delete()
+
+        dirty = DirtySet("2024")
+        dirty.add_team_result(result)
+        dirty.recompute()
+        incremental = (placed_rows(TOTY, "team"), placed_rows(COTY, "school"))
+
+        full_recompute()
+        self.assertEqual(
+            incremental, (placed_rows(TOTY, "team"), placed_rows(COTY, "school"))
+        )
+
+    def test_reaffed_correction(self):
+        full_recompute()
+
+        team_result = TeamResult.objects.get(
+            tournament=self.tournaments[0], team=self.teams[0]
+        )
+        team_result.delete()
+        speaker_result = SpeakerResult.objects.filter(debater=self.speakers[2]).first()
+        speaker_result.delete()
+
+        dirty = DirtySet("2024")
+        dirty.add_team_result(team_result)
+        dirty.add_speaker_result(speaker_result)
+        dirty.recompute()
+        incremental = (placed_rows(TOTY, "team"), placed_rows(SOTY, "debater"))
+
+        full_recompute()
+        self.assertEqual(
+            incremental, (placed_rows(TOTY, "team"), placed_rows(SOTY, "debater"))
+        )
+
+    def test_clean_set_does_nothing(self):
+        full_recompute()
+
+        with self.assertNumQueries(0):
+            DirtySet("2024").recompute()
+
+    def test_affected_range(self):
+        self.assertIsNone(affected_range({1: 5.0}, {1: 5.0}))
+        self.assertEqual(affected_range({1: 5.0, 2: 9.0}, {1: 7.0, 2: 9.0}), (5.0, 7.0))
+        self.assertEqual(affected_range({1: 5.0}, {}), (None, 5.0))
+
+    def test_admin_delete_recomputes(self):
+        update_season_toty("2024")
+        self.assertFalse(TOTY.objects.filter(team=self.teams[0]).exists())
+
+        TOTYReaffAdmin(TOTYReaff, AdminSite()).delete_queryset(
+            None, TOTYReaff.objects.all()
+        )
+
+        self.assertTrue(TOTY.objects.filter(team=self.teams[0]).exists())
+
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHE,
+    SEASONS=(("2024", "2024-2025"), ("2023", "2023-2024")),
+    ONLINE_SEASONS=("2020", "2021"),
+    LAST_NOTY_SEASON=2025,
+)
+class PrerenderTest(SeasonStandingsTestCase):
+    """Standings fragments are rendered straight into the index page's cache"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        update_season_toty("2024")
+        rankings.place_rankings(TOTY.objects.filter(season="2024"))
+
+    def test_matches_cache_tag_output(self):
+        html = prerender_fragment("2024", "toty")
+
+        cache.clear()
+        template = Template(
+            "{% load cache %}{% cache None toty current_season %}"
+            '{% include "core/standings/toty.html" %}{% endcache %}'
+        )
+        context = standings_context("2024")
+        context["request"] = index_request("2024")
+
+        self.assertEqual(template.render(Context(context)), html)
+        self.assertIn(self.teams[5].name, html)
+
+    def test_redo_rankings_warms_fragment(self):
+        rankings.redo_rankings(
+            TOTY.objects.filter(season="2024"), season="2024", cache_type="toty"
+        )
+
+        self.assertIsNotNone(cache.get(make_template_fragment_key("toty", ["2024"])))
+
+    def test_warm_command_covers_every_season(self):
+        call_command("warm_standings_cache", stdout=None)
+
+        for season in ("2024", "2023"):
+            for cache_type in FRAGMENTS:
+                key = make_template_fragment_key(cache_type, [season])
+                self.assertIsNotNone(cache.get(key))
+
+
+@override_settings(
+    CURRENT_SEASON="2024",
+    SEASONS=(("2024", "2024-2025"),),
+    LAST_NOTY_SEASON=2025,
+    QUAL_BAR=11.5,
+    ONLINE_QUAL_BAR=10,
+    ONLINE_SEASONS=("2020", "2021"),
+)
+class RecomputeStandingsCommandTest(SeasonStandingsTestCase):
+    """recompute_standings matches running the engines one by one"""
+
+    def test_matches_serial_recompute(self):
+        full_recompute()
+        expected = [
+            placed_rows(TOTY, "team"),
+            placed_rows(SOTY, "debater"),
+            placed_rows(COTY, "school"),
+        ]
+
+        TOTY.objects.all().delete()
+        SOTY.objects.all().delete()
+        COTY.objects.all().delete()
+        call_command(
+            "recompute_standings", seasons="all", split_types=True, stdout=StringIO()
+        )
+
+        self.assertEqual(
+            [
+                placed_rows(TOTY, "team"),
+                placed_rows(SOTY, "debater"),
+                placed_rows(COTY, "school"),
+            ],
+            expected,
+        )
+
+    def test_unknown_type(self):
+        with self.assertRaises(CommandError):
+            call_command("recompute_standings", types="toty,bogus")
+
+
+@override_settings(
+    CURRENT_SEASON="2024",
+    SEASONS=(("2024", "2024-2025"),),
+    LAST_NOTY_SEASON=2025,
+    QUAL_BAR=11.5,
+    ONLINE_QUAL_BAR=10,
+    ONLINE_SEASONS=("2020", "2021"),
+)
+class DryRunDiffTest(SeasonStandingsTestCase):
+    """A dry run reports what a recompute would change and writes nothing"""
+
+    def test_clean_season_has_no_diff(self):
+        full_recompute()
+
+        for name, diff in diff_season("2024").items():
+            self.assertEqual(
+                diff_counts(diff),
+                {"added": 0, "removed": 0, "points": 0, "place": 0},
+                name,
+            )
+
+    def test_reports_changes_without_writing(self):
+        full_recompute()
+        before = [
+            placed_rows(TOTY, "team"),
+            placed_rows(COTY, "school"),
+            set(QUAL.objects.values_list("debater_id", "qual_type")),
+        ]
+
+        TeamResult.objects.filter(team=self.teams[1]).delete()
+        TeamResult.objects.filter(
+            team=self.teams[2], tournament=self.tournaments[0]
+        ).update(place=2)
+
+        diffs = diff_season("2024")
+
+        self.assertIn(self.teams[1].id, [row[0] for row in diffs["toty"]["removed"]])
+        self.assertIn(self.teams[2].id, [row[0] for row in diffs["toty"]["points"]])
+        self.assertTrue(diffs["toty"]["place"])
+        self.assertTrue(
+            diffs["qual_points"]["points"] or diffs["qual_points"]["removed"]
+        )
+        self.assertTrue(diffs["coty"]["points"])
+
+        self.assertEqual(
+            [
+                placed_rows(TOTY, "team"),
+                placed_rows(COTY, "school"),
+                set(QUAL.objects.values_list("debater_id", "qual_type")),
+            ],
+            before,
+        )
+
+        full_recompute()
+        self.assertFalse(
+            any(diff_counts(diff_season("2024", ["toty"])["toty"]).values())
+        )
+
+    def test_command_dry_run(self):
+        full_recompute()
+        TeamResult.objects.filter(team=self.teams[1]).delete()
+        stdout = StringIO()
+
+        call_command("recompute_standings", dry_run=True, types="toty", stdout=stdout)
+
+        self.assertIn("2024 toty: 0 added, 1 removed", stdout.getvalue())
+        self.assertTrue(TOTY.objects.filter(team=self.teams[1]).exists())
+
+    def test_recompute_view_dry_run(self):
+        full_recompute()
+        TeamResult.objects.filter(team=self.teams[1]).delete()
+        get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        self.client.login(username="admin", password="password")
+
+        response = self.client.post(
+            reverse("core:rankings_recompute"),
+            {"season": "2024", "ranking_type": "toty", "dry_run": "1"},
+        )
+
+        data = response.json()
+        self.assertTrue(data["dry_run"])
+        self.assertEqual(data["counts"]["removed"], 1)
+        self.assertTrue(TOTY.objects.filter(team=self.teams[1]).exists())
+
+
+@override_settings(
+    CURRENT_SEASON="2024",
+    SEASONS=(("2024", "2024-2025"),),
+    LAST_NOTY_SEASON=2025,
+    QUAL_BAR=11.5,
+    ONLINE_QUAL_BAR=10,
+    ONLINE_SEASONS=("2020", "2021"),
+)
+class VerifyStandingsTest(SeasonStandingsTestCase):
+    """The verifier compares stored standings with a full recompute"""
+
+    def test_recomputed_season_verifies(self):
+        full_recompute()
+
+        report = verify_season("2024")
+
+        self.assertEqual(
+            list(report), ["toty", "soty", "noty", "coty", "qual_points", "qual"]
+        )
+        for name, mismatches in report.items():
+            self.assertEqual(mismatches, [], name)
+
+    def test_reports_each_drifted_row(self):
+        full_recompute()
+        toty = TOTY.objects.filter(season="2024").order_by("place").first()
+        TOTY.objects.filter(id=toty.id).update(marker_one=toty.marker_one + 1)
+        QualPoints.objects.filter(season="2024").first().delete()
+        stale = self.debaters[(self.other_school.id, 5)]
+        SOTY.objects.create(season="2024", debater=stale, points=3, place=99)
+
+        report = verify_season("2024")
+
+        self.assertEqual(
+            report["toty"],
+            [
+                {
+                    "owner": toty.team_id,
+                    "problem": "different",
+                    "fields": {"marker_one": (toty.marker_one + 1, toty.marker_one)},
+                }
+            ],
+        )
+        self.assertEqual([m["problem"] for m in report["qual_points"]], ["missing"])
+        self.assertIn(
+            {"owner": stale.id, "problem": "unexpected"},
+            [{"owner": m["owner"], "problem": m["problem"]} for m in report["soty"]],
+        )
+
+    def test_command_fails_on_mismatch(self):
+        full_recompute()
+        stdout = StringIO()
+        call_command("verify_standings", stdout=stdout)
+        self.assertIn("0 mismatched rows", stdout.getvalue())
+
+        TOTY.objects.filter(season="2024").update(points=1)
+        with self.assertRaises(CommandError):
+            call_command("verify_standings", standings="toty", stdout=StringIO())
+
+
+@override_settings(
+    CURRENT_SEASON="2024",
+    QUAL_BAR=11.5,
+    ONLINE_QUAL_BAR=20,
+    ONLINE_SEASONS=("2024",),
+)
+class OnlineQualEngineTest(SeasonStandingsTestCase):
+    """The season qual engine also builds OnlineQUAL in online seasons"""
+
+    def setUp(self):
+        super().setUp()
+        Tournament.objects.filter(
+            id__in=[self.tournaments[0].id, self.tournaments[1].id]
+        ).update(online_qual_points=True)
+
+    def expected_points(self, debater):
+        points = sorted(
+            (
+                result.tournament.get_online_qual_points(result.place)
+                for result in TeamResult.objects.filter(
+                    tournament__season="2024", team__debaters=debater
+                )
+            ),
+            reverse=True,
+        )
+        return sum(points[:6])
+
+    def test_online_quals_match_results(self):
+        update_season_quals("2024")
+
+        online_quals = {
+            online_qual.debater_id: online_qual
+            for online_qual in OnlineQUAL.objects.filter(season="2024")
+        }
+        self.assertTrue(online_quals)
+
+        points_qualled = set(
+            QUAL.objects.filter(season="2024", qual_type=QUAL.POINTS).values_list(
+                "debater_id", flat=True
+            )
+        )
+
+        for debater in self.debaters.values():
+            if debater.school == self.excluded_school:
+                self.assertNotIn(debater.id, online_quals)
+                continue
+
+            if not TeamResult.objects.filter(team__debaters=debater).exists():
+                self.assertNotIn(debater.id, online_quals)
+                continue
+
+            points = self.expected_points(debater)
+            self.assertEqual(online_quals[debater.id].points, points)
+            self.assertEqual(debater.id in points_qualled, points >= 20)
+
+        self.assertTrue(points_qualled)
+        self.assertLess(len(points_qualled), len(online_quals))
+
+    def test_stale_rows_are_removed(self):
+        debater = self.debaters[(self.other_school.id, 5)]
+        OnlineQUAL.objects.create(season="2024", debater=debater, points=15)
+
+        update_season_quals("2024")
+        summary = update_season_quals("2024")
+
+        self.assertFalse(OnlineQUAL.objects.filter(debater=debater).exists())
+        self.assertEqual(
+            summary["online_qual"], {"created": 0, "updated": 0, "deleted": 0}
+        )
+
+    def test_team_update_matches_season(self):
+        update_season_quals("2024")
+        expected = standing_rows(OnlineQUAL, "debater")
+
+        OnlineQUAL.objects.all().delete()
+        for team in self.teams:
+            rankings.update_online_quals(team, season="2024")
+
+        self.assertEqual(standing_rows(OnlineQUAL, "debater"), expected)
+
+
+@override_settings(
+    CURRENT_SEASON="2024",
+    QUAL_BAR=11.5,
+    ONLINE_SEASONS=("2020", "2021"),
+)
+class SeasonQualEngineTest(SeasonStandingsTestCase):
+    """The season qual engine builds QUAL, QualPoints and COTY in one pass"""
+
+    def setUp(self):
+        super().setUp()
+        Tournament.objects.filter(id=self.tournaments[1].id).update(
+            autoqual_bar=2, qual_type=QUAL.NORTHAMS
+        )
+
+    def test_autoquals_points_and_coty(self):
+        update_season_quals("2024")
+
+        autoqualled = set(
+            QUAL.objects.filter(
+                season="2024",
+                qual_type=QUAL.NORTHAMS,
+                tournament=self.tournaments[1],
+            ).values_list("debater_id", flat=True)
+        )
+        expected = set(
+            Team.debaters.through.objects.filter(
+                team__team_results__tournament=self.tournaments[1],
+                team__team_results__place__in=[1, 2],
+            )
+            .exclude(debater__school=self.excluded_school)
+            .values_list("debater_id", flat=True)
+        )
+        self.assertTrue(expected)
+        self.assertEqual(autoqualled, expected)
+
+        debater = self.debaters[(self.school.id, 2)]
+        self.assertEqual(
+            QualPoints.objects.get(season="2024", debater=debater).points,
+            sum(
+                team_points_for_size(
+                    result.tournament.num_teams, result.place, result.ghost_points
+                )
+                for result in TeamResult.objects.filter(team__debaters=debater)
+            ),
+        )
+
+        for coty in COTY.objects.filter(season="2024"):
+            points = sum(
+                min(60, qual_points.points)
+                for qual_points in QualPoints.objects.filter(
+                    season="2024", debater__school=coty.school
+                )
+            )
+            qualled = (
+                QUAL.objects.filter(season="2024", debater__school=coty.school)
+                .values("debater")
+                .distinct()
+                .count()
+            )
+            self.assertEqual(coty.points, points + 6 * qualled)
+
+        self.assertFalse(
+            QualPoints.objects.filter(debater__school=self.excluded_school).exists()
+        )
+        self.assertFalse(COTY.objects.filter(school=self.excluded_school).exists())
+
+    def test_rerun_only_writes_changes(self):
+        update_season_quals("2024")
+        summary = update_season_quals("2024")
+
+        for counts in summary.values():
+            self.assertEqual(counts, {"created": 0, "updated": 0, "deleted": 0})
+
+    def test_hand_entered_quals_are_kept(self):
+        debater = self.debaters[(self.school.id, 0)]
+        QUAL.objects.create(season="2024", debater=debater, qual_type=QUAL.WORLDS)
+
+        update_season_quals("2024")
+
+        self.assertTrue(
+            QUAL.objects.filter(debater=debater, qual_type=QUAL.WORLDS).exists()
+        )
+
+    def test_school_summary_is_a_single_read(self):
+        update_season_quals("2024")
+
+        with self.assertNumQueries(1):
+            summaries = list(rankings.get_qualled_debaters(self.school, "2024"))
+
+        expected = {
+            qual_points.debater_id: qual_points.points
+            for qual_points in QualPoints.objects.filter(
+                season="2024", debater__school=self.school
+            )
+        }
+        self.assertEqual(
+            {summary.debater_id: summary.points for summary in summaries}, expected
+        )
+        self.assertEqual(
+            [summary.points for summary in summaries],
+            sorted(expected.values(), reverse=True),
+        )
+
+        for summary in summaries:
+            qual_types = list(
+                QUAL.objects.filter(season="2024", debater=summary.debater)
+                .exclude(qual_type=QUAL.POINTS)
+                .order_by("id")
+            )
+            self.assertEqual(
+                summary.qual_types,
+                ", ".join(qual.get_qual_type_display() for qual in qual_types),
+            )
+            self.assertEqual(
+                summary.contribution,
+                min(66, summary.points + (6 if summary.qualled else 0)),
+            )
+
+    def test_hand_edits_refresh_summaries(self):
+        update_season_quals("2024")
+        debater = self.debaters[(self.school.id, 2)]
+
+        def summary(school):
+            return {
+                row.debater_id: (row.points, row.qual_types)
+                for row in rankings.get_qualled_debaters(school, "2024")
+            }.get(debater.id)
+
+        qual_points = QualPoints.objects.get(season="2024", debater=debater)
+        qual_points.points = 40
+        qual_points.save()
+        self.assertEqual(summary(self.school), (40, "NorthAms"))
+
+        QUAL.objects.create(season="2024", debater=debater, qual_type=QUAL.WORLDS)
+        self.assertEqual(summary(self.school), (40, "NorthAms, Worlds"))
+
+        debater.school = self.other_school
+        debater.save()
+        self.assertIsNone(summary(self.school))
+        self.assertEqual(summary(self.other_school), (40, "NorthAms, Worlds"))
+
+        qual_points.delete()
+        for qual in QUAL.objects.filter(debater=debater):
+            qual.delete()
+        self.assertIsNone(summary(self.other_school))
+
+    @override_settings(CURRENT_SEASON="2025")
+    def test_past_seasons_are_never_pruned(self):
+        debater = self.debaters[(self.other_school.id, 5)]
+        QualPoints.objects.create(season="2024", debater=debater, points=3)
+
+        update_season_quals("2024")
+
+        self.assertTrue(QualPoints.objects.filter(debater=debater).exists())
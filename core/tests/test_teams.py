@@ -0,0 +1,135 @@
+"""
+Tests for team pair keys and bulk team lookup
+"""
+
+from importlib import import_module
+
+from django.apps import apps
+
+from core.forms import TeamForm
+from core.models import Debater, Round, TeamResult, TOTYReaff
+from core.models.team import Team
+from core.tests.test_standings import SeasonStandingsTestCase
+from core.utils.team import get_or_create_team_for_debaters, get_or_create_teams
+
+dedupe_teams = import_module("core.migrations.0050_team_pair_key").dedupe_teams
+
+
+def pair_key(*debaters):
+    return ":".join(str(debater.id) for debater in sorted(debaters, key=lambda d: d.id))
+
+
+class TeamPairKeyTest(SeasonStandingsTestCase):
+    """Teams are found and created by the canonical key of their debaters"""
+
+    def test_keys_follow_debater_changes(self):
+        team = self.teams[0]
+        one, two = team.debaters.order_by("id")
+        self.assertEqual(team.pair_key, pair_key(one, two))
+
+        team.debaters.remove(two)
+        self.assertIsNone(Team.objects.get(id=team.id).pair_key)
+
+        other = self.debaters[(self.other_school.id, 5)]
+        other.teams.add(team)
+        self.assertEqual(Team.objects.get(id=team.id).pair_key, pair_key(one, other))
+
+        other.teams.clear()
+        self.assertIsNone(Team.objects.get(id=team.id).pair_key)
+
+    def test_intermediate_steps_leave_iron_man_keys_alone(self):
+        one, two = self.teams[1].debaters.order_by("id")
+        iron_man = get_or_create_team_for_debaters(one, one)
+        other = self.debaters[(self.other_school.id, 5)]
+
+        self.teams[1].debaters.set([one, other])
+        self.assertEqual(
+            Team.objects.get(id=self.teams[1].id).pair_key, pair_key(one, other)
+        )
+
+        team = Team.objects.create(name="Team")
+        team.debaters.add(one)
+        team.debaters.add(two)
+        self.assertEqual(team.pair_key, pair_key(one, two))
+
+        self.assertEqual(Team.objects.get(id=iron_man.id).pair_key, pair_key(one, one))
+        spare = self.debaters[(self.other_school.id, 3)]
+        iron_man.debaters.add(spare)
+        iron_man.debaters.remove(spare)
+        self.assertIsNone(Team.objects.get(id=iron_man.id).pair_key)
+
+    def test_existing_teams_in_one_query(self):
+        pairs = [tuple(team.debaters.order_by("-id")) for team in self.teams]
+
+        with self.assertNumQueries(1):
+            found = get_or_create_teams(pairs)
+
+        self.assertEqual(found, self.teams)
+
+    def test_missing_teams_are_bulk_created(self):
+        school, other = self.school.id, self.other_school.id
+        new_pair = (self.debaters[(other, 4)], self.debaters[(school, 3)])
+        iron_man = self.debaters[(other, 5)]
+
+        found = get_or_create_teams(
+            [new_pair, self.teams[1].debaters.all(), new_pair[::-1], (iron_man,) * 2]
+        )
+
+        self.assertEqual(found[0], found[2])
+        self.assertEqual(found[1], self.teams[1])
+        self.assertEqual(set(found[0].debaters.all()), set(new_pair))
+        self.assertEqual(found[0].name, "Test School / Other School LL")
+        self.assertEqual(list(found[3].debaters.all()), [iron_man])
+        self.assertEqual(found[3].pair_key, pair_key(iron_man, iron_man))
+
+        self.assertEqual(get_or_create_team_for_debaters(iron_man, iron_man), found[3])
+
+    def test_migration_merges_duplicates(self):
+        original = self.teams[2]
+        debaters = list(original.debaters.all())
+
+        # Written around the through table so no key is set, as before the
+        # migration
+        duplicate = Team.objects.create(name="Duplicate")
+        Team.debaters.through.objects.bulk_create(
+            [
+                Team.debaters.through(team_id=duplicate.id, debater_id=debater.id)
+                for debater in debaters
+            ]
+        )
+        Team.objects.update(pair_key=None)
+
+        result = TeamResult.objects.create(
+            tournament=self.tournaments[0],
+            team=duplicate,
+            type_of_place=Debater.NOVICE,
+            place=1,
+        )
+        round = Round.objects.create(
+            tournament=self.tournaments[0], gov=duplicate, opp=self.teams[3]
+        )
+        reaff = TOTYReaff.objects.create(
+            season="2024",
+            old_team=duplicate,
+            new_team=self.teams[4],
+            reaff_date=self.tournaments[0].date,
+        )
+
+        dedupe_teams(apps, None)
+
+        self.assertFalse(Team.objects.filter(id=duplicate.id).exists())
+        self.assertEqual(TeamResult.objects.get(id=result.id).team, original)
+        self.assertEqual(Round.objects.get(id=round.id).gov, original)
+        self.assertEqual(TOTYReaff.objects.get(id=reaff.id).old_team, original)
+        self.assertEqual(
+            dict(Team.objects.values_list("id", "pair_key")),
+            {team.id: pair_key(*team.debaters.all()) for team in Team.objects.all()},
+        )
+
+    def test_form_rejects_duplicate_pair(self):
+        debaters = [debater.id for debater in self.teams[3].debaters.all()]
+
+        self.assertFalse(TeamForm(data={"debaters": debaters}).is_valid())
+        self.assertTrue(
+            TeamForm(data={"debaters": debaters}, instance=self.teams[3]).is_valid()
+        )
@@ -125,53 +125,6 @@ class TemplateTagExecutionTest(TestCase):
         result = range_filter(10, 12)
         self.assertEqual(list(result), [10, 11])
 
-    def test_qual_display_filter_execution(self):
-        """Test qual_display filter execution"""
-        from core.templatetags.tags import qual_display
-
-        # Mock debater with quals
-        debater = Mock()
-        qual1 = Mock()
-        qual1.get_qual_type_display.return_value = "National"
-        qual1.qual_type = 1
-
-        qual2 = Mock()
-        qual2.get_qual_type_display.return_value = "Regional"
-        qual2.qual_type = 2
-
-        qual3 = Mock()  # This one should be filtered out
-        qual3.get_qual_type_display.return_value = "None"
-        qual3.qual_type = 0
-
-        quals_manager = Mock()
-        quals_manager.filter.return_value.all.return_value = [qual1, qual2, qual3]
-        debater.quals = quals_manager
-
-        result = qual_display(debater, "2024")
-        self.assertEqual(result, "National, Regional")
-
-    def test_qual_contribution_filter_execution(self):
-        """Test qual_contribution filter execution"""
-        from core.templatetags.tags import qual_contribution
-
-        # Test without qual
-        debater = Mock()
-        debater.points = 40
-        debater.qualled = False
-
-        result = qual_contribution(debater, "2024")
-        self.assertEqual(result, 40)
-
-        # Test with qual
-        debater.qualled = True
-        result = qual_contribution(debater, "2024")
-        self.assertEqual(result, 46)  # 40 + 6
-
-        # Test cap at 66
-        debater.points = 65
-        result = qual_contribution(debater, "2024")
-        self.assertEqual(result, 66)  # min(65 + 6, 66)
-
     @patch("core.templatetags.tags.get_qualled_debaters")
     def test_relevant_debaters_filter_execution(self, mock_get_relevant):
         """Test relevant_debaters filter execution"""
@@ -255,8 +208,6 @@ def test_template_tag_registration():
     assert "opponent" in register.filters
     assert "number" in register.filters
     assert "range_filter" in register.filters
-    assert "qual_display" in register.filters
-    assert "qual_contribution" in register.filters
     assert "relevant_debaters" in register.filters
     assert "partner_display" in register.filters
     assert "partner_name" in register.filters
@@ -272,8 +223,6 @@ def test_all_template_filters_callable():
         opponent_side,
         number,
         range_filter,
-        qual_display,
-        qual_contribution,
         relevant_debaters,
         partner_display,
         partner_name,
@@ -287,8 +236,6 @@ def test_all_template_filters_callable():
         opponent_side,
         number,
         range_filter,
-        qual_display,
-        qual_contribution,
         relevant_debaters,
         partner_display,
         partner_name,
@@ -7,6 +7,7 @@ from core.views import (
     noty_views,
     round_views,
     school_views,
+    simulator_views,
     soty_views,
     team_views,
     toty_views,
@@ -183,6 +184,11 @@ urlpatterns = [
     path("core/toty", toty_views.TOTYListView.as_view(), name="toty"),
     path("core/noty", noty_views.NOTYListView.as_view(), name="noty"),
     path("core/coty", coty_views.COTYListView.as_view(), name="coty"),
+    path(
+        "core/standings/simulate",
+        simulator_views.StandingsSimulatorView.as_view(),
+        name="standings_simulate",
+    ),
     path("core/admin-tools/", admin_views.AdminToolsView.as_view(), name="admin_tools"),
     path(
         "core/mittab-dashboard/",
@@ -1,32 +1,38 @@
 import json
 import math
+import pickle
+from datetime import timedelta
+from decimal import Decimal
 
-from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 
 from core.models.debater import Debater
-from core.models.results.speaker import SpeakerResult
-from core.models.results.team import TeamResult
+from core.models.import_payload import ImportPayload
 from core.models.round import Round, RoundStats
-from core.models.school import School, SchoolLookup
-from core.models.standings.coty import COTY
-from core.models.standings.noty import NOTY
-from core.models.standings.online_qual import OnlineQUAL
-from core.models.standings.soty import SOTY
-from core.models.standings.toty import TOTY
-from core.models.team import Team
-from core.utils.rankings import (
-    redo_rankings,
-    update_noty,
-    update_online_quals,
-    update_qual_points,
-    update_soty,
-    update_toty,
+from core.models.school import School
+from core.utils.reconcile import (
+    SchoolResolver,
+    invalidate_school_aliases,
+    match_debaters,
+    save_aliases,
 )
-from core.utils.team import get_or_create_team_for_debaters
+from core.utils.results import sync_speaker_results, sync_team_results
+from core.utils.standings import DirtySet
+from core.utils.standings.common import BATCH_SIZE, chunked
+from core.utils.team import get_or_create_teams
 
 CREATE = 0
 LINK = 1
 
+PAYLOAD_CACHE_TIMEOUT = 60 * 60
+# memcached refuses values over 1 MB (less some room for the key and
+# headers); larger payloads are parsed again on every request instead
+PAYLOAD_CACHE_MAX_SIZE = 1000 * 1000
+PAYLOAD_RETENTION = timedelta(days=7)
+
+STAT_PLACES = Decimal("0.0001")
+
 
 def get_debaters(teams):
     to_return = []
@@ -43,6 +49,63 @@ def get_dict(_json):
     return json.loads(_json)
 
 
+def stage_payload(content, url=""):
+    """
+    Stores a fetched tab-server export once and returns its digest, which is
+    all the import wizard keeps in the session. Staged payloads older than
+    PAYLOAD_RETENTION are dropped.
+    """
+    if isinstance(content, bytes):
+        content = content.decode("utf-8")
+
+    digest = ImportPayload.digest_for(content)
+
+    ImportPayload.objects.filter(
+        created_at__lt=timezone.now() - PAYLOAD_RETENTION
+    ).delete()
+    ImportPayload.objects.get_or_create(
+        digest=digest, defaults={"url": url, "content": content}
+    )
+
+    return digest
+
+
+def index_payload(response):
+    return {
+        "response": response,
+        "schools": {school["id"]: school for school in response["schools"]},
+        "teams": {team["id"]: team for team in response["teams"]},
+        "debaters": {
+            debater["id"]: debater for debater in get_debaters(response["teams"])
+        },
+    }
+
+
+def load_payload(digest):
+    """
+    Returns the parsed payload with its schools, teams and debaters indexed by
+    tab-server id. Payloads never change under a digest, so the parsed form is
+    cached for the rest of the wizard run when it fits in
+    PAYLOAD_CACHE_MAX_SIZE.
+    """
+    key = f"import_payload:{digest}"
+    payload = cache.get(key)
+
+    if payload is None:
+        content = ImportPayload.objects.values_list("content", flat=True).get(
+            digest=digest
+        )
+        payload = index_payload(get_dict(content))
+
+        # The indexes share their dicts with the response, so this is about
+        # the size of the response itself
+        size = len(pickle.dumps(payload, pickle.HIGHEST_PROTOCOL))
+        if size <= PAYLOAD_CACHE_MAX_SIZE:
+            cache.set(key, payload, PAYLOAD_CACHE_TIMEOUT)
+
+    return payload
+
+
 def get_num_teams(teams_list, num_rounds=5):
     return len(
         [team for team in teams_list if team["num_rounds"] > math.ceil(num_rounds / 2)]
@@ -72,21 +135,13 @@ def clean_keys(d):
 
 
 def lookup_school(name):
-    school = School.objects.filter(name=name)
-
-    if school.exists():
-        return school.first()
-
-    lookup = SchoolLookup.objects.filter(server_name=name)
-
-    if lookup.exists():
-        return lookup.first().school
-
-    return None
+    return SchoolResolver().resolve([name]).get(name)
 
 
 def create_schools(school_actions):
     completed_actions = {}
+    aliases = {}
+    to_create = {}
 
     for key, action in school_actions.items():
         if "id" not in action:
@@ -94,45 +149,41 @@ def create_schools(school_actions):
 
         if action["action"] == LINK:
             completed_actions[key] = action["school"]
-
-            school = School.objects.get(id=action["school"])
-
-            if school.name == action["name"]:
-                continue
-
-            lookup = SchoolLookup.objects.filter(server_name=action["name"]).first()
-
-            if not lookup:
-                lookup = SchoolLookup(server_name=action["name"])
-
-            lookup.school = school
-            lookup.save()
+            aliases[action["name"]] = action["school"]
 
         if action["action"] == CREATE:
-            school = School.objects.create(name=action["name"])
+            to_create[key] = action["name"]
+
+    if to_create:
+        # Schools that already exist under a created name are linked instead
+        School.objects.bulk_create(
+            [School(name=name) for name in set(to_create.values())],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        created = dict(
+            School.objects.filter(name__in=set(to_create.values())).values_list(
+                "name", "id"
+            )
+        )
+        completed_actions.update(
+            {key: created[name] for key, name in to_create.items()}
+        )
+        invalidate_school_aliases()
 
-            completed_actions[key] = school.id
+    save_aliases(aliases)
 
     return completed_actions
 
 
 def create_teams(debater_completed_actions, teams):
-    completed_actions = {}
-
-    for team in teams:
-        debaters = []
+    pairs = [
+        [debater_completed_actions[debater["id"]] for debater in team["debaters"]]
+        for team in teams
+    ]
+    found_teams = get_or_create_teams([pair[:2] for pair in pairs])
 
-        for debater in team["debaters"]:
-            found_debater = Debater.objects.get(
-                id=debater_completed_actions[debater["id"]]
-            )
-
-            debaters += [found_debater]
-
-        found_team = get_or_create_team_for_debaters(debaters[0], debaters[1])
-        completed_actions[team["id"]] = found_team.id
-
-    return completed_actions
+    return {team["id"]: found.id for team, found in zip(teams, found_teams)}
 
 
 def create_debaters(school_completed_actions, debater_actions):
@@ -180,124 +231,324 @@ def create_debaters(school_completed_actions, debater_actions):
     return completed_actions
 
 
+def as_decimal(value):
+    # Speaks and ranks are stored to four places; payloads send floats
+    return Decimal(str(value)).quantize(STAT_PLACES)
+
+
 def create_rounds(team_completed_actions, tournament, rounds):
-    completed_actions = {}
+    """
+    Matches the payload's rounds to the tournament's stored ones by
+    (round_number, gov, opp). Stored rounds keep their ids and are only
+    updated when their victor changed; only unmatched rounds are created or
+    deleted. Returns {payload round id: round id}.
+    """
+    existing = {}
+    to_delete = []
+
+    for stored in Round.objects.filter(tournament=tournament).order_by("id"):
+        key = (stored.round_number, stored.gov_id, stored.opp_id)
+        if key in existing:
+            to_delete += [stored]
+            continue
+        existing[key] = stored
 
-    Round.objects.filter(tournament=tournament).delete()
+    keys = {}
+    matched = {}
+    to_create = []
+    to_update = []
 
     for round in rounds:
-        new_round = Round.objects.create(
-            round_number=int(round["round_number"]),
-            gov=Team.objects.get(id=team_completed_actions[round["gov"]]),
-            opp=Team.objects.get(id=team_completed_actions[round["opp"]]),
-            victor=round["victor"],
-            tournament=tournament,
+        key = (
+            int(round["round_number"]),
+            team_completed_actions[round["gov"]],
+            team_completed_actions[round["opp"]],
         )
+        keys[round["id"]] = key
 
-        completed_actions[round["id"]] = new_round.id
+        if key in matched:
+            continue
 
-    return completed_actions
+        stored = existing.pop(key, None)
+
+        if stored is None:
+            stored = Round(
+                round_number=key[0],
+                gov_id=key[1],
+                opp_id=key[2],
+                victor=round["victor"],
+                tournament=tournament,
+            )
+            to_create += [stored]
+        elif stored.victor != round["victor"]:
+            stored.victor = round["victor"]
+            to_update += [stored]
+
+        matched[key] = stored
+
+    to_delete += list(existing.values())
+
+    for ids in chunked(stored.id for stored in to_delete):
+        Round.objects.filter(id__in=ids).delete()
+    Round.objects.bulk_update(to_update, ["victor"], batch_size=BATCH_SIZE)
+    Round.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+
+    round_ids = {key: stored.id for key, stored in matched.items()}
+
+    if None in round_ids.values():
+        # Not every backend returns ids from bulk inserts; keys are unique
+        # within the tournament now, so the new rows are read back by key
+        for round_id, *key in Round.objects.filter(tournament=tournament).values_list(
+            "id", "round_number", "gov_id", "opp_id"
+        ):
+            round_ids[tuple(key)] = round_id
+
+    return {round_id: round_ids[key] for round_id, key in keys.items()}
 
 
 def create_round_stats(
     debater_completed_actions, round_completed_actions, tournament, round_stats
 ):
-    RoundStats.objects.filter(round__tournament=tournament).all().delete()
+    """
+    Matches the payload's stats to the stored ones by (round, debater, role)
+    and writes only the difference
+    """
+    existing = {}
+    to_delete = []
+
+    for stored in RoundStats.objects.filter(round__tournament=tournament).order_by(
+        "id"
+    ):
+        key = (stored.round_id, stored.debater_id, stored.debater_role)
+        if key in existing:
+            to_delete += [stored]
+            continue
+        existing[key] = stored
+
+    seen = set()
+    to_create = []
+    to_update = []
 
     for round_stat in round_stats:
-        round_stat = RoundStats.objects.create(
-            round=Round.objects.get(id=round_completed_actions[round_stat["round"]]),
-            debater=Debater.objects.get(
-                id=debater_completed_actions[round_stat["debater"]]
-            ),
-            speaks=round_stat["speaks"],
-            ranks=round_stat["ranks"],
-            debater_role=round_stat["role"],
+        key = (
+            round_completed_actions[round_stat["round"]],
+            debater_completed_actions[round_stat["debater"]],
+            round_stat["role"],
         )
+        speaks = as_decimal(round_stat["speaks"])
+        ranks = as_decimal(round_stat["ranks"])
+
+        if key in seen:
+            continue
+        seen.add(key)
+
+        stored = existing.pop(key, None)
+
+        if stored is None:
+            to_create += [
+                RoundStats(
+                    round_id=key[0],
+                    debater_id=key[1],
+                    debater_role=key[2],
+                    speaks=speaks,
+                    ranks=ranks,
+                )
+            ]
+        elif (as_decimal(stored.speaks), as_decimal(stored.ranks)) != (speaks, ranks):
+            stored.speaks = speaks
+            stored.ranks = ranks
+            to_update += [stored]
+
+    to_delete += list(existing.values())
+
+    for ids in chunked(stored.id for stored in to_delete):
+        RoundStats.objects.filter(id__in=ids).delete()
+    RoundStats.objects.bulk_update(
+        to_update, ["speaks", "ranks"], batch_size=BATCH_SIZE
+    )
+    RoundStats.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
 
 
 def create_speaker_awards(
-    debater_completed_actions, speaker_awards, type_of_result, tournament
+    debater_completed_actions, speaker_awards, type_of_result, tournament, dirty=None
 ):
-    debaters_changed = []
+    recompute = dirty is None
+    dirty = dirty if dirty is not None else DirtySet(tournament.season)
 
-    to_delete = SpeakerResult.objects.filter(
-        tournament=tournament, type_of_place=type_of_result
+    sync_speaker_results(
+        tournament,
+        [
+            (
+                debater_completed_actions[award["debater"]],
+                type_of_result,
+                award["place"],
+                award["tie"],
+            )
+            for award in speaker_awards[:10]
+        ],
+        dirty,
+        types=[type_of_result],
     )
 
-    for speaker in to_delete:
-        debaters_changed += [speaker.debater]
-        speaker.delete()
-
-    for award in speaker_awards[:10]:
-        debater = Debater.objects.get(id=debater_completed_actions[award["debater"]])
-        SpeakerResult.objects.create(
-            tournament=tournament,
-            debater=debater,
-            type_of_place=type_of_result,
-            place=award["place"],
-            tie=award["tie"],
-        )
+    if recompute:
+        dirty.recompute()
 
-        debaters_changed += [debater]
 
-    for debater in debaters_changed:
-        update_soty(debater)
-        update_noty(debater)
+def create_team_awards(
+    team_completed_actions, team_awards, type_of_result, tournament, dirty=None
+):
+    recompute = dirty is None
+    dirty = dirty if dirty is not None else DirtySet(tournament.season)
 
-    redo_rankings(
-        SOTY.objects.filter(season=settings.CURRENT_SEASON),
-        season=settings.CURRENT_SEASON,
-        cache_type="soty",
-    )
-    redo_rankings(
-        NOTY.objects.filter(season=settings.CURRENT_SEASON),
-        season=settings.CURRENT_SEASON,
-        cache_type="noty",
+    sync_team_results(
+        tournament,
+        [
+            (
+                team_completed_actions[award["team"]],
+                type_of_result,
+                award["place"],
+                False,
+            )
+            for award in team_awards[:16]
+        ],
+        dirty,
+        types=[type_of_result],
     )
 
+    if recompute:
+        dirty.recompute()
+
+
+def auto_school_actions(schools, resolver, auto_link=False):
+    """
+    Builds the school actions the reconciliation step would, linking every
+    school the resolver finds. Without auto_link only exact names and
+    existing lookups count. Returns the actions and the unresolved names.
+    """
+    actions = {-1: {"school": -1, "name": ""}}
+    unresolved = []
+
+    for school in schools:
+        name = school["name"].strip()
+
+        if auto_link:
+            school_id = resolver.resolve_id(name)
+        else:
+            school_id = resolver.names.get(name)
+
+        if school_id is None:
+            unresolved += [name]
+
+        actions[school["id"]] = {
+            "action": CREATE if school_id is None else LINK,
+            "id": school["id"],
+            "name": school["name"],
+            "school": -1 if school_id is None else school_id,
+        }
+
+    return actions, unresolved
+
+
+def auto_debater_actions(teams, school_actions, auto_link=False):
+    """
+    Builds the debater actions the reconciliation step would, linking every
+    debater with a candidate at their linked or hybrid school. Without
+    auto_link only exact name matches count. Returns the actions and the
+    unresolved names.
+    """
+    entries = [(team, debater) for team in teams for debater in team["debaters"]]
+    matches = match_debaters(
+        [
+            (
+                debater["name"],
+                [
+                    school_actions[team["school_id"]]["school"],
+                    school_actions[team["hybrid_school_id"]]["school"],
+                ],
+            )
+            for team, debater in entries
+        ]
+    )
 
-def create_team_awards(team_completed_actions, team_awards, type_of_result, tournament):
-    teams_changed = []
+    actions = {-1: {"debater": -1, "name": ""}}
+    unresolved = []
+
+    for (team, debater), candidates in zip(entries, matches):
+        found = None
+        if candidates and (auto_link or candidates[0][0] == 1.0):
+            found = candidates[0][1]
+
+        if found is None:
+            unresolved += [debater["name"]]
+
+        actions[debater["id"]] = {
+            "action": CREATE if found is None else LINK,
+            "id": debater["id"],
+            "name": debater["name"],
+            "debater": found.id if found else -1,
+            "school": (
+                found.school_id
+                if found
+                else school_actions[team["school_id"]]["school"]
+            ),
+            "school_id": team["school_id"],
+            "status": 0 if debater["status"] else 1,
+        }
 
-    to_delete = TeamResult.objects.filter(
-        tournament=tournament, type_of_place=type_of_result
-    )
+    return actions, unresolved
 
-    for team in to_delete:
-        teams_changed += [team.team]
-        team.delete()
-
-    for award in team_awards[:16]:
-        team = Team.objects.get(id=team_completed_actions[award["team"]])
-        TeamResult.objects.create(
-            tournament=tournament,
-            team=team,
-            type_of_place=type_of_result,
-            place=award["place"],
-        )
 
-        teams_changed += [team]
+def create_entities(school_actions, debater_actions, teams):
+    """
+    Creates or links the schools, debaters and teams of a payload. Returns
+    the debater and team id maps the result imports resolve against.
+    """
+    school_completed_actions = create_schools(school_actions)
+    debater_completed_actions = create_debaters(
+        school_completed_actions, debater_actions
+    )
+    team_completed_actions = create_teams(debater_completed_actions, teams)
 
-    for team in teams_changed:
-        update_toty(team)
-        update_qual_points(team)
+    return debater_completed_actions, team_completed_actions
 
-        if tournament.season in settings.ONLINE_SEASONS:
-            update_online_quals(team)
 
-    redo_rankings(
-        TOTY.objects.filter(season=settings.CURRENT_SEASON),
-        season=settings.CURRENT_SEASON,
-        cache_type="toty",
-    )
-    redo_rankings(
-        COTY.objects.filter(season=settings.CURRENT_SEASON),
-        season=settings.CURRENT_SEASON,
-        cache_type="coty",
+def import_results(
+    debater_completed_actions, team_completed_actions, tournament, response, dirty
+):
+    """
+    Replaces a tournament's rounds, round stats and awards with a payload's,
+    recording the teams and debaters whose results changed on dirty
+    """
+    round_completed_actions = create_rounds(
+        team_completed_actions, tournament, response["rounds"]
     )
-    redo_rankings(
-        OnlineQUAL.objects.filter(season=settings.CURRENT_SEASON),
-        season=settings.CURRENT_SEASON,
-        cache_type="online_quals",
+    create_round_stats(
+        debater_completed_actions,
+        round_completed_actions,
+        tournament,
+        response["stats"],
     )
+
+    for awards, type_of_result in (
+        ("speaker_results", Debater.VARSITY),
+        ("novice_speaker_results", Debater.NOVICE),
+    ):
+        create_speaker_awards(
+            debater_completed_actions,
+            response[awards],
+            type_of_result,
+            tournament,
+            dirty=dirty,
+        )
+
+    for awards, type_of_result in (
+        ("team_results", Debater.VARSITY),
+        ("novice_team_results", Debater.NOVICE),
+    ):
+        create_team_awards(
+            team_completed_actions,
+            response[awards],
+            type_of_result,
+            tournament,
+            dirty=dirty,
+        )
@@ -0,0 +1,179 @@
+import os
+import socket
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.models.ranking_job import RankingJob
+from core.utils.standings import DirtySet
+from core.utils.standings.common import normalize_season
+
+STALE_AFTER = timedelta(minutes=30)
+KEEP_FINISHED = timedelta(days=7)
+
+# Jobs that fail this many times stay FAILED until an admin sets them back
+# to pending
+MAX_ATTEMPTS = 3
+
+
+def enqueue_recompute(dirty, tournament=None):
+    """
+    Queues a recompute of the teams and debaters recorded in a DirtySet for
+    the rankings worker to pick up, instead of running it in the request.
+    """
+    if not dirty:
+        return None
+
+    return RankingJob.objects.create(
+        season=dirty.season,
+        tournament=tournament,
+        teams=sorted(dirty.teams),
+        debaters=sorted(dirty.debaters),
+    )
+
+
+def standings_updating(tournament):
+    return RankingJob.objects.filter(
+        season=normalize_season(tournament.season),
+        status__in=[RankingJob.PENDING, RankingJob.RUNNING],
+    ).exists()
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def requeue_stale_jobs():
+    """
+    Hands back jobs whose worker stopped reporting progress for
+    STALE_AFTER, or fails them once they are out of attempts.
+    """
+    cutoff = timezone.now() - STALE_AFTER
+    stale = RankingJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at=None, started_at__lt=cutoff),
+        status=RankingJob.RUNNING,
+    )
+
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=RankingJob.FAILED,
+        error="Worker stopped responding",
+        finished_at=timezone.now(),
+    )
+
+    return failed + stale.update(
+        status=RankingJob.PENDING,
+        worker="",
+        progress="",
+        started_at=None,
+        heartbeat_at=None,
+    )
+
+
+def delete_finished_jobs():
+    return RankingJob.objects.filter(
+        status=RankingJob.DONE, finished_at__lt=timezone.now() - KEEP_FINISHED
+    ).delete()
+
+
+def claim_jobs(worker):
+    """
+    Claims every pending job of the season that has waited longest, so
+    duplicate jobs queued for the same season are coalesced into one
+    recompute. The conditional update keeps two workers from claiming the
+    same job.
+    """
+    oldest = (
+        RankingJob.objects.filter(status=RankingJob.PENDING)
+        .order_by("created_at", "id")
+        .first()
+    )
+
+    if oldest is None:
+        return []
+
+    now = timezone.now()
+
+    RankingJob.objects.filter(
+        status=RankingJob.PENDING, season=oldest.season
+    ).update(
+        status=RankingJob.RUNNING,
+        worker=worker,
+        progress="Queued",
+        started_at=now,
+        heartbeat_at=now,
+        attempts=F("attempts") + 1,
+    )
+
+    return list(
+        RankingJob.objects.filter(status=RankingJob.RUNNING, worker=worker)
+    )
+
+
+def run_jobs(jobs):
+    job_ids = [job.id for job in jobs]
+    claimed = RankingJob.objects.filter(id__in=job_ids)
+
+    dirty = DirtySet(jobs[0].season)
+
+    for job in jobs:
+        dirty.add_teams(job.teams)
+        dirty.add_debaters(job.debaters)
+
+    # Every progress message doubles as the worker's heartbeat. The
+    # recompute isn't wrapped in one transaction so the heartbeat is seen by
+    # other workers; recomputing is idempotent, so a retry repairs whatever
+    # a failed attempt left half written.
+    def progress(message):
+        claimed.update(progress=message, heartbeat_at=timezone.now())
+
+    try:
+        dirty.recompute(progress=progress)
+    except Exception:  # pylint: disable=broad-except
+        error = traceback.format_exc()
+
+        claimed.filter(attempts__lt=MAX_ATTEMPTS).update(
+            status=RankingJob.PENDING,
+            worker="",
+            progress="",
+            error=error,
+            started_at=None,
+            heartbeat_at=None,
+        )
+        claimed.filter(status=RankingJob.RUNNING).update(
+            status=RankingJob.FAILED,
+            error=error,
+            finished_at=timezone.now(),
+        )
+        return False
+
+    claimed.update(
+        status=RankingJob.DONE, progress="Done", finished_at=timezone.now()
+    )
+    return True
+
+
+def run_pending_jobs(worker=None):
+    """
+    Drains the queue one season at a time. Returns the number of jobs
+    processed.
+    """
+    worker = worker or worker_name()
+    processed = 0
+
+    requeue_stale_jobs()
+
+    while True:
+        jobs = claim_jobs(worker)
+
+        if not jobs:
+            break
+
+        run_jobs(jobs)
+        processed += len(jobs)
+
+    delete_finished_jobs()
+
+    return processed
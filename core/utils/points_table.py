@@ -0,0 +1,75 @@
+"""
+Lookup tables for the point formulas in core.utils.points.
+
+Every formula stops changing once the field size reaches MAX_SIZE and once
+the place passes MAX_PLACE, so the tables cover that range and clamp
+anything larger onto their last row/column. Negative sizes or places (the
+-1 "unset" defaults) fall through to the formulas.
+"""
+
+from core.utils.points import (
+    novice_points_for_size,
+    online_points,
+    speaker_points_for_size,
+    team_points_for_size,
+)
+
+MAX_SIZE = 80
+MAX_PLACE = 33
+
+TEAM_POINTS = tuple(
+    tuple(
+        tuple(
+            team_points_for_size(size, place, ghost_points=ghost_points)
+            for place in range(MAX_PLACE + 1)
+        )
+        for size in range(MAX_SIZE + 1)
+    )
+    for ghost_points in (False, True)
+)
+
+SPEAKER_POINTS = tuple(
+    tuple(speaker_points_for_size(size, place) for place in range(MAX_PLACE + 1))
+    for size in range(MAX_SIZE + 1)
+)
+
+NOVICE_POINTS = tuple(
+    tuple(novice_points_for_size(size, place) for place in range(MAX_PLACE + 1))
+    for size in range(MAX_SIZE + 1)
+)
+
+ONLINE_POINTS = tuple(online_points(place) for place in range(MAX_PLACE + 1))
+
+
+def in_range(size, place):
+    return size >= 0 and place >= 0
+
+
+def team_points(num_teams, place, ghost_points=False):
+    if not in_range(num_teams, place):
+        return team_points_for_size(num_teams, place, ghost_points=ghost_points)
+
+    return TEAM_POINTS[1 if ghost_points else 0][min(num_teams, MAX_SIZE)][
+        min(place, MAX_PLACE)
+    ]
+
+
+def speaker_points(num_teams, place):
+    if not in_range(num_teams, place):
+        return speaker_points_for_size(num_teams, place)
+
+    return SPEAKER_POINTS[min(num_teams, MAX_SIZE)][min(place, MAX_PLACE)]
+
+
+def novice_points(num_novices, place):
+    if not in_range(num_novices, place):
+        return novice_points_for_size(num_novices, place)
+
+    return NOVICE_POINTS[min(num_novices, MAX_SIZE)][min(place, MAX_PLACE)]
+
+
+def online_place_points(place):
+    if place < 0:
+        return online_points(place)
+
+    return ONLINE_POINTS[min(place, MAX_PLACE)]
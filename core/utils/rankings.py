@@ -1,52 +1,33 @@
 import urllib.request
+from itertools import groupby
 
 from django.conf import settings
-from django.core.cache import cache
-from django.core.cache.utils import make_template_fragment_key
-from django.shortcuts import reverse
+from django.db import transaction
 
-from core.models.debater import Debater, QualPoints, Reaff
+from core.models.debater import Debater
+from core.models.results.speaker import SpeakerResult
 from core.models.results.team import TeamResult
-from core.models.standings.coty import COTY
 from core.models.standings.noty import NOTY
-from core.models.standings.online_qual import OnlineQUAL
-from core.models.standings.qual import QUAL
+from core.models.standings.qual import QualSummary
 from core.models.standings.soty import SOTY
-from core.models.standings.toty import TOTY, TOTYReaff
-from django.test import Client
+from core.models.standings.toty import TOTY
+from core.utils.standings.common import (
+    BATCH_SIZE,
+    chunked,
+    invalidate_standings_version,
+)
+from core.utils.standings.prerender import prerender_fragment
+from core.utils.standings.quals import update_season_quals
+from core.utils.standings.reaffs import season_reaffs
 
 
 def get_qualled_debaters(school, season):
-    qualled_debaters = [
-        q.debater for q in QUAL.objects.filter(debater__school=school, season=season)
-    ]
-
-    qualled_debaters = list(set(qualled_debaters))
-
-    qual_points = (
-        QualPoints.objects.filter(debater__school=school)
-        .filter(season=season)
-        .order_by("-points")
+    return (
+        QualSummary.objects.filter(school=school, season=season)
+        .select_related("debater")
+        .order_by("-points", "id")
     )
 
-    to_return = []
-    handled_debaters = []
-
-    for qual_point in qual_points:
-        if qual_point.points > 0 or qual_point.debater in qualled_debaters:
-            to_return += [qual_point]
-            handled_debaters.append(qual_point.debater)
-
-    for debater in qualled_debaters:
-        if debater in handled_debaters:
-            continue
-
-        qual_point = QualPoints.objects.create(debater=debater, points=0, season=season)
-
-        to_return += [qual_point]
-
-    return to_return
-
 
 def update_toty(team, season=settings.CURRENT_SEASON):
     if team.team_results.count() == 0:
@@ -59,7 +40,9 @@ def update_toty(team, season=settings.CURRENT_SEASON):
     if team.debaters.count() == 0:
         return
 
-    if TOTYReaff.objects.filter(old_team=team).filter(season=season).count() > 0:
+    reaffs = season_reaffs("team", season)
+
+    if reaffs.is_reaffed(team.id):
         TOTY.objects.filter(season=season).filter(team=team).delete()
         return
 
@@ -75,9 +58,9 @@ def update_toty(team, season=settings.CURRENT_SEASON):
         .filter(type_of_place=Debater.VARSITY)
     )
 
-    reaff = TOTYReaff.objects.filter(new_team=team).filter(season=season).all()
-    if len(reaff) > 0:
-        results = results | reaff[0].old_team.team_results.filter(
+    sources = reaffs.sources(team.id)
+    if sources:
+        results = results | TeamResult.objects.filter(team_id__in=sources).filter(
             tournament__season=season
         ).filter(tournament__toty=True).filter(type_of_place=Debater.VARSITY)
 
@@ -142,7 +125,9 @@ def update_soty(debater, season=settings.CURRENT_SEASON):
         debater.delete()
         return
 
-    if Reaff.objects.filter(old_debater=debater).filter(season=season).count() > 0:
+    reaffs = season_reaffs("debater", season)
+
+    if reaffs.is_reaffed(debater.id):
         SOTY.objects.filter(season=season).filter(debater=debater).delete()
         return
 
@@ -156,11 +141,13 @@ def update_soty(debater, season=settings.CURRENT_SEASON):
         .filter(type_of_place=Debater.VARSITY)
     )
 
-    reaff = Reaff.objects.filter(new_debater=debater).filter(season=season).all()
-    if len(reaff) > 0:
-        results = results | reaff[0].old_debater.speaker_results.filter(
-            tournament__season=season
-        ).filter(tournament__soty=True).filter(type_of_place=Debater.VARSITY)
+    sources = reaffs.sources(debater.id)
+    if sources:
+        results = results | SpeakerResult.objects.filter(
+            debater_id__in=sources
+        ).filter(tournament__season=season).filter(tournament__soty=True).filter(
+            type_of_place=Debater.VARSITY
+        )
 
     markers = [
         (
@@ -278,159 +265,87 @@ def update_qual_points(team, season=settings.CURRENT_SEASON):
             team.delete()
         return
 
-    for debater in team.debaters.all():
-        results = (
-            TeamResult.objects.filter(tournament__season=season)
-            .filter(type_of_place=Debater.VARSITY)
-            .filter(team__debaters=debater)
-        )
-
-        if not debater.school.included_in_oty:
-            if season == settings.CURRENT_SEASON:
-                QUAL.objects.filter(season=season, debater__school=debater.school).delete()
-                QualPoints.objects.filter(
-                    season=season, debater__school=debater.school
-                ).delete()
-                COTY.objects.filter(school=debater.school).delete()
-            continue
-
-        if season == settings.CURRENT_SEASON:
-            QUAL.objects.filter(season=season, debater=debater).delete()
-
-        qual = None
-        if results.exists():
-            latest_season = debater.latest_season
-            current_season = int(settings.CURRENT_SEASON)
-            if latest_season is None or int(latest_season) < current_season:
-                debater.latest_season = settings.CURRENT_SEASON
-                debater.save()
-                
-        for result in results:
-            if result.place != -1 and result.place <= result.tournament.autoqual_bar:
-                try:
-                    qual = QUAL.objects.create(
-                        season=season,
-                        tournament=result.tournament,
-                        qual_type=result.tournament.qual_type,
-                        debater=debater,
-                    )
-                except:
-                    pass
-
-        results = results.filter(tournament__qual=True)
-
-        markers = [
-            (
-                result.tournament.get_qual_points(
-                    result.place, ghost_points=result.ghost_points
-                ),
-                result,
-            )
-            for result in results
-        ]
+    update_season_quals(
+        season, debater_ids=list(team.debaters.values_list("id", flat=True))
+    )
 
-        markers.sort(key=lambda marker: marker[0], reverse=True)
 
-        points = sum([marker[0] for marker in markers])
+def assign_places(rankings, points=lambda ranking: ranking.points, start=1):
+    """
+    Places rankings that are already sorted by points, highest first. Equal
+    points share a place and the next place skips past them ("1224").
+    Returns (ranking, place, tied) tuples.
+    """
+    placed = []
+    place = start
 
-        qual_points = (
-            QualPoints.objects.filter(season=season).filter(debater=debater).first()
-        )
+    for _, group in groupby(rankings, key=points):
+        group = list(group)
 
-        if points <= 0:
-            if qual_points and not qual and season == settings.CURRENT_SEASON:
-                qual_points.delete()
-            continue
+        for ranking in group:
+            placed += [(ranking, place, len(group) > 1)]
 
-        if not qual_points:
-            qual_points = QualPoints.objects.create(season=season, debater=debater)
+        place += len(group)
 
-        qual_points.points = points
-        qual_points.save()
+    return placed
 
-        if season in settings.ONLINE_SEASONS:
-            continue
 
-        if points >= settings.QUAL_BAR:
-            qual = (
-                QUAL.objects.filter(debater=debater)
-                .filter(qual_type=QUAL.POINTS)
-                .filter(season=season)
-                .first()
-            )
+def place_rankings(rankings, start=1):
+    rankings = list(rankings.order_by("-points", "id"))
 
-            if not qual:
-                QUAL.objects.create(
-                    debater=debater, season=season, qual_type=QUAL.POINTS
-                )
+    to_delete = [ranking.id for ranking in rankings if ranking.points == 0]
+    to_update = []
 
-    for debater in team.debaters.all():
-        if not debater.school.included_in_oty:
+    for ranking, place, tied in assign_places(
+        [ranking for ranking in rankings if ranking.points != 0], start=start
+    ):
+        if ranking.place == place and ranking.tied == tied:
             continue
 
-        coty = COTY.objects.filter(season=season).filter(school=debater.school).first()
-
-        if not coty:
-            coty = COTY.objects.create(season=season, school=debater.school)
-
-        relevant_qual_points = (
-            QualPoints.objects.filter(season=season)
-            .filter(debater__school=debater.school)
-            .all()
-        )
+        ranking.place = place
+        ranking.tied = tied
+        to_update += [ranking]
 
-        relevant_qual_points = sum([min(60, q.points) for q in relevant_qual_points])
+    if rankings:
+        model = type(rankings[0])
 
-        qualled_debaters = [
-            q.debater
-            for q in QUAL.objects.filter(season=season)
-            .filter(debater__school=debater.school)
-            .all()
-        ]
-        qualled_debaters = len(list(set(qualled_debaters)))
+        with transaction.atomic():
+            for ids in chunked(to_delete):
+                model.objects.filter(id__in=ids).delete()
+            model.objects.bulk_update(
+                to_update, ["place", "tied"], batch_size=BATCH_SIZE
+            )
 
-        relevant_qual_points += qualled_debaters * 6
 
-        coty.points = relevant_qual_points
-        coty.save()
+def clear_rankings_cache(season, cache_type):
+    prerender_fragment(season, cache_type)
+    invalidate_standings_version(season)
 
 
 def redo_rankings(rankings, season=settings.CURRENT_SEASON, cache_type="toty"):
-    handled_through_tie = []
+    place_rankings(rankings)
+    clear_rankings_cache(season, cache_type)
 
-    rankings = rankings.order_by("-points")
 
-    place = 1
+def redo_rankings_range(
+    rankings, low=None, high=None, season=settings.CURRENT_SEASON, cache_type="toty"
+):
+    """
+    Re-places only the rows whose points fall between low and high (either
+    bound may be None for an open range). Rows above the range keep their
+    places, so the range starts right after them.
+    """
+    start = 1
 
-    for ranking in rankings:
-        if ranking in handled_through_tie:
-            continue
+    if high is not None:
+        start += rankings.filter(points__gt=high).count()
+        rankings = rankings.filter(points__lte=high)
 
-        if ranking.points == 0:
-            ranking.delete()
-            continue
+    if low is not None:
+        rankings = rankings.filter(points__gte=low)
 
-        if rankings.filter(points=ranking.points).count() > 1:
-            next_place = place
-            for tied_ranking in rankings.filter(points=ranking.points):
-                tied_ranking.place = place
-                tied_ranking.tied = True
-                tied_ranking.save()
-                handled_through_tie += [tied_ranking]
-                next_place += 1
-            place = next_place - 1
-        else:
-            ranking.tied = False
-            ranking.place = place
-            ranking.save()
-
-        place += 1
-
-    key = make_template_fragment_key(cache_type, [season])
-    print(f"CLEARING: {key} ({season})")
-    cache.delete(key)
-    client = Client()
-    client.get(reverse("core:index") + f"?season={season}")
+    place_rankings(rankings, start=start)
+    clear_rankings_cache(season, cache_type)
 
 
 def update_online_quals(team, season=settings.CURRENT_SEASON):
@@ -438,100 +353,16 @@ def update_online_quals(team, season=settings.CURRENT_SEASON):
         team.delete()
         return
 
-    if team.debaters.count() == 0:
-        return
-
-    for debater in team.debaters.all():
-        results = (
-            TeamResult.objects.filter(tournament__season=season)
-            .filter(type_of_place=Debater.VARSITY)
-            .filter(team__debaters=debater)
-        )
-
-        markers = [
-            (result.tournament.get_online_qual_points(result.place), result)
-            for result in results
-        ]
-
-        markers.sort(key=lambda marker: marker[0], reverse=True)
-
-        online_qual = OnlineQUAL.objects.filter(season=season, debater=debater).first()
-
-        if len(markers) == 0 or not debater.school.included_in_oty:
-            if online_qual:
-                online_qual.delete()
-            continue
-
-        if not online_qual:
-            online_qual = OnlineQUAL.objects.create(season=season, debater=debater)
-
-        labels = ["one", "two", "three", "four", "five", "six"]
-
-        points = 0
-        for i in range(len(markers)):
-            if not markers[i][1].tournament:
-                continue
-
-            if i > 5:
-                continue
-
-            setattr(online_qual, f"marker_{labels[i]}", markers[i][0])
-
-            setattr(online_qual, f"tournament_{labels[i]}", markers[i][1].tournament)
-
-            points += markers[i][0]
+    debater_ids = list(team.debaters.values_list("id", flat=True))
 
-        online_qual.points = points
-        online_qual.save()
-
-        if season not in settings.ONLINE_SEASONS:
-            continue
-
-        if points >= settings.ONLINE_QUAL_BAR:
-            qual = (
-                QUAL.objects.filter(debater=debater)
-                .filter(qual_type=QUAL.POINTS)
-                .filter(season=season)
-                .first()
-            )
-
-            if not qual:
-                QUAL.objects.create(
-                    debater=debater, season=season, qual_type=QUAL.POINTS
-                )
-
-    for debater in team.debaters.all():
-        if not debater.school.included_in_oty:
-            continue
-
-        coty = COTY.objects.filter(season=season).filter(school=debater.school).first()
-
-        if not coty:
-            coty = COTY.objects.create(season=season, school=debater.school)
-
-        relevant_qual_points = (
-            QualPoints.objects.filter(season=season)
-            .filter(debater__school=debater.school)
-            .all()
-        )
-
-        relevant_qual_points = sum([min(60, q.points) for q in relevant_qual_points])
-
-        qualled_debaters = [
-            q.debater
-            for q in QUAL.objects.filter(season=season)
-            .filter(debater__school=debater.school)
-            .all()
-        ]
-        qualled_debaters = len(list(set(qualled_debaters)))
-
-        relevant_qual_points += qualled_debaters * 6
+    if not debater_ids:
+        return
 
-        coty.points = relevant_qual_points
-        coty.save()
+    update_season_quals(season, debater_ids=debater_ids)
 
     return True
 
+
 def place_as_round(place):
         rounds = [
             (1, "1st"),
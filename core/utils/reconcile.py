@@ -0,0 +1,281 @@
+"""
+Matching of tab-server names against the schools and debaters already in the
+database. School names and aliases are preloaded into a normalized-key
+dictionary; debater candidates are loaded once for every school an import
+references and indexed by normalized name and by name token, so a whole
+payload is resolved in memory.
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher, get_close_matches
+
+from django.core.cache import cache
+
+from core.models.debater import Debater
+from core.models.school import School, SchoolLookup
+from core.utils.standings.common import BATCH_SIZE
+
+MATCH_THRESHOLD = 0.6
+MATCH_CANDIDATES = 5
+
+SCHOOL_MATCH_CUTOFF = 0.8
+SCHOOL_TOKEN_CUTOFF = 0.7
+
+# Words school names are written with or without, mapped to one spelling
+SCHOOL_WORDS = {
+    "university": "u",
+    "univ": "u",
+    "college": "c",
+    "the": "",
+    "of": "",
+    "at": "",
+    "and": "",
+}
+
+ALIAS_CACHE_KEY = "school_aliases"
+ALIAS_CACHE_TIMEOUT = 60 * 60
+
+
+def normalize(text):
+    """Case-folds, strips accents and punctuation, and collapses whitespace"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^\w\s]", " ", text.casefold()).split())
+
+
+def name_score(name, other):
+    """
+    Scores two normalized names between 0 and 1: the mean of their token
+    overlap and their character similarity, so an exact match scores 1.
+    """
+    if name == other:
+        return 1.0
+
+    tokens, other_tokens = set(name.split()), set(other.split())
+    overlap = len(tokens & other_tokens) / len(tokens | other_tokens)
+
+    return (overlap + SequenceMatcher(None, name, other).ratio()) / 2
+
+
+class DebaterIndex:
+    def __init__(self, debaters):
+        self.names = {}
+        self.tokens = {}
+        self.normalized = {}
+
+        for debater in debaters:
+            name = normalize(debater.name)
+            self.normalized[debater.id] = name
+            self.names.setdefault((debater.school_id, name), []).append(debater)
+
+            for token in set(name.split()):
+                self.tokens.setdefault((debater.school_id, token), []).append(debater)
+
+    def candidates(self, name, school_ids):
+        """
+        Returns [(score, debater)] for the debaters of the given schools that
+        share a name token with name and score at least MATCH_THRESHOLD, best
+        first. Earlier schools win ties, then older debaters.
+        """
+        name = normalize(name)
+        school_rank = {
+            school_id: rank for rank, school_id in enumerate(reversed(school_ids))
+        }
+
+        found = {}
+        for school_id in school_ids:
+            for debater in self.names.get((school_id, name), []):
+                found[debater.id] = (1.0, debater)
+
+            for token in set(name.split()):
+                for debater in self.tokens.get((school_id, token), []):
+                    if debater.id not in found:
+                        score = name_score(name, self.normalized[debater.id])
+                        found[debater.id] = (score, debater)
+
+        return sorted(
+            (match for match in found.values() if match[0] >= MATCH_THRESHOLD),
+            key=lambda match: (
+                -match[0],
+                -school_rank[match[1].school_id],
+                match[1].id,
+            ),
+        )
+
+
+def match_debaters(entries, limit=MATCH_CANDIDATES):
+    """
+    entries are (name, school_ids) pairs, school_ids in order of preference.
+    Loads every debater of the referenced schools in one query and returns,
+    per entry, up to limit (score, debater) candidates, best first.
+    """
+    entries = [
+        (name, [school_id for school_id in ids if school_id not in (None, -1)])
+        for name, ids in entries
+    ]
+
+    index = DebaterIndex(
+        Debater.objects.filter(
+            school_id__in={school_id for _, ids in entries for school_id in ids}
+        )
+        .select_related("school")
+        .order_by("id")
+    )
+
+    return [index.candidates(name, ids)[:limit] for name, ids in entries]
+
+
+def school_key(name):
+    """
+    Normalizes a school name so spellings of the same school collide:
+    "The University of Maryland" and "Maryland University" share a key.
+    """
+    tokens = [SCHOOL_WORDS.get(token, token) for token in normalize(name).split()]
+    return " ".join(sorted(token for token in tokens if token))
+
+
+def is_misspelling(key, other):
+    """
+    Whether two school keys differ in a single, similarly spelled token, so
+    "brandies u" matches "brandeis u" but "north carolina" isn't "south
+    carolina".
+    """
+    tokens, other_tokens = set(key.split()), set(other.split())
+    missing, extra = tokens - other_tokens, other_tokens - tokens
+
+    if len(missing) != 1 or len(extra) != 1:
+        return False
+
+    return (
+        SequenceMatcher(None, missing.pop(), extra.pop()).ratio() >= SCHOOL_TOKEN_CUTOFF
+    )
+
+
+def school_aliases():
+    """
+    Returns {"names": {name: school_id}, "keys": {school_key: school_id}}
+    for every school name and SchoolLookup server name, loading them at most
+    once until invalidated. Keys shared by several schools are left out.
+    """
+    aliases = cache.get(ALIAS_CACHE_KEY)
+
+    if aliases is None:
+        names = dict(School.objects.values_list("name", "id"))
+        for server_name, school_id in SchoolLookup.objects.values_list(
+            "server_name", "school_id"
+        ):
+            names.setdefault(server_name, school_id)
+
+        keys = {}
+        for name, school_id in names.items():
+            keys.setdefault(school_key(name), set()).add(school_id)
+
+        aliases = {
+            "names": names,
+            "keys": {
+                key: school_ids.pop()
+                for key, school_ids in keys.items()
+                if key and len(school_ids) == 1
+            },
+        }
+        cache.set(ALIAS_CACHE_KEY, aliases, ALIAS_CACHE_TIMEOUT)
+
+    return aliases
+
+
+def invalidate_school_aliases():
+    cache.delete(ALIAS_CACHE_KEY)
+
+
+class SchoolResolver:
+    def __init__(self):
+        aliases = school_aliases()
+        self.names = aliases["names"]
+        self.keys = aliases["keys"]
+
+    def resolve_id(self, name):
+        """
+        Tries the exact name, then its normalized key, then keys it is a
+        misspelling of when they all belong to one school.
+        """
+        name = (name or "").strip()
+
+        if name in self.names:
+            return self.names[name]
+
+        key = school_key(name)
+
+        if not key:
+            return None
+
+        if key in self.keys:
+            return self.keys[key]
+
+        close = [
+            match
+            for match in get_close_matches(
+                key, self.keys, n=3, cutoff=SCHOOL_MATCH_CUTOFF
+            )
+            if is_misspelling(key, match)
+        ]
+        if len({self.keys[match] for match in close}) == 1:
+            return self.keys[close[0]]
+
+        return None
+
+    def resolve(self, names):
+        """Returns {name: School} for the names that resolve, in one query"""
+        school_ids = {name: self.resolve_id(name) for name in names}
+        schools = School.objects.in_bulk(
+            [school_id for school_id in school_ids.values() if school_id]
+        )
+
+        return {
+            name: schools[school_id]
+            for name, school_id in school_ids.items()
+            if school_id in schools
+        }
+
+
+def save_aliases(aliases):
+    """
+    aliases are {server_name: school_id}. Creates or repoints the
+    SchoolLookup of every server name that isn't already the school's own
+    name, in bulk.
+    """
+    school_names = dict(
+        School.objects.filter(id__in=set(aliases.values())).values_list("id", "name")
+    )
+    aliases = {
+        server_name: school_id
+        for server_name, school_id in aliases.items()
+        if school_names.get(school_id, server_name) != server_name
+    }
+
+    if not aliases:
+        return
+
+    existing = {
+        lookup.server_name: lookup
+        for lookup in SchoolLookup.objects.filter(server_name__in=list(aliases))
+    }
+
+    to_update = []
+    for server_name, school_id in aliases.items():
+        lookup = existing.get(server_name)
+        if lookup and lookup.school_id != school_id:
+            lookup.school_id = school_id
+            to_update += [lookup]
+
+    SchoolLookup.objects.bulk_update(to_update, ["school"], batch_size=BATCH_SIZE)
+    SchoolLookup.objects.bulk_create(
+        [
+            SchoolLookup(server_name=server_name, school_id=school_id)
+            for server_name, school_id in aliases.items()
+            if server_name not in existing
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    invalidate_school_aliases()
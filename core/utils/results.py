@@ -0,0 +1,186 @@
+"""
+Differential writes of a tournament's team and speaker results. The desired
+results are compared with the stored ones and only the difference is
+applied, with bulk deletes, updates and creates. Callers wrap these in a
+transaction; the teams and debaters whose results changed, or whose points
+changed with the tournament's size, are recorded on the DirtySet passed in.
+"""
+
+from core.models.results.speaker import SpeakerResult
+from core.models.results.team import TeamResult
+from core.utils.standings.common import BATCH_SIZE, chunked
+
+
+def set_tournament_size(tournament, num_teams, num_novice_debaters, dirty):
+    """
+    Sets the tournament's team and novice counts without saving it. Every
+    result's points depend on them, so when they change every team and
+    debater with a result at the tournament is marked dirty, not just the
+    results that are rewritten. Returns whether they changed.
+    """
+    size = (num_teams, num_novice_debaters)
+
+    if size == (tournament.num_teams, tournament.num_novice_debaters):
+        return False
+
+    tournament.num_teams, tournament.num_novice_debaters = size
+
+    dirty.add_teams(
+        TeamResult.objects.filter(tournament=tournament).values_list(
+            "team_id", flat=True
+        )
+    )
+    dirty.add_debaters(
+        SpeakerResult.objects.filter(tournament=tournament).values_list(
+            "debater_id", flat=True
+        )
+    )
+
+    return True
+
+
+def team_result_key(type_of_place, place, team_id):
+    # Placed results are unique per (type, place); any number of teams can
+    # share place -1, so those are told apart by team
+    if place == -1:
+        return (type_of_place, place, team_id)
+    return (type_of_place, place)
+
+
+def sync_team_results(tournament, results, dirty, types=None):
+    """
+    results are (team_id, type_of_place, place, ghost_points) tuples for the
+    whole tournament, or only for the given types of place. Returns the
+    created/updated/deleted counts.
+    """
+    existing = {}
+    to_delete = []
+
+    stored = TeamResult.objects.filter(tournament=tournament).order_by("id")
+    if types is not None:
+        stored = stored.filter(type_of_place__in=types)
+
+    for result in stored:
+        key = team_result_key(result.type_of_place, result.place, result.team_id)
+        if key in existing:
+            to_delete += [result]
+            continue
+        existing[key] = result
+
+    to_create = []
+    to_update = []
+    seen = set()
+
+    for team_id, type_of_place, place, ghost_points in results:
+        key = team_result_key(type_of_place, place, team_id)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        result = existing.pop(key, None)
+
+        if result is None:
+            to_create += [
+                TeamResult(
+                    tournament=tournament,
+                    team_id=team_id,
+                    type_of_place=type_of_place,
+                    place=place,
+                    ghost_points=ghost_points,
+                )
+            ]
+            dirty.add_teams([team_id])
+            continue
+
+        if result.team_id == team_id and result.ghost_points == ghost_points:
+            continue
+
+        dirty.add_teams([result.team_id, team_id])
+        result.team_id = team_id
+        result.ghost_points = ghost_points
+        to_update += [result]
+
+    to_delete += list(existing.values())
+    dirty.add_teams(result.team_id for result in to_delete)
+
+    for ids in chunked(result.id for result in to_delete):
+        TeamResult.objects.filter(id__in=ids).delete()
+    TeamResult.objects.bulk_update(
+        to_update, ["team", "ghost_points"], batch_size=BATCH_SIZE
+    )
+    TeamResult.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+
+    return {
+        "created": len(to_create),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+    }
+
+
+def sync_speaker_results(tournament, results, dirty, types=None):
+    """
+    results are (debater_id, type_of_place, place, tie) tuples for the whole
+    tournament, or only for the given types of place. Returns the
+    created/updated/deleted counts.
+    """
+    existing = {}
+    to_delete = []
+
+    stored = SpeakerResult.objects.filter(tournament=tournament).order_by("id")
+    if types is not None:
+        stored = stored.filter(type_of_place__in=types)
+
+    for result in stored:
+        key = (result.type_of_place, result.place)
+        if key in existing:
+            to_delete += [result]
+            continue
+        existing[key] = result
+
+    to_create = []
+    to_update = []
+    seen = set()
+
+    for debater_id, type_of_place, place, tie in results:
+        if (type_of_place, place) in seen:
+            continue
+        seen.add((type_of_place, place))
+
+        result = existing.pop((type_of_place, place), None)
+
+        if result is None:
+            to_create += [
+                SpeakerResult(
+                    tournament=tournament,
+                    debater_id=debater_id,
+                    type_of_place=type_of_place,
+                    place=place,
+                    tie=tie,
+                )
+            ]
+            dirty.add_debaters([debater_id])
+            continue
+
+        if result.debater_id == debater_id and result.tie == tie:
+            continue
+
+        dirty.add_debaters([result.debater_id, debater_id])
+        result.debater_id = debater_id
+        result.tie = tie
+        to_update += [result]
+
+    to_delete += list(existing.values())
+    dirty.add_debaters(result.debater_id for result in to_delete)
+
+    for ids in chunked(result.id for result in to_delete):
+        SpeakerResult.objects.filter(id__in=ids).delete()
+    SpeakerResult.objects.bulk_update(
+        to_update, ["debater", "tie"], batch_size=BATCH_SIZE
+    )
+    SpeakerResult.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+
+    return {
+        "created": len(to_create),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+    }
@@ -0,0 +1,23 @@
+from .columns import score_season, update_season_standings
+from .dirty import DirtySet
+from .speakers import (
+    compute_noty,
+    compute_soty,
+    update_season_noty,
+    update_season_soty,
+    update_season_speakers,
+)
+from .toty import compute_toty, update_season_toty
+
+__all__ = [
+    "DirtySet",
+    "compute_noty",
+    "compute_soty",
+    "compute_toty",
+    "score_season",
+    "update_season_noty",
+    "update_season_soty",
+    "update_season_speakers",
+    "update_season_standings",
+    "update_season_toty",
+]
@@ -0,0 +1,71 @@
+import time
+
+from django.conf import settings
+
+from core.models.standings.coty import COTY
+from core.models.standings.noty import NOTY
+from core.models.standings.online_qual import OnlineQUAL
+from core.models.standings.soty import SOTY
+from core.models.standings.toty import TOTY
+from core.utils.rankings import redo_rankings
+from core.utils.standings.columns import update_season_standings
+from core.utils.standings.common import normalize_season
+from core.utils.standings.quals import update_season_quals
+from core.utils.standings.speakers import update_season_speakers
+from core.utils.standings.toty import update_season_toty
+
+STANDING_TYPES = ("toty", "speakers", "qual")
+
+RANKINGS = {
+    "toty": ((TOTY, "toty"),),
+    "speakers": ((SOTY, "soty"), (NOTY, "noty")),
+    "qual": ((COTY, "coty"), (OnlineQUAL, "online_quals")),
+}
+
+
+def add_counts(total, counts):
+    for key, value in counts.items():
+        total[key] = total.get(key, 0) + value
+    return total
+
+
+def recompute_season(season, types=STANDING_TYPES):
+    """
+    Recomputes and re-ranks the given standing types for one season.
+    Returns a summary with the season, the types, the combined save counts
+    and the time taken.
+    """
+    season = normalize_season(season)
+    started = time.monotonic()
+    counts = {}
+
+    if "toty" in types and "speakers" in types:
+        for summary in update_season_standings(season).values():
+            add_counts(counts, summary)
+    elif "toty" in types:
+        add_counts(counts, update_season_toty(season))
+    elif "speakers" in types:
+        for summary in update_season_speakers(season).values():
+            add_counts(counts, summary)
+
+    if "qual" in types:
+        for summary in update_season_quals(season).values():
+            add_counts(counts, summary)
+
+    for standing_type in types:
+        for model, cache_type in RANKINGS[standing_type]:
+            if model is OnlineQUAL and season not in settings.ONLINE_SEASONS:
+                continue
+
+            redo_rankings(
+                model.objects.filter(season=season),
+                season=season,
+                cache_type=cache_type,
+            )
+
+    return {
+        "season": season,
+        "types": tuple(types),
+        "counts": counts,
+        "seconds": time.monotonic() - started,
+    }
@@ -0,0 +1,215 @@
+"""
+Full-season scoring over columns. Every result of a season is exported in
+one query per result type into parallel lists, scored column-wise from the
+points tables, and grouped into each owner's best markers with a single
+sort, instead of walking teams and debaters one at a time.
+"""
+
+from itertools import groupby, islice
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import Q
+
+from core.models.debater import Debater
+from core.models.results.speaker import SpeakerResult
+from core.models.results.team import TeamResult
+from core.models.standings.noty import NOTY
+from core.models.standings.soty import SOTY
+from core.models.standings.toty import TOTY
+from core.utils.points_table import novice_points, speaker_points, team_points
+from core.utils.standings.common import normalize_season, save_standings
+from core.utils.standings.speakers import (
+    NOTY_MARKERS,
+    SOTY_MARKERS,
+    compute_noty,
+    compute_soty,
+)
+from core.utils.standings.toty import TOTY_MARKERS, compute_toty
+
+TEAM_COLUMNS = (
+    "id",
+    "team_id",
+    "tournament_id",
+    "place",
+    "ghost_points",
+    "tournament__num_teams",
+    "tournament__toty",
+    "tournament__qual",
+)
+
+SPEAKER_COLUMNS = (
+    "id",
+    "debater_id",
+    "tournament_id",
+    "type_of_place",
+    "place",
+    "tie",
+    "tournament__num_teams",
+    "tournament__num_novice_debaters",
+    "tournament__soty",
+    "tournament__noty",
+)
+
+
+def load_columns(queryset, names):
+    rows = queryset.order_by("id").values_list(*names)
+    columns = list(zip(*rows)) or [()] * len(names)
+
+    return dict(zip(names, columns))
+
+
+def load_team_columns(season):
+    return load_columns(
+        TeamResult.objects.filter(
+            Q(tournament__toty=True) | Q(tournament__qual=True),
+            tournament__season=season,
+            type_of_place=Debater.VARSITY,
+        ),
+        TEAM_COLUMNS,
+    )
+
+
+def load_speaker_columns(season, novice=True):
+    eligible = Q(tournament__soty=True, type_of_place=Debater.VARSITY)
+    if novice:
+        eligible |= Q(tournament__noty=True, type_of_place=Debater.NOVICE)
+
+    return load_columns(
+        SpeakerResult.objects.filter(eligible, tournament__season=season),
+        SPEAKER_COLUMNS,
+    )
+
+
+def group_markers(columns, owner, points, mask, limit=None):
+    """
+    Groups scored results into each owner's markers, best first. columns are
+    load_columns output, owner names its owner id column and points and mask
+    run parallel to it. Sorting on (owner, -points, result id) orders every
+    owner's results the same way top_markers does, so keeping the first
+    ``limit`` of each group selects the same markers.
+    """
+    rows = sorted(
+        (owner_id, -point, result_id, tournament_id)
+        for owner_id, point, tournament_id, result_id, keep in zip(
+            columns[owner], points, columns["tournament_id"], columns["id"], mask
+        )
+        if keep
+    )
+
+    return {
+        owner: [
+            (-point, tournament_id, result_id)
+            for _, point, result_id, tournament_id in islice(group, limit)
+        ]
+        for owner, group in groupby(rows, key=itemgetter(0))
+    }
+
+
+def score_team_columns(columns, trim=True):
+    points = list(
+        map(
+            team_points,
+            columns["tournament__num_teams"],
+            columns["place"],
+            columns["ghost_points"],
+        )
+    )
+
+    return {
+        "toty": group_markers(
+            columns,
+            "team_id",
+            points,
+            columns["tournament__toty"],
+            limit=TOTY_MARKERS if trim else None,
+        ),
+        "qual": group_markers(columns, "team_id", points, columns["tournament__qual"]),
+    }
+
+
+def score_speaker_columns(columns, trim=True):
+    varsity = [
+        type_of_place == Debater.VARSITY and soty
+        for type_of_place, soty in zip(
+            columns["type_of_place"], columns["tournament__soty"]
+        )
+    ]
+    novice = [
+        type_of_place == Debater.NOVICE and noty
+        for type_of_place, noty in zip(
+            columns["type_of_place"], columns["tournament__noty"]
+        )
+    ]
+
+    points = [
+        speaker_points(num_teams, place - (1 if tie else 0))
+        if is_varsity
+        else novice_points(num_novices, place)
+        for is_varsity, num_teams, num_novices, place, tie in zip(
+            varsity,
+            columns["tournament__num_teams"],
+            columns["tournament__num_novice_debaters"],
+            columns["place"],
+            columns["tie"],
+        )
+    ]
+
+    return {
+        "soty": group_markers(
+            columns,
+            "debater_id",
+            points,
+            varsity,
+            limit=SOTY_MARKERS if trim else None,
+        ),
+        "noty": group_markers(
+            columns,
+            "debater_id",
+            points,
+            novice,
+            limit=NOTY_MARKERS if trim else None,
+        ),
+    }
+
+
+def score_season(season=settings.CURRENT_SEASON, trim=True):
+    """
+    Scores every result of a season in two queries. Returns owner -> markers
+    mappings for "toty", "soty" and "noty" (trimmed to each standing's marker
+    count unless trim is False) and "qual" (every qualifying team result).
+    """
+    season = normalize_season(season)
+
+    scored = score_team_columns(load_team_columns(season), trim=trim)
+    scored.update(
+        score_speaker_columns(
+            load_speaker_columns(
+                season, novice=int(season) <= settings.LAST_NOTY_SEASON
+            ),
+            trim=trim,
+        )
+    )
+
+    return scored
+
+
+def update_season_standings(season=settings.CURRENT_SEASON):
+    """
+    Recomputes a season's TOTY, SOTY and NOTY from one columnar scoring pass.
+    Returns the save summary of each standing.
+    """
+    season = normalize_season(season)
+    scored = score_season(season)
+
+    return {
+        "toty": save_standings(
+            TOTY, "team", season, compute_toty(season, results=scored["toty"])
+        ),
+        "soty": save_standings(
+            SOTY, "debater", season, compute_soty(season, results=scored["soty"])
+        ),
+        "noty": save_standings(
+            NOTY, "debater", season, compute_noty(season, results=scored["noty"])
+        ),
+    }
@@ -0,0 +1,134 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+LABELS = ["one", "two", "three", "four", "five", "six"]
+
+MARKER_FIELDS = [f"marker_{label}" for label in LABELS] + [
+    f"tournament_{label}" for label in LABELS
+]
+
+BATCH_SIZE = 500
+
+STANDINGS_VERSION_TIMEOUT = 10 * 60
+
+
+def normalize_season(season):
+    if isinstance(season, str):
+        season = season.split("-")[0]
+    return str(int(season))
+
+
+def standings_version(season):
+    """
+    A token for caches derived from a season's standings. It changes
+    whenever the season is re-placed, and at least every
+    STANDINGS_VERSION_TIMEOUT, so such caches never lag further behind.
+    """
+    return cache.get_or_set(
+        f"standings_version:{normalize_season(season)}",
+        lambda: uuid4().hex,
+        STANDINGS_VERSION_TIMEOUT,
+    )
+
+
+def invalidate_standings_version(season):
+    cache.delete(f"standings_version:{normalize_season(season)}")
+
+
+def chunked(items, size=BATCH_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def top_markers(markers, limit):
+    # markers are (points, tournament_id, result_id) tuples; results are put
+    # back in id order first so ties break the same way the per-entity
+    # update_* functions break them when iterating a queryset
+    markers = sorted(markers, key=lambda marker: marker[2])
+    markers.sort(key=lambda marker: marker[0], reverse=True)
+
+    return markers[:limit]
+
+
+def standing_values(markers):
+    values = {"points": sum(marker[0] for marker in markers)}
+
+    for i, label in enumerate(LABELS):
+        if i < len(markers):
+            values[f"marker_{label}"] = markers[i][0]
+            values[f"tournament_{label}_id"] = markers[i][1]
+        else:
+            values[f"marker_{label}"] = 0
+            values[f"tournament_{label}_id"] = None
+
+    return values
+
+
+def save_standings(model, owner_field, season, standings):
+    """
+    Writes computed standings back in bulk. ``standings`` maps an owner id
+    (team, debater or school) to its list of markers; an empty list removes
+    the owner's row. Owners that are not in the mapping are left untouched.
+    """
+    season = normalize_season(season)
+    owner_attr = f"{owner_field}_id"
+
+    existing_rows = model.objects.filter(season=season).order_by("place", "id")
+    if len(standings) < BATCH_SIZE:
+        existing_rows = existing_rows.filter(**{f"{owner_attr}__in": list(standings)})
+
+    existing = {}
+    to_delete = []
+
+    for row in existing_rows:
+        owner_id = getattr(row, owner_attr)
+        if owner_id not in standings:
+            continue
+        if owner_id in existing:
+            to_delete += [row.id]
+            continue
+        existing[owner_id] = row
+
+    to_create = []
+    to_update = []
+
+    for owner_id, markers in standings.items():
+        row = existing.get(owner_id)
+
+        if not markers:
+            if row:
+                to_delete += [row.id]
+            continue
+
+        values = standing_values(markers)
+
+        if not row:
+            row = model(season=season, **{owner_attr: owner_id})
+            for field, value in values.items():
+                setattr(row, field, value)
+            to_create += [row]
+            continue
+
+        if all(getattr(row, field) == value for field, value in values.items()):
+            continue
+
+        for field, value in values.items():
+            setattr(row, field, value)
+        to_update += [row]
+
+    with transaction.atomic():
+        for ids in chunked(to_delete):
+            model.objects.filter(id__in=ids).delete()
+        model.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        model.objects.bulk_update(
+            to_update, ["points"] + MARKER_FIELDS, batch_size=BATCH_SIZE
+        )
+
+    return {
+        "created": len(to_create),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+    }
@@ -0,0 +1,288 @@
+"""
+Dry-run diffs of a season recompute. The engines run into memory, the
+result is placed the same way redo_rankings would place it, and only the
+rows that would change are reported; nothing is written.
+"""
+
+from django.conf import settings
+
+from core.models.debater import Debater, QualPoints
+from core.models.standings.coty import COTY
+from core.models.standings.noty import NOTY
+from core.models.standings.qual import QUAL
+from core.models.standings.soty import SOTY
+from core.models.standings.toty import TOTY
+from core.utils.rankings import assign_places
+from core.utils.standings.columns import score_season
+from core.utils.standings.common import normalize_season
+from core.utils.standings.quals import (
+    compute_quals,
+    is_derived,
+    plan_changes,
+    plan_quals,
+    sum_coty,
+)
+from core.utils.standings.speakers import compute_noty, compute_soty
+from core.utils.standings.toty import compute_toty
+
+DIFF_STANDINGS = ("toty", "soty", "noty", "coty", "qual_points", "qual")
+
+# Standings covered by each recompute_standings type
+TYPE_STANDINGS = {
+    "toty": ("toty",),
+    "speakers": ("soty", "noty"),
+    "qual": ("coty", "qual_points", "qual"),
+}
+
+
+def stored_rows(model, owner_field, season):
+    rows = {}
+
+    for owner_id, points, place in (
+        model.objects.filter(season=season)
+        .order_by("place", "id")
+        .values_list(f"{owner_field}_id", "points", "place")
+    ):
+        rows.setdefault(owner_id, (points, place))
+
+    return rows
+
+
+def place_points(points):
+    """
+    Places owner -> points the way place_rankings does: highest first, ties
+    sharing a place and rows with no points dropped.
+    """
+    totals = sorted(
+        ((owner_points, owner_id) for owner_id, owner_points in points.items()),
+        key=lambda total: -total[0],
+    )
+
+    return {
+        owner_id: (owner_points, place)
+        for (owner_points, owner_id), place, _ in assign_places(
+            [total for total in totals if total[0] != 0],
+            points=lambda total: total[0],
+        )
+    }
+
+
+def project_standings(stored, standings):
+    """
+    Applies computed owner -> markers on top of stored rows the way
+    save_standings does: [] removes a row, owners left out keep theirs.
+    """
+    points = {owner_id: row[0] for owner_id, row in stored.items()}
+
+    for owner_id, markers in standings.items():
+        if markers:
+            points[owner_id] = sum(marker[0] for marker in markers)
+        else:
+            points.pop(owner_id, None)
+
+    return place_points(points)
+
+
+def diff_rows(stored, projected):
+    """
+    Compares owner -> (points, place) mappings. Returns the owners added and
+    removed and the (owner, before, after) of points and place changes.
+    """
+    diff = {"added": [], "removed": [], "points": [], "place": []}
+
+    for owner_id in sorted(set(stored) | set(projected), key=str):
+        before = stored.get(owner_id)
+        after = projected.get(owner_id)
+
+        if before is None:
+            diff["added"] += [(owner_id, after)]
+        elif after is None:
+            diff["removed"] += [(owner_id, before)]
+        else:
+            if before[0] != after[0]:
+                diff["points"] += [(owner_id, before[0], after[0])]
+            if before[1] != after[1]:
+                diff["place"] += [(owner_id, before[1], after[1])]
+
+    return diff
+
+
+def diff_counts(diff):
+    return {change: len(rows) for change, rows in diff.items()}
+
+
+def apply_plan(rows, plan):
+    """Applies a quals plan to owner -> (value, place) rows in memory"""
+    to_create, to_update, to_delete = plan
+
+    for key in to_delete:
+        rows.pop(key, None)
+
+    for key, value in to_update.items():
+        rows[key] = (value, None)
+
+    # Creates that clash with a hand-entered qual are dropped, the same as
+    # the unique constraint drops them in save_quals
+    for key, value in to_create.items():
+        rows.setdefault(key, (value, None))
+
+    return rows
+
+
+def project_quals(season, prune=None):
+    """
+    Runs the qual engine into memory and returns the QualPoints, QUAL and
+    COTY rows update_season_quals would leave behind, next to the stored
+    ones: {name: (stored, projected)}. prune defaults to whether the season
+    is the current one, the same as update_season_quals. Changes are planned
+    by the same functions the save path uses.
+    """
+    if prune is None:
+        prune = season == normalize_season(settings.CURRENT_SEASON)
+    quals, qual_points, debaters, _ = compute_quals(season)
+
+    excluded_schools = {
+        school_id
+        for school_id, included_in_oty, _ in debaters.values()
+        if school_id and not included_in_oty
+    }
+
+    stored_points = {}
+    for debater_id, points in (
+        QualPoints.objects.filter(season=season)
+        .order_by("id")
+        .values_list("debater_id", "points")
+    ):
+        stored_points.setdefault(debater_id, (points, None))
+
+    projected_points = apply_plan(
+        dict(stored_points),
+        plan_changes(
+            {
+                debater_id: row[0]
+                for debater_id, row in stored_points.items()
+                if debater_id in debaters
+            },
+            qual_points,
+            debaters,
+            prune,
+        ),
+    )
+
+    stored_quals = {
+        (debater_id, qual_type): (tournament_id, None)
+        for debater_id, qual_type, tournament_id in QUAL.objects.filter(
+            season=season
+        ).values_list("debater_id", "qual_type", "tournament_id")
+    }
+
+    projected_quals = apply_plan(
+        dict(stored_quals),
+        plan_quals(
+            {
+                key: row[0]
+                for key, row in stored_quals.items()
+                if key[0] in debaters and is_derived(key[1], row[0])
+            },
+            quals,
+            debaters,
+            prune,
+        ),
+    )
+
+    schools = dict(
+        Debater.objects.filter(
+            id__in={debater_id for debater_id, _ in projected_quals}
+            | set(projected_points)
+            | set(debaters)
+        ).values_list("id", "school_id")
+    )
+
+    if prune and excluded_schools:
+        projected_points = {
+            debater_id: row
+            for debater_id, row in projected_points.items()
+            if schools.get(debater_id) not in excluded_schools
+        }
+        projected_quals = {
+            key: row
+            for key, row in projected_quals.items()
+            if schools.get(key[0]) not in excluded_schools
+        }
+
+    counted = set(schools.values()) - excluded_schools - {None}
+    coty_points = sum_coty(
+        [
+            (schools[debater_id], points)
+            for debater_id, (points, _) in projected_points.items()
+            if schools.get(debater_id) in counted
+        ],
+        [
+            (schools[debater_id], debater_id)
+            for debater_id, _ in projected_quals
+            if schools.get(debater_id) in counted
+        ],
+    )
+
+    stored_coty = stored_rows(COTY, "school", season)
+    scope = {school_id for school_id, _, _ in debaters.values() if school_id}
+    scope |= set(stored_coty)
+
+    projected_coty = apply_plan(
+        dict(stored_coty),
+        plan_changes(
+            {school_id: row[0] for school_id, row in stored_coty.items()},
+            coty_points,
+            scope,
+            prune,
+        ),
+    )
+
+    return {
+        "qual_points": (stored_points, projected_points),
+        "qual": (stored_quals, projected_quals),
+        "coty": (
+            stored_coty,
+            place_points(
+                {school_id: row[0] for school_id, row in projected_coty.items()}
+            ),
+        ),
+    }
+
+
+def diff_season(season=settings.CURRENT_SEASON, standings=DIFF_STANDINGS):
+    """
+    Returns {standing: diff} of what recomputing and re-ranking a season
+    would change, for the given standings. QUAL rows are keyed by
+    (debater_id, qual_type); QualPoints have no place.
+    """
+    season = normalize_season(season)
+    standings = [name for name in DIFF_STANDINGS if name in standings]
+
+    if int(season) > settings.LAST_NOTY_SEASON and "noty" in standings:
+        standings.remove("noty")
+
+    diffs = {}
+
+    if {"toty", "soty", "noty"} & set(standings):
+        scored = score_season(season)
+        engines = {
+            "toty": (TOTY, "team", compute_toty),
+            "soty": (SOTY, "debater", compute_soty),
+            "noty": (NOTY, "debater", compute_noty),
+        }
+
+        for name, (model, owner_field, compute) in engines.items():
+            if name not in standings:
+                continue
+
+            stored = stored_rows(model, owner_field, season)
+            projected = project_standings(stored, compute(season, results=scored[name]))
+            diffs[name] = diff_rows(stored, projected)
+
+    if {"coty", "qual_points", "qual"} & set(standings):
+        for name, (stored, projected) in project_quals(season).items():
+            if name in standings:
+                diffs[name] = diff_rows(stored, projected)
+
+    return {name: diffs[name] for name in standings}
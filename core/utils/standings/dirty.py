@@ -0,0 +1,164 @@
+from django.conf import settings
+
+from core.models.standings.coty import COTY
+from core.models.standings.noty import NOTY
+from core.models.standings.online_qual import OnlineQUAL
+from core.models.standings.soty import SOTY
+from core.models.standings.toty import TOTY
+from core.models.team import Team
+from core.utils.standings.common import normalize_season
+from core.utils.standings.quals import update_season_quals
+from core.utils.standings.reaffs import season_reaffs
+from core.utils.standings.speakers import update_season_noty, update_season_soty
+from core.utils.standings.toty import update_season_toty
+
+
+def affected_range(before, after):
+    """
+    Given an owner -> points snapshot taken before and after a recompute,
+    returns the (low, high) band of the leaderboard whose places can have
+    moved, or None when nothing changed. A row that appeared or disappeared
+    shifts everyone below it, so the band is open at the bottom.
+    """
+    changed = [
+        owner
+        for owner in set(before) | set(after)
+        if before.get(owner) != after.get(owner)
+    ]
+
+    if not changed:
+        return None
+
+    points = [before[owner] for owner in changed if owner in before] + [
+        after[owner] for owner in changed if owner in after
+    ]
+
+    low = min(points)
+
+    if any(owner not in before or owner not in after for owner in changed):
+        low = None
+
+    return low, max(points)
+
+
+class DirtySet:
+    """
+    Records the teams, debaters and schools touched by result and reaff
+    writes for one season, then recomputes just their standings and
+    re-places just the part of each leaderboard they can have moved.
+    """
+
+    def __init__(self, season=settings.CURRENT_SEASON):
+        self.season = normalize_season(season)
+        self.teams = set()
+        self.debaters = set()
+
+    def __bool__(self):
+        return bool(self.teams or self.debaters)
+
+    def add_teams(self, teams):
+        self.teams |= {getattr(team, "id", team) for team in teams}
+
+    def add_debaters(self, debaters):
+        self.debaters |= {getattr(debater, "id", debater) for debater in debaters}
+
+    def add_team_result(self, result):
+        self.teams.add(result.team_id)
+
+    def add_speaker_result(self, result):
+        self.debaters.add(result.debater_id)
+
+    def add_reaff(self, reaff):
+        self.debaters |= {reaff.old_debater_id, reaff.new_debater_id}
+
+    def add_toty_reaff(self, reaff):
+        self.teams |= {reaff.old_team_id, reaff.new_team_id}
+
+    def team_debaters(self):
+        return set(
+            Team.debaters.through.objects.filter(team_id__in=self.teams).values_list(
+                "debater_id", flat=True
+            )
+        )
+
+    def schools(self, debaters):
+        return set(
+            Team.debaters.through.objects.filter(debater_id__in=debaters)
+            .exclude(debater__school=None)
+            .values_list("debater__school_id", flat=True)
+        )
+
+    def snapshot(self, scopes):
+        return {
+            cache_type: dict(
+                model.objects.filter(
+                    season=self.season, **{f"{owner}_id__in": ids}
+                ).values_list(f"{owner}_id", "points")
+            )
+            for cache_type, (model, owner, ids) in scopes.items()
+        }
+
+    def recompute(self, progress=None):
+        # Imported here because rankings pulls in the standings package
+        # pylint: disable=import-outside-toplevel
+        from core.utils.rankings import redo_rankings_range
+
+        if not self:
+            return
+
+        progress = progress or (lambda message: None)
+
+        team_debaters = self.team_debaters()
+
+        # The engines also rewrite whatever the dirty ids were reaffiliated
+        # into, so those rows have to be in the snapshots too
+        scopes = {
+            "toty": (
+                TOTY,
+                "team",
+                season_reaffs("team", self.season).scope(self.teams),
+            ),
+            "soty": (
+                SOTY,
+                "debater",
+                season_reaffs("debater", self.season).scope(self.debaters),
+            ),
+            "noty": (NOTY, "debater", self.debaters),
+            "coty": (COTY, "school", self.schools(team_debaters)),
+            "online_quals": (OnlineQUAL, "debater", team_debaters),
+        }
+
+        before = self.snapshot(scopes)
+
+        if self.teams:
+            progress(f"Updating {len(self.teams)} teams")
+            update_season_toty(self.season, team_ids=self.teams)
+
+            update_season_quals(self.season, debater_ids=team_debaters)
+
+            if self.season == settings.CURRENT_SEASON:
+                Team.objects.filter(
+                    id__in=self.teams, team_results__isnull=True
+                ).delete()
+
+        if self.debaters:
+            progress(f"Updating {len(self.debaters)} debaters")
+            update_season_soty(self.season, debater_ids=self.debaters)
+            update_season_noty(self.season, debater_ids=self.debaters)
+
+        after = self.snapshot(scopes)
+
+        for cache_type, (model, _, _) in scopes.items():
+            bounds = affected_range(before[cache_type], after[cache_type])
+
+            if bounds is None:
+                continue
+
+            progress(f"Ranking {cache_type.upper()}")
+            redo_rankings_range(
+                model.objects.filter(season=self.season),
+                low=bounds[0],
+                high=bounds[1],
+                season=self.season,
+                cache_type=cache_type,
+            )
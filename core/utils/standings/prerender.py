@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.http import HttpRequest, QueryDict
+from django.shortcuts import reverse
+from django.template.loader import render_to_string
+
+from core.models.standings.coty import COTY
+from core.models.standings.noty import NOTY
+from core.models.standings.online_qual import OnlineQUAL
+from core.models.standings.soty import SOTY
+from core.models.standings.toty import TOTY
+
+FRAGMENTS = ("toty", "soty", "coty", "noty", "online_quals")
+
+
+def standings_context(season):
+    """
+    The context shared by the index page and the prerendered standings
+    fragments, so both render the same markup for a season.
+    """
+    seasons = settings.SEASONS
+
+    context = {
+        "seasons": seasons,
+        "current_season": season,
+        "toty": TOTY.objects.filter(season=season).order_by("-points"),
+        "coty": COTY.objects.filter(season=season).order_by("-points"),
+        "soty": SOTY.objects.filter(season=season).order_by("-points"),
+        "noty": NOTY.objects.filter(season=season).order_by("-points"),
+        "render_noty": int(season) <= settings.LAST_NOTY_SEASON,
+        "using_online_quals": False,
+        "online_quals": None,
+        "online_seasons": None,
+        "online_qual_bar": None,
+    }
+
+    if season in settings.ONLINE_SEASONS:
+        context["using_online_quals"] = True
+        context["online_quals"] = OnlineQUAL.objects.filter(season=season).order_by(
+            "-points"
+        )
+        context["online_seasons"] = [
+            (online_season[0], online_season[1])
+            for online_season in seasons
+            if online_season[0] in settings.ONLINE_SEASONS
+        ]
+        context["online_qual_bar"] = settings.ONLINE_QUAL_BAR
+
+    return context
+
+
+def index_request(season):
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = reverse("core:index")
+    request.GET = QueryDict(f"season={season}")
+    return request
+
+
+def prerender_fragment(season, cache_type, context=None):
+    """
+    Renders one standings tab for a season and stores it under the key the
+    index page's {% cache %} tag reads, without going through a request.
+    """
+    if context is None:
+        context = standings_context(season)
+
+    html = render_to_string(
+        f"core/standings/{cache_type}.html",
+        {**context, "request": index_request(season)},
+    )
+    cache.set(make_template_fragment_key(cache_type, [season]), html, None)
+    return html
+
+
+def prerender_season(season, cache_types=FRAGMENTS):
+    context = standings_context(season)
+
+    for cache_type in cache_types:
+        prerender_fragment(season, cache_type, context=context)
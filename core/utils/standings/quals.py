@@ -0,0 +1,563 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from core.models.debater import Debater, QualPoints
+from core.models.results.team import TeamResult
+from core.models.standings.coty import COTY
+from core.models.standings.online_qual import OnlineQUAL
+from core.models.standings.qual import QUAL, QualSummary
+from core.models.team import Team
+from core.utils.points_table import online_place_points, team_points
+from core.utils.standings.common import (
+    BATCH_SIZE,
+    chunked,
+    normalize_season,
+    save_standings,
+    top_markers,
+)
+
+COTY_POINTS_CAP = 60
+COTY_QUAL_BONUS = 6
+ONLINE_QUAL_MARKERS = 6
+
+
+def load_qual_results(season, debater_ids=None):
+    """
+    Loads the season's varsity team results once and hands each one to every
+    debater on the team. Returns debater id -> result tuples in id order.
+    """
+    members = Team.debaters.through.objects.filter(
+        team_id__in=TeamResult.objects.filter(
+            tournament__season=season, type_of_place=Debater.VARSITY
+        ).values("team_id")
+    )
+
+    if debater_ids is not None:
+        members = members.filter(debater_id__in=debater_ids)
+
+    team_members = defaultdict(list)
+    for team_id, debater_id in members.values_list("team_id", "debater_id"):
+        team_members[team_id] += [debater_id]
+
+    results = defaultdict(list)
+
+    for row in (
+        TeamResult.objects.filter(
+            tournament__season=season,
+            type_of_place=Debater.VARSITY,
+            team_id__in=list(team_members),
+        )
+        .order_by("id")
+        .values_list(
+            "team_id",
+            "tournament_id",
+            "place",
+            "ghost_points",
+            "tournament__num_teams",
+            "tournament__qual",
+            "tournament__autoqual_bar",
+            "tournament__qual_type",
+            "tournament__online_qual_points",
+            "id",
+        )
+    ):
+        for debater_id in team_members[row[0]]:
+            results[debater_id] += [row[1:]]
+
+    return results
+
+
+def derived_quals(queryset):
+    # Quals entered by hand (no tournament, not a points qual) are never
+    # recomputed, so the engine leaves them alone
+    return queryset.filter(Q(tournament__isnull=False) | Q(qual_type=QUAL.POINTS))
+
+
+def is_derived(qual_type, tournament_id):
+    # The same split as derived_quals, for rows already in memory
+    return tournament_id is not None or qual_type == QUAL.POINTS
+
+
+def online_qual_markers(results):
+    return top_markers(
+        [
+            (
+                online_place_points(place) if online_qual_points else 0,
+                tournament_id,
+                result_id,
+            )
+            for tournament_id, place, *_, online_qual_points, result_id in results
+        ],
+        ONLINE_QUAL_MARKERS,
+    )
+
+
+def compute_quals(season=settings.CURRENT_SEASON, debater_ids=None, results=None):
+    """
+    Computes every debater's autoquals, qual points and points qual for a
+    season, following the same rules as update_qual_points. In online
+    seasons the points qual comes from the best six online qual results
+    against ONLINE_QUAL_BAR instead. Returns
+    (quals, qual_points, debaters, competed): debater id -> {qual_type:
+    tournament_id}, debater id -> points (None for no row), debater id ->
+    (school_id, included_in_oty, latest_season) and the ids of debaters with
+    results this season. Excluded debaters are absent from quals and
+    qual_points.
+    """
+    season = normalize_season(season)
+    if results is None:
+        results = load_qual_results(season, debater_ids)
+
+    if debater_ids is not None:
+        candidates = set(debater_ids)
+    else:
+        candidates = (
+            set(results)
+            | set(
+                QualPoints.objects.filter(season=season).values_list(
+                    "debater_id", flat=True
+                )
+            )
+            | set(
+                derived_quals(QUAL.objects.filter(season=season)).values_list(
+                    "debater_id", flat=True
+                )
+            )
+        )
+
+    debaters = {
+        debater_id: (school_id, included_in_oty, latest_season)
+        for debater_id, school_id, included_in_oty, latest_season in Debater.objects.filter(
+            id__in=candidates
+        ).values_list(
+            "id", "school_id", "school__included_in_oty", "latest_season"
+        )
+    }
+
+    quals = {}
+    qual_points = {}
+
+    for debater_id, (school_id, included_in_oty, _) in debaters.items():
+        if school_id is not None and not included_in_oty:
+            continue
+
+        debater_quals = {}
+        points = 0
+
+        for (
+            tournament_id,
+            place,
+            ghost_points,
+            num_teams,
+            qual,
+            autoqual_bar,
+            qual_type,
+            _,
+            _,
+        ) in results.get(debater_id, []):
+            if place != -1 and place <= autoqual_bar:
+                debater_quals.setdefault(qual_type, tournament_id)
+
+            if qual:
+                points += team_points(num_teams, place, ghost_points=ghost_points)
+
+        if season in settings.ONLINE_SEASONS:
+            online_points = sum(
+                marker[0] for marker in online_qual_markers(results.get(debater_id, []))
+            )
+            if online_points >= settings.ONLINE_QUAL_BAR:
+                debater_quals.setdefault(QUAL.POINTS, None)
+        elif points >= settings.QUAL_BAR:
+            debater_quals.setdefault(QUAL.POINTS, None)
+
+        quals[debater_id] = debater_quals
+        qual_points[debater_id] = (
+            points if points > 0 else (0 if debater_quals else None)
+        )
+
+    return quals, qual_points, debaters, set(results)
+
+
+def compute_online_quals(season, results, debaters, prune_missing=False):
+    """
+    Builds OnlineQUAL markers (the best six online qual results) for the
+    given debaters from already loaded results. Debaters without results or
+    from schools left out of the standings map to [] so their rows are
+    removed; with prune_missing every other saved row of the season is too.
+    """
+    standings = {}
+
+    if prune_missing:
+        for debater_id in OnlineQUAL.objects.filter(season=season).values_list(
+            "debater_id", flat=True
+        ):
+            standings[debater_id] = []
+
+    for debater_id, (school_id, included_in_oty, _) in debaters.items():
+        if school_id is not None and not included_in_oty:
+            standings[debater_id] = []
+            continue
+
+        standings[debater_id] = online_qual_markers(results.get(debater_id, []))
+
+    return standings
+
+
+def plan_quals(existing, quals, debater_ids, prune):
+    """
+    Compares derived quals, existing (debater_id, qual_type) ->
+    tournament_id, with the computed ones of debater_ids. Returns
+    (to_create, to_update, to_delete): key -> tournament_id for the first
+    two and the keys to remove. Outside prune quals are only ever added.
+    """
+    existing = dict(existing)
+    to_create = {}
+    to_update = {}
+
+    for debater_id in debater_ids:
+        for qual_type, tournament_id in quals.get(debater_id, {}).items():
+            key = (debater_id, qual_type)
+
+            if key not in existing:
+                to_create[key] = tournament_id
+            elif prune and existing[key] != tournament_id:
+                to_update[key] = tournament_id
+
+            existing.pop(key, None)
+
+    return to_create, to_update, list(existing) if prune else []
+
+
+def plan_changes(existing, values, owner_ids, prune):
+    """
+    Compares existing owner -> value with computed values for owner_ids,
+    where a missing value means no row. Returns (to_create, to_update,
+    to_delete): owner -> value for the first two and the owners to remove.
+    Outside prune rows are only ever added or updated.
+    """
+    to_create = {}
+    to_update = {}
+    to_delete = []
+
+    for owner_id in owner_ids:
+        value = values.get(owner_id)
+
+        if value is None:
+            if owner_id in existing and prune:
+                to_delete += [owner_id]
+            continue
+
+        if owner_id not in existing:
+            to_create[owner_id] = value
+        elif existing[owner_id] != value:
+            to_update[owner_id] = value
+
+    return to_create, to_update, to_delete
+
+
+def save_quals(season, quals, debater_ids, prune):
+    existing = {}
+
+    for qual in derived_quals(
+        QUAL.objects.filter(season=season, debater_id__in=debater_ids)
+    ).order_by("id"):
+        existing[(qual.debater_id, qual.qual_type)] = qual
+
+    to_create, to_update, to_delete = plan_quals(
+        {key: qual.tournament_id for key, qual in existing.items()},
+        quals,
+        debater_ids,
+        prune,
+    )
+
+    for key, tournament_id in to_update.items():
+        existing[key].tournament_id = tournament_id
+
+    for ids in chunked([existing[key].id for key in to_delete]):
+        QUAL.objects.filter(id__in=ids).delete()
+    # Hand-entered quals can share a (season, debater, qual_type) with a
+    # derived one; the unique constraint keeps whichever came first
+    QUAL.objects.bulk_create(
+        [
+            QUAL(
+                season=season,
+                debater_id=debater_id,
+                qual_type=qual_type,
+                tournament_id=tournament_id,
+            )
+            for (debater_id, qual_type), tournament_id in to_create.items()
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    QUAL.objects.bulk_update(
+        [existing[key] for key in to_update], ["tournament"], batch_size=BATCH_SIZE
+    )
+
+    return {
+        "created": len(to_create),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+    }
+
+
+def save_qual_points(season, qual_points, debater_ids, prune):
+    existing = {}
+    duplicates = []
+
+    for row in QualPoints.objects.filter(
+        season=season, debater_id__in=debater_ids
+    ).order_by("id"):
+        if row.debater_id in existing:
+            duplicates += [row.id]
+            continue
+        existing[row.debater_id] = row
+
+    to_create, to_update, to_delete = plan_changes(
+        {debater_id: row.points for debater_id, row in existing.items()},
+        qual_points,
+        debater_ids,
+        prune,
+    )
+
+    for debater_id, points in to_update.items():
+        existing[debater_id].points = points
+
+    to_delete = [existing[debater_id].id for debater_id in to_delete]
+    if prune:
+        to_delete += duplicates
+
+    for ids in chunked(to_delete):
+        QualPoints.objects.filter(id__in=ids).delete()
+    QualPoints.objects.bulk_create(
+        [
+            QualPoints(season=season, debater_id=debater_id, points=points)
+            for debater_id, points in to_create.items()
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    QualPoints.objects.bulk_update(
+        [existing[debater_id] for debater_id in to_update],
+        ["points"],
+        batch_size=BATCH_SIZE,
+    )
+
+    return {
+        "created": len(to_create),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+    }
+
+
+def sum_coty(points, qualled):
+    """
+    Sums each school's qual points (capped at 60 per debater) plus 6 for
+    every debater with a qual. points are (school_id, debater points) and
+    qualled (school_id, debater_id) pairs.
+    """
+    totals = defaultdict(float)
+
+    for school_id, debater_points in points:
+        totals[school_id] += min(COTY_POINTS_CAP, debater_points)
+
+    qualled_debaters = defaultdict(set)
+    for school_id, debater_id in qualled:
+        qualled_debaters[school_id].add(debater_id)
+
+    for school_id, debater_ids in qualled_debaters.items():
+        totals[school_id] += len(debater_ids) * COTY_QUAL_BONUS
+
+    return totals
+
+
+def compute_coty(season, school_ids):
+    """Runs sum_coty over the rows currently saved for the given schools"""
+    return sum_coty(
+        QualPoints.objects.filter(
+            season=season, debater__school_id__in=school_ids
+        ).values_list("debater__school_id", "points"),
+        QUAL.objects.filter(season=season, debater__school_id__in=school_ids)
+        .values_list("debater__school_id", "debater_id")
+        .distinct(),
+    )
+
+
+def save_coty(season, points, school_ids, prune):
+    existing = {
+        row.school_id: row
+        for row in COTY.objects.filter(season=season, school_id__in=school_ids)
+    }
+
+    to_create, to_update, to_delete = plan_changes(
+        {school_id: row.points for school_id, row in existing.items()},
+        points,
+        school_ids,
+        prune,
+    )
+
+    for school_id, school_points in to_update.items():
+        existing[school_id].points = school_points
+
+    for ids in chunked([existing[school_id].id for school_id in to_delete]):
+        COTY.objects.filter(id__in=ids).delete()
+    COTY.objects.bulk_create(
+        [
+            COTY(season=season, school_id=school_id, points=school_points)
+            for school_id, school_points in to_create.items()
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    COTY.objects.bulk_update(
+        [existing[school_id] for school_id in to_update],
+        ["points"],
+        batch_size=BATCH_SIZE,
+    )
+
+    return {
+        "created": len(to_create),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+    }
+
+
+def refresh_qual_summaries(season, school_ids):
+    """
+    Rebuilds the QualSummary rows of the given schools from their saved
+    QualPoints and QUAL rows: every debater with qual points or a qual, with
+    their qual types and COTY contribution.
+    """
+    season = normalize_season(season)
+    school_ids = set(school_ids)
+
+    points = {}
+    for debater_id, school_id, debater_points in (
+        QualPoints.objects.filter(season=season, debater__school_id__in=school_ids)
+        .order_by("id")
+        .values_list("debater_id", "debater__school_id", "points")
+    ):
+        points.setdefault(debater_id, (school_id, debater_points))
+
+    labels = dict(QUAL.QUAL_TYPES)
+    qual_types = defaultdict(list)
+    for debater_id, school_id, qual_type in (
+        QUAL.objects.filter(season=season, debater__school_id__in=school_ids)
+        .order_by("id")
+        .values_list("debater_id", "debater__school_id", "qual_type")
+    ):
+        points.setdefault(debater_id, (school_id, 0))
+        qual_types[debater_id] += [qual_type]
+
+    summaries = []
+
+    for debater_id, (school_id, debater_points) in points.items():
+        qualled = debater_id in qual_types
+
+        if debater_points <= 0 and not qualled:
+            continue
+
+        summaries += [
+            QualSummary(
+                season=season,
+                school_id=school_id,
+                debater_id=debater_id,
+                points=debater_points,
+                qualled=qualled,
+                qual_types=", ".join(
+                    labels[qual_type]
+                    for qual_type in qual_types[debater_id]
+                    if qual_type > QUAL.POINTS
+                ),
+                contribution=min(
+                    COTY_POINTS_CAP + COTY_QUAL_BONUS,
+                    debater_points + (COTY_QUAL_BONUS if qualled else 0),
+                ),
+            )
+        ]
+
+    summaries.sort(key=lambda summary: (-summary.points, summary.debater_id))
+
+    with transaction.atomic():
+        QualSummary.objects.filter(
+            Q(school_id__in=school_ids) | Q(debater_id__in=list(points)),
+            season=season,
+        ).delete()
+        QualSummary.objects.bulk_create(summaries, batch_size=BATCH_SIZE)
+
+    return len(summaries)
+
+
+def update_season_quals(season=settings.CURRENT_SEASON, debater_ids=None):
+    """
+    Recomputes QUAL, QualPoints, COTY and, in online seasons, OnlineQUAL for
+    a season (or just the given debaters and their schools) from one scan of
+    its team results and writes only the rows that changed.
+    Outside the current season rows are only ever added or updated, the
+    same as update_qual_points.
+    """
+    season = normalize_season(season)
+    prune = season == normalize_season(settings.CURRENT_SEASON)
+
+    results = load_qual_results(season, debater_ids)
+    quals, qual_points, debaters, competed = compute_quals(
+        season, debater_ids, results=results
+    )
+
+    if not debaters:
+        return {}
+
+    scope = list(debaters)
+    schools = {school_id for school_id, _, _ in debaters.values() if school_id}
+    excluded_schools = {
+        school_id
+        for school_id, included_in_oty, _ in debaters.values()
+        if school_id and not included_in_oty
+    }
+
+    if debater_ids is None:
+        schools |= set(
+            COTY.objects.filter(season=season).values_list("school_id", flat=True)
+        )
+
+    latest = [
+        Debater(id=debater_id, latest_season=season)
+        for debater_id, (_, _, latest_season) in debaters.items()
+        if debater_id in quals
+        and debater_id in competed
+        and (latest_season is None or int(latest_season) < int(season))
+    ]
+
+    with transaction.atomic():
+        summary = {
+            "qual": save_quals(season, quals, scope, prune),
+            "qual_points": save_qual_points(season, qual_points, scope, prune),
+        }
+
+        if prune and excluded_schools:
+            QUAL.objects.filter(
+                season=season, debater__school_id__in=excluded_schools
+            ).delete()
+            QualPoints.objects.filter(
+                season=season, debater__school_id__in=excluded_schools
+            ).delete()
+
+        if season in settings.ONLINE_SEASONS:
+            summary["online_qual"] = save_standings(
+                OnlineQUAL,
+                "debater",
+                season,
+                compute_online_quals(
+                    season, results, debaters, prune_missing=debater_ids is None
+                ),
+            )
+
+        coty = compute_coty(season, schools - excluded_schools)
+        summary["coty"] = save_coty(season, coty, schools, prune)
+
+        refresh_qual_summaries(season, schools)
+
+        Debater.objects.bulk_update(latest, ["latest_season"], batch_size=BATCH_SIZE)
+
+    return summary
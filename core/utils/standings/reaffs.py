@@ -0,0 +1,112 @@
+"""
+Per-season reaffiliation index. A season's Reaff or TOTYReaff rows are
+loaded once, cached, and resolved in memory, including chains where A was
+reaffiliated into B and B later into C.
+"""
+
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from core.models.debater import Reaff
+from core.models.standings.toty import TOTYReaff
+from core.utils.standings.common import normalize_season
+
+REAFF_MODELS = {
+    "debater": (Reaff, "old_debater_id", "new_debater_id"),
+    "team": (TOTYReaff, "old_team_id", "new_team_id"),
+}
+
+# Saves and deletes, cascades and queryset deletes included, invalidate
+# straight away (see core.signals); the timeout only bounds how long a
+# queryset update can go unnoticed
+CACHE_TIMEOUT = 60 * 60
+
+
+class ReaffIndex:
+    """
+    (old id, new id) pairs of one season, in id order. An old id whose
+    results were moved keeps no standing of its own; a new id's standing
+    includes the results of everything reaffiliated into it, however many
+    steps back.
+    """
+
+    def __init__(self, pairs=()):
+        self.pairs = [(old_id, new_id) for old_id, new_id in pairs if old_id != new_id]
+        self.targets = defaultdict(list)
+        self.direct_sources = defaultdict(list)
+
+        for old_id, new_id in self.pairs:
+            self.targets[old_id] += [new_id]
+            self.direct_sources[new_id] += [old_id]
+
+    def __bool__(self):
+        return bool(self.pairs)
+
+    def is_reaffed(self, owner_id):
+        return owner_id in self.targets
+
+    def walk(self, owner_id, edges):
+        found = []
+        seen = {owner_id}
+        queue = [owner_id]
+
+        while queue:
+            for next_id in edges.get(queue.pop(0), []):
+                if next_id not in seen:
+                    seen.add(next_id)
+                    found += [next_id]
+                    queue += [next_id]
+
+        return found
+
+    def sources(self, owner_id):
+        return self.walk(owner_id, self.direct_sources)
+
+    def scope(self, ids):
+        """
+        Widens ids with everything they were reaffiliated into, since those
+        standings are built from their results.
+        """
+        ids = set(ids)
+
+        for owner_id in list(ids):
+            ids.update(self.walk(owner_id, self.targets))
+
+        return ids
+
+    def with_sources(self, ids):
+        ids = set(ids)
+
+        for owner_id in list(ids):
+            ids.update(self.sources(owner_id))
+
+        return ids
+
+
+def cache_key(owner_field, season):
+    return f"reaffs:{owner_field}:{normalize_season(season)}"
+
+
+def season_reaffs(owner_field, season):
+    """
+    Returns the ReaffIndex of a season for "debater" (Reaff) or "team"
+    (TOTYReaff) reaffiliations, loading it at most once until invalidated.
+    """
+    key = cache_key(owner_field, season)
+    pairs = cache.get(key)
+
+    if pairs is None:
+        model, old_field, new_field = REAFF_MODELS[owner_field]
+        pairs = list(
+            model.objects.filter(season=normalize_season(season))
+            .order_by("id")
+            .values_list(old_field, new_field)
+        )
+        cache.set(key, pairs, CACHE_TIMEOUT)
+
+    return ReaffIndex(pairs)
+
+
+def invalidate_reaffs(owner_field, season):
+    cache.delete(cache_key(owner_field, season))
@@ -0,0 +1,398 @@
+from collections import ChainMap, defaultdict
+from itertools import count
+
+from django.conf import settings
+from django.db.models import Q
+
+from core.models.debater import QualPoints
+from core.models.standings.noty import NOTY
+from core.models.standings.online_qual import OnlineQUAL
+from core.models.standings.qual import QUAL
+from core.models.standings.soty import SOTY
+from core.models.standings.toty import TOTY
+from core.models.team import Team
+from core.models.tournament import Tournament
+from core.utils.rankings import assign_places
+from core.utils.standings.columns import score_season
+from core.utils.standings.common import normalize_season, standings_version
+from core.utils.standings.quals import load_qual_results, online_qual_markers
+from core.utils.standings.speakers import (
+    compute_noty,
+    compute_soty,
+    excluded,
+    load_debater_schools,
+)
+from core.utils.standings.toty import compute_toty
+
+# Hypothetical results sort after every stored result when markers tie
+HYPOTHETICAL_ID = 10**12
+
+# A scored season is far past memcached's item size limit, so baselines are
+# kept in each process and only the standings version goes through the cache
+baselines = {}
+
+
+class SimulationError(ValueError):
+    pass
+
+
+def projected_places(standings):
+    totals = sorted(
+        (
+            (sum(marker[0] for marker in markers), owner_id)
+            for owner_id, markers in standings.items()
+            if markers
+        ),
+        key=lambda total: -total[0],
+    )
+    totals = [total for total in totals if total[0] > 0]
+
+    return {
+        owner_id: {"points": points, "place": place, "tied": tied}
+        for (points, owner_id), place, tied in assign_places(
+            totals, points=lambda total: total[0]
+        )
+    }
+
+
+def current_places(model, owner_field, season, ids):
+    return {
+        owner_id: {"points": points, "place": place, "tied": tied}
+        for owner_id, points, place, tied in model.objects.filter(
+            season=season, **{f"{owner_field}_id__in": ids}
+        ).values_list(f"{owner_field}_id", "points", "place", "tied")
+    }
+
+
+def season_baseline(season):
+    """
+    Scores a season's stored results and computes its TOTY, SOTY and NOTY
+    standings, at most once per process and standings version. Returns
+    {"scored": ..., "toty": ..., "soty": ..., "noty": ...}; callers must not
+    modify it.
+    """
+    version = standings_version(season)
+    cached = baselines.get(season)
+
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    scored = score_season(season, trim=False)
+    baseline = {
+        "scored": scored,
+        "toty": compute_toty(season, results=scored["toty"]),
+        "soty": compute_soty(season, results=scored["soty"]),
+    }
+
+    if int(season) <= settings.LAST_NOTY_SEASON:
+        baseline["noty"] = compute_noty(season, results=scored["noty"])
+
+    baselines[season] = (version, baseline)
+
+    return baseline
+
+
+def replace_markers(scored, owner_id, tournament_id, marker):
+    markers = scored.get(owner_id, [])
+
+    if tournament_id is not None:
+        markers = [m for m in markers if m[1] != tournament_id]
+
+    scored[owner_id] = markers + [marker]
+
+
+class StandingsSimulator:
+    """
+    Projects TOTY, SOTY, NOTY and qual standings for a season with
+    hypothetical team and speaker results layered on top of the stored ones.
+    The stored season comes from season_baseline, so only the owners of
+    hypothetical results are recomputed; nothing is ever written.
+    """
+
+    def __init__(self, season=settings.CURRENT_SEASON):
+        self.season = normalize_season(season)
+        self.baseline = season_baseline(self.season)
+        self.result_ids = count(HYPOTHETICAL_ID)
+
+    def tournament(self, entry, tournaments):
+        if entry.get("tournament") is not None:
+            try:
+                return tournaments[int(entry["tournament"])]
+            except (KeyError, TypeError, ValueError) as e:
+                raise SimulationError(
+                    f"Unknown tournament {entry['tournament']}"
+                ) from e
+
+        return Tournament(
+            season=self.season,
+            num_teams=int(entry.get("num_teams", -1)),
+            num_novice_debaters=int(entry.get("num_novice_debaters", -1)),
+            autoqual_bar=int(entry.get("autoqual_bar", 0)),
+            online_qual_points=bool(entry.get("online_qual_points", False)),
+        )
+
+    def load_tournaments(self, entries):
+        ids = []
+        for entry in entries:
+            try:
+                if entry.get("tournament") is not None:
+                    ids += [int(entry["tournament"])]
+            except (AttributeError, TypeError, ValueError) as e:
+                raise SimulationError("Every result needs a valid tournament") from e
+
+        return Tournament.objects.in_bulk(ids)
+
+    def simulate(self, team_results=(), speaker_results=(), teams=(), debaters=()):
+        """
+        team_results are {"team", "place", "ghost_points", "tournament"}
+        entries and speaker_results are {"debater", "place", "tie", "novice",
+        "tournament"} entries. "tournament" may be left out in favour of
+        "num_teams"/"num_novice_debaters"/"autoqual_bar"/"online_qual_points"
+        for a tournament that has not been created yet. Returns current and projected standings
+        for the teams and debaters involved plus any extra teams/debaters.
+        """
+        tournaments = self.load_tournaments(list(team_results) + list(speaker_results))
+
+        # Hypothetical markers go in the first map, leaving the baseline as is
+        scored = {
+            key: ChainMap({}, value) for key, value in self.baseline["scored"].items()
+        }
+
+        teams = {int(team_id) for team_id in teams}
+        debaters = {int(debater_id) for debater_id in debaters}
+        # Per team: load_qual_results rows, autoqual types and the stored
+        # tournaments whose results are replaced
+        hypothetical = {
+            "results": defaultdict(list),
+            "autoquals": defaultdict(set),
+            "replaced": defaultdict(set),
+        }
+
+        for entry in team_results:
+            try:
+                team_id = int(entry["team"])
+                place = int(entry["place"])
+            except (KeyError, TypeError, ValueError) as e:
+                raise SimulationError("Team results need a team and a place") from e
+
+            tournament = self.tournament(entry, tournaments)
+            ghost_points = bool(entry.get("ghost_points", False))
+            result_id = next(self.result_ids)
+            teams.add(team_id)
+
+            replace_markers(
+                scored["toty"],
+                team_id,
+                tournament.id,
+                (
+                    tournament.get_toty_points(place, ghost_points=ghost_points),
+                    tournament.id,
+                    result_id,
+                ),
+            )
+            replace_markers(
+                scored["qual"],
+                team_id,
+                tournament.id,
+                (
+                    tournament.get_qual_points(place, ghost_points=ghost_points),
+                    tournament.id,
+                    result_id,
+                ),
+            )
+
+            hypothetical["results"][team_id] += [
+                (
+                    tournament.id,
+                    place,
+                    ghost_points,
+                    tournament.num_teams,
+                    tournament.qual,
+                    tournament.autoqual_bar,
+                    tournament.qual_type,
+                    tournament.online_qual_points,
+                    result_id,
+                )
+            ]
+
+            if tournament.id is not None:
+                hypothetical["replaced"][team_id].add(tournament.id)
+
+            if place != -1 and place <= tournament.autoqual_bar:
+                hypothetical["autoquals"][team_id].add(tournament.qual_type)
+
+        for entry in speaker_results:
+            try:
+                debater_id = int(entry["debater"])
+                place = int(entry["place"])
+            except (KeyError, TypeError, ValueError) as e:
+                raise SimulationError(
+                    "Speaker results need a debater and a place"
+                ) from e
+
+            tournament = self.tournament(entry, tournaments)
+            result_id = next(self.result_ids)
+            debaters.add(debater_id)
+
+            if entry.get("novice"):
+                replace_markers(
+                    scored["noty"],
+                    debater_id,
+                    tournament.id,
+                    (tournament.get_noty_points(place), tournament.id, result_id),
+                )
+            else:
+                tie = bool(entry.get("tie", False))
+                replace_markers(
+                    scored["soty"],
+                    debater_id,
+                    tournament.id,
+                    (
+                        tournament.get_soty_points(place - (1 if tie else 0)),
+                        tournament.id,
+                        result_id,
+                    ),
+                )
+
+        toty = dict(self.baseline["toty"])
+        toty.update(compute_toty(self.season, team_ids=teams, results=scored["toty"]))
+
+        soty = dict(self.baseline["soty"])
+        soty.update(
+            compute_soty(self.season, results=scored["soty"], debater_ids=debaters)
+        )
+
+        projection = {
+            "season": self.season,
+            "toty": self.compare(TOTY, "team", teams, toty),
+            "soty": self.compare(SOTY, "debater", debaters, soty),
+        }
+
+        if "noty" in self.baseline:
+            noty = dict(self.baseline["noty"])
+            noty.update(
+                compute_noty(self.season, results=scored["noty"], debater_ids=debaters)
+            )
+            projection["noty"] = self.compare(NOTY, "debater", debaters, noty)
+
+        projection["qual"] = self.project_quals(
+            scored["qual"], teams, debaters, hypothetical
+        )
+
+        return projection
+
+    def compare(self, model, owner_field, ids, standings):
+        current = current_places(model, owner_field, self.season, ids)
+        projected = projected_places(standings)
+
+        return [
+            {
+                owner_field: owner_id,
+                "current": current.get(owner_id),
+                "projected": projected.get(owner_id),
+            }
+            for owner_id in sorted(ids)
+        ]
+
+    def project_quals(self, qual_markers, teams, debaters, hypothetical):
+        """
+        qual_markers are the season's qual markers with the hypothetical
+        results layered in; hypothetical holds the hypothetical results by
+        team as built in simulate. Stored points quals are not carried over:
+        the points qual is decided from the projected points alone. Online seasons qualify on points the
+        same way update_season_quals does: from the best online qual results
+        against ONLINE_QUAL_BAR instead of qual points against QUAL_BAR.
+        """
+        members = Team.debaters.through.objects.filter(team_id__in=teams)
+        debaters = debaters | set(members.values_list("debater_id", flat=True))
+
+        debater_teams = defaultdict(set)
+        for team_id, debater_id in Team.debaters.through.objects.filter(
+            debater_id__in=debaters
+        ).values_list("team_id", "debater_id"):
+            debater_teams[debater_id].add(team_id)
+
+        online = self.season in settings.ONLINE_SEASONS
+        points_model = OnlineQUAL if online else QualPoints
+        current_points = dict(
+            points_model.objects.filter(
+                season=self.season, debater_id__in=debaters
+            ).values_list("debater_id", "points")
+        )
+
+        if online:
+            results = load_qual_results(self.season, debaters)
+
+        quals = defaultdict(set)
+        for debater_id, qual_type, tournament_id in QUAL.objects.filter(
+            season=self.season, debater_id__in=debaters
+        ).values_list("debater_id", "qual_type", "tournament_id"):
+            quals[debater_id].add((qual_type, tournament_id))
+
+        schools = load_debater_schools(Q(id__in=debaters))
+        projection = []
+
+        for debater_id in sorted(debaters):
+            if excluded(schools, debater_id):
+                projection += [
+                    {
+                        "debater": debater_id,
+                        "current": None,
+                        "projected": None,
+                    }
+                ]
+                continue
+
+            dropped = {
+                tournament_id
+                for team_id in debater_teams[debater_id]
+                for tournament_id in hypothetical["replaced"][team_id]
+            }
+
+            if online:
+                markers = online_qual_markers(
+                    [
+                        row
+                        for row in results.get(debater_id, [])
+                        if row[0] not in dropped
+                    ]
+                    + [
+                        row
+                        for team_id in debater_teams[debater_id]
+                        for row in hypothetical["results"][team_id]
+                    ]
+                )
+                points = sum(marker[0] for marker in markers)
+                points_qualled = points >= settings.ONLINE_QUAL_BAR
+            else:
+                points = sum(
+                    marker[0]
+                    for team_id in debater_teams[debater_id]
+                    for marker in qual_markers.get(team_id, [])
+                )
+                points_qualled = points >= settings.QUAL_BAR
+
+            qualled = (
+                any(
+                    qual_type != QUAL.POINTS and tournament_id not in dropped
+                    for qual_type, tournament_id in quals[debater_id]
+                )
+                or any(
+                    hypothetical["autoquals"][team_id]
+                    for team_id in debater_teams[debater_id]
+                )
+                or points_qualled
+            )
+
+            projection += [
+                {
+                    "debater": debater_id,
+                    "current": {
+                        "points": current_points.get(debater_id, 0),
+                        "qualled": bool(quals[debater_id]),
+                    },
+                    "projected": {"points": points, "qualled": qualled},
+                }
+            ]
+
+        return projection
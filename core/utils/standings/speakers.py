@@ -0,0 +1,211 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+
+from core.models.debater import Debater
+from core.models.results.speaker import SpeakerResult
+from core.models.standings.noty import NOTY
+from core.models.standings.soty import SOTY
+from core.utils.points_table import novice_points, speaker_points
+from core.utils.standings.common import normalize_season, save_standings, top_markers
+from core.utils.standings.reaffs import season_reaffs
+
+SOTY_MARKERS = 6
+NOTY_MARKERS = 5
+
+
+def load_speaker_results(season, varsity=True, novice=True, debater_ids=None):
+    """
+    One pass over the season's speaker results joined with their tournament.
+    Returns (soty, noty) mappings of debater id to (points, tournament_id,
+    result_id) markers.
+    """
+    soty = defaultdict(list)
+    noty = defaultdict(list)
+
+    eligible = Q()
+    if varsity:
+        eligible |= Q(tournament__soty=True, type_of_place=Debater.VARSITY)
+    if novice:
+        eligible |= Q(tournament__noty=True, type_of_place=Debater.NOVICE)
+
+    if debater_ids is not None:
+        eligible &= Q(debater_id__in=debater_ids)
+
+    for (
+        result_id,
+        debater_id,
+        tournament_id,
+        type_of_place,
+        place,
+        tie,
+        num_teams,
+        num_novice_debaters,
+    ) in (
+        SpeakerResult.objects.filter(eligible, tournament__season=season)
+        .order_by("id")
+        .values_list(
+            "id",
+            "debater_id",
+            "tournament_id",
+            "type_of_place",
+            "place",
+            "tie",
+            "tournament__num_teams",
+            "tournament__num_novice_debaters",
+        )
+    ):
+        if type_of_place == Debater.VARSITY:
+            points = speaker_points(num_teams, place - (1 if tie else 0))
+            soty[debater_id] += [(points, tournament_id, result_id)]
+        else:
+            points = novice_points(num_novice_debaters, place)
+            noty[debater_id] += [(points, tournament_id, result_id)]
+
+    return soty, noty
+
+
+def load_debater_schools(debater_filter):
+    return {
+        debater_id: (school_id, included_in_oty)
+        for debater_id, school_id, included_in_oty in Debater.objects.filter(
+            debater_filter
+        )
+        .distinct()
+        .values_list("id", "school_id", "school__included_in_oty")
+    }
+
+
+def excluded(schools, debater_id):
+    school_id, included_in_oty = schools.get(debater_id, (None, True))
+    return school_id is not None and not included_in_oty
+
+
+def compute_soty(season=settings.CURRENT_SEASON, results=None, debater_ids=None):
+    """
+    Computes every debater's SOTY markers for a season, merging the results of
+    reaffiliated debaters into their new debater the same way update_soty does.
+    Passing debater_ids limits the computation to those debaters (and the
+    debaters they were reaffiliated into).
+    """
+    season = normalize_season(season)
+
+    reaffs = season_reaffs("debater", season)
+
+    existing = SOTY.objects.filter(season=season)
+
+    if debater_ids is not None:
+        debater_ids = reaffs.scope(debater_ids)
+        loaded_ids = reaffs.with_sources(debater_ids)
+
+        if results is None:
+            results, _ = load_speaker_results(
+                season, novice=False, debater_ids=loaded_ids
+            )
+        existing = existing.filter(debater_id__in=debater_ids)
+        schools = load_debater_schools(Q(id__in=debater_ids))
+    else:
+        if results is None:
+            results, _ = load_speaker_results(season, novice=False)
+        schools = load_debater_schools(
+            Q(speaker_results__tournament__season=season)
+            | Q(soty__season=season)
+            | Q(reaff_new__season=season)
+        )
+
+    existing = set(existing.values_list("debater_id", flat=True))
+
+    candidates = (
+        set(results) | set(reaffs.direct_sources) | set(reaffs.targets) | existing
+    )
+
+    if debater_ids is not None:
+        candidates &= debater_ids
+
+    standings = {}
+
+    for debater_id in candidates:
+        if reaffs.is_reaffed(debater_id) or excluded(schools, debater_id):
+            standings[debater_id] = []
+            continue
+
+        markers = list(results.get(debater_id, []))
+
+        for source_id in reaffs.sources(debater_id):
+            markers += results.get(source_id, [])
+
+        standings[debater_id] = top_markers(markers, SOTY_MARKERS)
+
+    return standings
+
+
+def compute_noty(season=settings.CURRENT_SEASON, results=None, debater_ids=None):
+    season = normalize_season(season)
+
+    if int(season) > settings.LAST_NOTY_SEASON:
+        return {}
+
+    existing = NOTY.objects.filter(season=season)
+
+    if debater_ids is not None:
+        debater_ids = set(debater_ids)
+
+        if results is None:
+            _, results = load_speaker_results(
+                season, varsity=False, debater_ids=debater_ids
+            )
+        existing = existing.filter(debater_id__in=debater_ids)
+        schools = load_debater_schools(Q(id__in=debater_ids))
+    else:
+        if results is None:
+            _, results = load_speaker_results(season, varsity=False)
+        schools = load_debater_schools(
+            Q(speaker_results__tournament__season=season) | Q(noty__season=season)
+        )
+
+    existing = set(existing.values_list("debater_id", flat=True))
+
+    candidates = set(results) | existing
+
+    if debater_ids is not None:
+        candidates &= debater_ids
+
+    standings = {}
+
+    for debater_id in candidates:
+        if excluded(schools, debater_id):
+            standings[debater_id] = []
+            continue
+
+        standings[debater_id] = top_markers(results.get(debater_id, []), NOTY_MARKERS)
+
+    return standings
+
+
+def update_season_soty(season=settings.CURRENT_SEASON, debater_ids=None):
+    return save_standings(
+        SOTY, "debater", season, compute_soty(season, debater_ids=debater_ids)
+    )
+
+
+def update_season_noty(season=settings.CURRENT_SEASON, debater_ids=None):
+    return save_standings(
+        NOTY, "debater", season, compute_noty(season, debater_ids=debater_ids)
+    )
+
+
+def update_season_speakers(season=settings.CURRENT_SEASON):
+    season = normalize_season(season)
+    soty, noty = load_speaker_results(
+        season, novice=int(season) <= settings.LAST_NOTY_SEASON
+    )
+
+    return {
+        "soty": save_standings(
+            SOTY, "debater", season, compute_soty(season, results=soty)
+        ),
+        "noty": save_standings(
+            NOTY, "debater", season, compute_noty(season, results=noty)
+        ),
+    }
@@ -0,0 +1,147 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+
+from core.models.debater import Debater
+from core.models.results.team import TeamResult
+from core.models.standings.toty import TOTY
+from core.models.team import Team
+from core.utils.points_table import team_points
+from core.utils.standings.common import normalize_season, save_standings, top_markers
+from core.utils.standings.reaffs import season_reaffs
+
+TOTY_MARKERS = 5
+
+
+def load_team_members(team_filter):
+    members = defaultdict(list)
+
+    for team_id, debater_id, school_id, included_in_oty in (
+        Team.debaters.through.objects.filter(team_filter)
+        .order_by("debater_id")
+        .values_list(
+            "team_id",
+            "debater_id",
+            "debater__school_id",
+            "debater__school__included_in_oty",
+        )
+    ):
+        members[team_id] += [(debater_id, school_id, included_in_oty)]
+
+    return members
+
+
+def load_toty_results(results_filter):
+    results = defaultdict(list)
+
+    for result_id, team_id, tournament_id, place, ghost_points, num_teams in (
+        TeamResult.objects.filter(results_filter)
+        .order_by("id")
+        .values_list(
+            "id",
+            "team_id",
+            "tournament_id",
+            "place",
+            "ghost_points",
+            "tournament__num_teams",
+        )
+    ):
+        points = team_points(num_teams, place, ghost_points=ghost_points)
+        results[team_id] += [(points, tournament_id, result_id)]
+
+    return results
+
+
+def compute_toty(season=settings.CURRENT_SEASON, team_ids=None, results=None):
+    """
+    Computes every team's TOTY markers for a season in memory, following the
+    same rules as update_toty. Returns a mapping of team id to its top
+    markers; an empty list means the team should have no TOTY row. Passing
+    team_ids limits the computation to those teams (and the teams they were
+    reaffiliated into). ``results`` may carry already-scored markers for the
+    whole season, keyed by team id.
+    """
+    season = normalize_season(season)
+
+    reaffs = season_reaffs("team", season)
+
+    results_filter = Q(
+        tournament__season=season,
+        tournament__toty=True,
+        type_of_place=Debater.VARSITY,
+    )
+    existing = TOTY.objects.filter(season=season)
+
+    if team_ids is not None:
+        team_ids = reaffs.scope(team_ids)
+        loaded_ids = reaffs.with_sources(team_ids)
+
+        results_filter &= Q(team_id__in=loaded_ids)
+        existing = existing.filter(team_id__in=team_ids)
+        members = load_team_members(Q(team_id__in=loaded_ids))
+    else:
+        members = load_team_members(
+            Q(
+                team_id__in=TeamResult.objects.filter(tournament__season=season).values(
+                    "team_id"
+                )
+            )
+            | Q(team_id__in=TOTY.objects.filter(season=season).values("team_id"))
+            | Q(team_id__in=set(reaffs.targets) | set(reaffs.direct_sources))
+        )
+
+    if results is None:
+        results = load_toty_results(results_filter)
+
+    existing = set(existing.values_list("team_id", flat=True))
+
+    candidates = (
+        set(results) | set(reaffs.targets) | set(reaffs.direct_sources) | existing
+    )
+
+    if team_ids is not None:
+        candidates &= team_ids
+
+    standings = {}
+    excluded_schools = set()
+
+    for team_id in candidates:
+        team_members = members.get(team_id)
+
+        if not team_members:
+            continue
+
+        if len({school_id for _, school_id, _ in team_members}) == 2:
+            continue
+
+        if reaffs.is_reaffed(team_id):
+            standings[team_id] = []
+            continue
+
+        _, school_id, included_in_oty = team_members[0]
+
+        if school_id is not None and not included_in_oty:
+            excluded_schools.add(school_id)
+            standings[team_id] = []
+            continue
+
+        markers = list(results.get(team_id, []))
+
+        for source_id in reaffs.sources(team_id):
+            markers += results.get(source_id, [])
+
+        standings[team_id] = top_markers(markers, TOTY_MARKERS)
+
+    for team_id in existing:
+        if any(
+            school_id in excluded_schools
+            for _, school_id, _ in members.get(team_id, [])
+        ):
+            standings[team_id] = []
+
+    return standings
+
+
+def update_season_toty(season=settings.CURRENT_SEASON, team_ids=None):
+    return save_standings(TOTY, "team", season, compute_toty(season, team_ids))
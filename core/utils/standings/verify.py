@@ -0,0 +1,166 @@
+"""
+Standings consistency checks. A season is recomputed from scratch in memory
+(one columnar scoring pass plus one qual pass) and every stored row is
+compared with what a full recompute and re-rank would leave behind.
+"""
+
+from django.conf import settings
+
+from core.models.standings.noty import NOTY
+from core.models.standings.online_qual import OnlineQUAL
+from core.models.standings.soty import SOTY
+from core.models.standings.toty import TOTY
+from core.utils.rankings import assign_places
+from core.utils.standings.columns import score_season
+from core.utils.standings.common import LABELS, normalize_season, standing_values
+from core.utils.standings.diff import project_quals
+from core.utils.standings.quals import (
+    compute_online_quals,
+    compute_quals,
+    load_qual_results,
+)
+from core.utils.standings.speakers import compute_noty, compute_soty
+from core.utils.standings.toty import compute_toty
+
+STANDING_FIELDS = (
+    ["points", "place", "tied"]
+    + [f"marker_{label}" for label in LABELS]
+    + [f"tournament_{label}_id" for label in LABELS]
+)
+
+# project_quals rows are tuples; these name their fields
+QUAL_FIELDS = {
+    "coty": ("points", "place"),
+    "qual_points": ("points",),
+    "qual": ("tournament_id",),
+}
+
+VERIFIED = ("toty", "soty", "noty", "online_qual", "coty", "qual_points", "qual")
+
+
+def expected_standings(standings):
+    """
+    Turns owner -> markers into the rows save_standings and place_rankings
+    would leave: owner -> {field: value}, rows with no points dropped.
+    """
+    rows = {
+        owner_id: standing_values(markers)
+        for owner_id, markers in standings.items()
+        if markers
+    }
+    ranked = sorted(
+        (owner_id for owner_id, values in rows.items() if values["points"] != 0),
+        key=lambda owner_id: -rows[owner_id]["points"],
+    )
+
+    expected = {}
+    for owner_id, place, tied in assign_places(
+        ranked, points=lambda owner_id: rows[owner_id]["points"]
+    ):
+        expected[owner_id] = dict(rows[owner_id], place=place, tied=tied)
+
+    return expected
+
+
+def stored_standings(model, owner_field, season):
+    stored = {}
+
+    for row in (
+        model.objects.filter(season=season)
+        .order_by("place", "id")
+        .values(f"{owner_field}_id", *STANDING_FIELDS)
+    ):
+        stored.setdefault(row.pop(f"{owner_field}_id"), row)
+
+    return stored
+
+
+def compare_rows(stored, expected):
+    """
+    Compares owner -> {field: value} mappings. Returns one mismatch per
+    owner: the row is "missing" (expected, not stored), "unexpected" (stored,
+    not expected) or "different" with the {field: (stored, expected)} that
+    disagree.
+    """
+    mismatches = []
+
+    for owner_id in sorted(set(stored) | set(expected), key=str):
+        stored_row = stored.get(owner_id)
+        expected_row = expected.get(owner_id)
+
+        if stored_row is None:
+            mismatches += [
+                {"owner": owner_id, "problem": "missing", "expected": expected_row}
+            ]
+        elif expected_row is None:
+            mismatches += [
+                {"owner": owner_id, "problem": "unexpected", "stored": stored_row}
+            ]
+        else:
+            fields = {
+                field: (stored_row.get(field), value)
+                for field, value in expected_row.items()
+                if stored_row.get(field) != value
+            }
+            if fields:
+                mismatches += [
+                    {"owner": owner_id, "problem": "different", "fields": fields}
+                ]
+
+    return mismatches
+
+
+def as_rows(values, fields):
+    return {owner_id: dict(zip(fields, value)) for owner_id, value in values.items()}
+
+
+def verify_season(season=settings.CURRENT_SEASON, standings=VERIFIED):
+    """
+    Returns {standing: mismatches} between the stored rows of a season and a
+    full recompute of it. QUAL rows are keyed by (debater_id, qual_type) and
+    compared on their tournament. Past seasons are checked as if they were
+    pruned, so rows a recompute keeps only because it never deletes outside
+    the current season are reported too.
+    """
+    season = normalize_season(season)
+    standings = [name for name in VERIFIED if name in standings]
+
+    if int(season) > settings.LAST_NOTY_SEASON and "noty" in standings:
+        standings.remove("noty")
+    if season not in settings.ONLINE_SEASONS and "online_qual" in standings:
+        standings.remove("online_qual")
+
+    report = {}
+
+    if {"toty", "soty", "noty"} & set(standings):
+        scored = score_season(season)
+        engines = {
+            "toty": (TOTY, "team", compute_toty),
+            "soty": (SOTY, "debater", compute_soty),
+            "noty": (NOTY, "debater", compute_noty),
+        }
+
+        for name, (model, owner_field, compute) in engines.items():
+            if name in standings:
+                report[name] = compare_rows(
+                    stored_standings(model, owner_field, season),
+                    expected_standings(compute(season, results=scored[name])),
+                )
+
+    if "online_qual" in standings:
+        results = load_qual_results(season)
+        _, _, debaters, _ = compute_quals(season, results=results)
+        report["online_qual"] = compare_rows(
+            stored_standings(OnlineQUAL, "debater", season),
+            expected_standings(compute_online_quals(season, results, debaters)),
+        )
+
+    if {"coty", "qual_points", "qual"} & set(standings):
+        for name, (stored, projected) in project_quals(season, prune=True).items():
+            if name in standings:
+                report[name] = compare_rows(
+                    as_rows(stored, QUAL_FIELDS[name]),
+                    as_rows(projected, QUAL_FIELDS[name]),
+                )
+
+    return {name: report[name] for name in standings}
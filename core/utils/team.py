@@ -1,24 +1,62 @@
-from core.models.team import Team
+from core.models.debater import Debater
+from core.models.team import Team, team_pair_key
+from core.utils.standings.common import BATCH_SIZE, chunked
+
+
+def get_or_create_teams(pairs):
+    """
+    pairs are (debater_one, debater_two) debaters or ids. Returns the team of
+    every pair, in order: existing teams are found by their pair key in one
+    query and the missing ones are bulk created with their debaters.
+    """
+    keys = [team_pair_key(pair) for pair in pairs]
+
+    teams = {}
+    for chunk in chunked(set(keys)):
+        teams.update(Team.objects.in_bulk(chunk, field_name="pair_key"))
+
+    missing = sorted(set(keys) - set(teams))
+
+    if missing:
+        debaters = Debater.objects.select_related("school").in_bulk(
+            {int(debater_id) for key in missing for debater_id in key.split(":")}
+        )
+        # Ordered by id and deduplicated, as an iron-man team is one debater
+        pairs = {
+            key: [
+                debaters[debater_id]
+                for debater_id in sorted(
+                    {int(debater_id) for debater_id in key.split(":")}
+                )
+            ]
+            for key in missing
+        }
+
+        # A team created concurrently under the same key is used instead
+        Team.objects.bulk_create(
+            [Team(name=Team.name_for(pairs[key]), pair_key=key) for key in missing],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+        created = {}
+        for chunk in chunked(missing):
+            created.update(Team.objects.in_bulk(chunk, field_name="pair_key"))
+
+        Team.debaters.through.objects.bulk_create(
+            [
+                Team.debaters.through(team_id=created[key].id, debater_id=debater.id)
+                for key in missing
+                for debater in pairs[key]
+            ],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+        teams.update(created)
+
+    return [teams[key] for key in keys]
 
 
 def get_or_create_team_for_debaters(debater_one, debater_two):
-    print(debater_one)
-    print(debater_two)
-
-    team = (
-        Team.objects.filter(debaters=debater_one).filter(debaters=debater_two).first()
-    )
-
-    if team:
-        return team
-
-    team = Team.objects.create()
-    team.debaters.add(debater_one)
-    team.debaters.add(debater_two)
-
-    team.save()
-
-    team.update_name()
-    team.save()
-
-    return team
+    return get_or_create_teams([(debater_one, debater_two)])[0]
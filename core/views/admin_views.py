@@ -9,8 +9,14 @@ from django.views.generic import TemplateView
 
 from django.conf import settings
 
-from core.models import SOTY, TOTY, Debater, Team
-from core.utils.rankings import redo_rankings, update_noty, update_soty, update_toty
+from core.models import SOTY, TOTY
+from core.utils.rankings import redo_rankings
+from core.utils.standings import (
+    update_season_noty,
+    update_season_soty,
+    update_season_toty,
+)
+from core.utils.standings.diff import diff_counts, diff_season
 
 
 class AdminToolsView(UserPassesTestMixin, TemplateView):
@@ -101,6 +107,9 @@ class RankingsRecomputeView(UserPassesTestMixin, TemplateView):
                 {"success": False, "error": "Season and ranking type are required"}
             )
 
+        if request.POST.get("dry_run"):
+            return self._dry_run(season, ranking_type)
+
         try:
             ranking_funcs = {
                 "toty": lambda: self._update_toty_rankings(season),
@@ -120,20 +129,48 @@ class RankingsRecomputeView(UserPassesTestMixin, TemplateView):
         except Exception as e:
             return JsonResponse({"success": False, "error": str(e)})
 
+    def _dry_run(self, season, ranking_type):
+        if ranking_type not in ("toty", "soty", "noty"):
+            return JsonResponse({"success": False, "error": "Unknown ranking type"})
+
+        try:
+            diff = diff_season(season, [ranking_type]).get(ranking_type)
+        except Exception as e:
+            return JsonResponse({"success": False, "error": str(e)})
+
+        if diff is None:
+            return JsonResponse(
+                {
+                    "success": False,
+                    "error": f"No {ranking_type.upper()} rankings for season {season}",
+                }
+            )
+
+        counts = diff_counts(diff)
+        return JsonResponse(
+            {
+                "success": True,
+                "dry_run": True,
+                "diff": diff,
+                "counts": counts,
+                "message": f"Dry run of {ranking_type.upper()} for season {season}: "
+                f"{counts['added']} added, {counts['removed']} removed, "
+                f"{counts['points']} points changed, {counts['place']} places "
+                "changed. Nothing was saved.",
+            }
+        )
+
     def _update_toty_rankings(self, season):
-        for team in Team.objects.all():
-            update_toty(team, season=season)
+        update_season_toty(season)
         redo_rankings(
             TOTY.objects.filter(season=season), season=season, cache_type="toty"
         )
 
     def _update_soty_rankings(self, season):
-        for debater in Debater.objects.all():
-            update_soty(debater, season=season)
+        update_season_soty(season)
         redo_rankings(
             SOTY.objects.filter(season=season), season=season, cache_type="soty"
         )
 
     def _update_noty_rankings(self, season):
-        for debater in Debater.objects.all():
-            update_noty(debater, season=season)
+        update_season_noty(season)
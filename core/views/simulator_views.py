@@ -0,0 +1,44 @@
+import json
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.views import View
+
+from core.utils.generics import CustomMixin
+from core.utils.standings.simulator import SimulationError, StandingsSimulator
+
+
+class StandingsSimulatorView(CustomMixin, View):
+    """
+    Read-only JSON endpoint projecting where teams and debaters would land
+    with hypothetical results. Nothing is written.
+    """
+
+    permission_required = "core.change_tournament"
+    raise_exception = True
+
+    http_method_names = ["post"]
+
+    def post(self, request, *args, **kwargs):
+        try:
+            payload = json.loads(request.body or "{}")
+        except ValueError:
+            return JsonResponse({"error": "Request body must be JSON"}, status=400)
+
+        if not isinstance(payload, dict):
+            return JsonResponse({"error": "Request body must be an object"}, status=400)
+
+        try:
+            simulator = StandingsSimulator(
+                payload.get("season", settings.CURRENT_SEASON)
+            )
+            projection = simulator.simulate(
+                team_results=payload.get("team_results", []),
+                speaker_results=payload.get("speaker_results", []),
+                teams=payload.get("teams", []),
+                debaters=payload.get("debaters", []),
+            )
+        except (SimulationError, TypeError, ValueError) as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        return JsonResponse(projection)
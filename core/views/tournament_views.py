@@ -3,7 +3,8 @@ from datetime import timedelta
 import requests
 from dal import autocomplete
 from django.conf import settings
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from django.http import QueryDict
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
@@ -11,7 +12,6 @@ from django.views.generic import TemplateView
 from django_filters import ChoiceFilter, FilterSet
 from django_tables2 import Column
 from formtools.wizard.views import SessionWizardView
-from haystack.query import SearchQuerySet
 
 from core.forms import (
     DebaterForm,
@@ -32,12 +32,7 @@ from core.models.results.speaker import SpeakerResult
 from core.models.results.team import TeamResult
 from core.models.round import Round
 from core.models.school import School
-from core.models.standings.coty import COTY
-from core.models.standings.noty import NOTY
-from core.models.standings.online_qual import OnlineQUAL
 from core.models.standings.qual import QUAL
-from core.models.standings.soty import SOTY
-from core.models.standings.toty import TOTY
 from core.models.team import Team
 from core.models.tournament import Tournament
 from core.utils.generics import (
@@ -54,28 +49,23 @@ from core.utils.import_management import (
     CREATE,
     LINK,
     clean_keys,
-    create_debaters,
-    create_round_stats,
-    create_rounds,
-    create_schools,
-    create_speaker_awards,
-    create_team_awards,
-    create_teams,
-    get_dict,
+    create_entities,
     get_num_novice_debaters,
     get_num_teams,
-    lookup_school,
+    import_results,
+    load_payload,
+    stage_payload,
 )
-from core.utils.rankings import (
-    redo_rankings,
-    update_noty,
-    update_online_quals,
-    update_qual_points,
-    update_soty,
-    update_toty,
+from core.utils.reconcile import SchoolResolver, match_debaters
+from core.utils.results import (
+    set_tournament_size,
+    sync_speaker_results,
+    sync_team_results,
 )
 from core.utils.rounds import get_tab_card_data
-from core.utils.team import get_or_create_team_for_debaters
+from core.utils.jobs import enqueue_recompute, standings_updating
+from core.utils.standings import DirtySet
+from core.utils.team import get_or_create_teams
 
 
 class TournamentFilter(FilterSet):
@@ -232,6 +222,8 @@ class TournamentDetailView(CustomDetailView):
 
         context["novice_speaker_results"] = nspeakers
 
+        context["standings_updating"] = standings_updating(self.object)
+
         context["tab_cards_available"] = Round.objects.filter(
             tournament=self.object
         ).exists()
@@ -405,6 +397,9 @@ class TournamentImportWizardView(CustomMixin, SessionWizardView):
     ]
     template_name = "tournaments/tournament_entry.html"
 
+    # The staged payload, loaded once per request by get_payload
+    payload = None
+
     def get_template_names(self):
         if self.steps.current == "3":
             return ["tournaments/school_reconciliation.html"]
@@ -413,6 +408,13 @@ class TournamentImportWizardView(CustomMixin, SessionWizardView):
 
         return super().get_template_names()
 
+    def get_payload(self):
+        if self.payload is None:
+            storage_data = self.storage.get_step_data("1")
+            self.payload = load_payload(storage_data.get("payload"))
+
+        return self.payload
+
     def get_form_initial(self, step):
         storage_data = None
         tournament = None
@@ -435,8 +437,7 @@ class TournamentImportWizardView(CustomMixin, SessionWizardView):
             tournament = Tournament.objects.get(id=storage_data.get("0-tournament"))
 
         if step == "2":
-            storage_data = self.storage.get_step_data("1")
-            response = get_dict(storage_data.get("response"))
+            response = self.get_payload()["response"]
 
             initial = {
                 "num_teams": get_num_teams(
@@ -448,15 +449,18 @@ class TournamentImportWizardView(CustomMixin, SessionWizardView):
             }
 
         if step == "3":
-            storage_data = self.storage.get_step_data("1")
-            response = get_dict(storage_data.get("response"))
+            response = self.get_payload()["response"]
 
             initial = []
 
+            found_schools = SchoolResolver().resolve(
+                [school["name"].strip() for school in response["schools"]]
+            )
+
             for school in response["schools"]:
                 to_add = {"id": school["id"], "server_name": school["name"]}
 
-                school = lookup_school(school["name"].strip())
+                school = found_schools.get(school["name"].strip())
 
                 if school:
                     to_add["school"] = school
@@ -464,55 +468,59 @@ class TournamentImportWizardView(CustomMixin, SessionWizardView):
                 initial += [to_add]
 
         if step == "4":
-            storage_data = self.storage.get_step_data("1")
-            response = get_dict(storage_data.get("response"))
+            response = self.get_payload()["response"]
 
             storage_data = self.storage.get_step_data("3")
             schools = clean_keys(storage_data.get("schools"))
 
             initial = []
 
-            for team in response["teams"]:
-                for debater in team["debaters"]:
-                    found_debater = (
-                        SearchQuerySet().models(Debater).filter(content=debater["name"])
-                    )
+            linked_schools = School.objects.in_bulk(
+                [action["school"] for action in schools.values()]
+            )
 
-                    school = School.objects.filter(
-                        id=schools[team["school_id"]]["school"]
-                    ).first()
+            entries = [
+                (team, debater)
+                for team in response["teams"]
+                for debater in team["debaters"]
+            ]
+            matches = match_debaters(
+                [
+                    (
+                        debater["name"],
+                        [
+                            schools[team["school_id"]]["school"],
+                            schools[team["hybrid_school_id"]]["school"],
+                        ],
+                    )
+                    for team, debater in entries
+                ]
+            )
 
-                    found_debater = [
-                        result.object for result in found_debater.all() if result.object
-                    ]
-                    found_debater = [
-                        obj
-                        for obj in found_debater
-                        if obj.school.id == schools[team["school_id"]]["school"]
-                        or obj.school.id == schools[team["hybrid_school_id"]]["school"]
-                    ]
+            for (team, debater), candidates in zip(entries, matches):
+                school = linked_schools.get(schools[team["school_id"]]["school"])
 
-                    found_debater = found_debater[0] if len(found_debater) > 0 else None
+                found_debater = candidates[0][1] if candidates else None
 
-                    hybrid_name = ""
+                hybrid_name = ""
 
-                    names = schools[team["school_id"]]["name"]
+                names = schools[team["school_id"]]["name"]
 
-                    if schools[team["hybrid_school_id"]]["name"] != "":
-                        hybrid_name = schools[team["hybrid_school_id"]]["name"]
+                if schools[team["hybrid_school_id"]]["name"] != "":
+                    hybrid_name = schools[team["hybrid_school_id"]]["name"]
 
-                    initial += [
-                        {
-                            "id": debater["id"],
-                            "school_id": str(team["school_id"]),
-                            "server_name": debater["name"],
-                            "server_school_name": names,
-                            "status": 0 if debater["status"] else 1,
-                            "server_hybrid_school_name": hybrid_name,
-                            "school": found_debater.school if found_debater else school,
-                            "debater": found_debater,
-                        }
-                    ]
+                initial += [
+                    {
+                        "id": debater["id"],
+                        "school_id": str(team["school_id"]),
+                        "server_name": debater["name"],
+                        "server_school_name": names,
+                        "status": 0 if debater["status"] else 1,
+                        "server_hybrid_school_name": hybrid_name,
+                        "school": found_debater.school if found_debater else school,
+                        "debater": found_debater,
+                    }
+                ]
 
         return initial
 
@@ -527,14 +535,12 @@ class TournamentImportWizardView(CustomMixin, SessionWizardView):
         to_return = form.data.copy()
 
         if self.steps.current == "1":
-            response = self.get_response(form.cleaned_data["url"])
-
-            to_return["response"] = response
+            to_return["payload"] = stage_payload(
+                self.get_response(form.cleaned_data["url"]),
+                form.cleaned_data["url"],
+            )
 
         if self.steps.current == "3":
-            storage_data = self.storage.get_step_data("1")
-            response = get_dict(storage_data.get("response"))
-
             school_actions = {-1: {"school": -1, "name": ""}}
 
             for data in form.cleaned_data:
@@ -551,9 +557,6 @@ class TournamentImportWizardView(CustomMixin, SessionWizardView):
             to_return["schools"] = school_actions
 
         if self.steps.current == "4":
-            storage_data = self.storage.get_step_data("1")
-            response = get_dict(storage_data.get("response"))
-
             debater_actions = {-1: {"debater": -1, "name": ""}}
 
             for data in form.cleaned_data:
@@ -575,8 +578,7 @@ class TournamentImportWizardView(CustomMixin, SessionWizardView):
         return to_return
 
     def done(self, form_list, form_dict):
-        storage_data = self.storage.get_step_data("1")
-        response = get_dict(storage_data.get("response"))
+        response = self.get_payload()["response"]
 
         storage_data = self.storage.get_step_data("3")
         schools = clean_keys(storage_data.get("schools"))
@@ -584,41 +586,30 @@ class TournamentImportWizardView(CustomMixin, SessionWizardView):
         storage_data = self.storage.get_step_data("4")
         debaters = clean_keys(storage_data.get("debaters"))
 
-        school_actions = create_schools(schools)
-        debater_actions = create_debaters(school_actions, debaters)
-        team_actions = create_teams(debater_actions, response["teams"])
-
-        storage_data = self.storage.get_step_data("0")
-        tournament = Tournament.objects.get(id=int(storage_data.get("0-tournament")))
-
-        storage_data = self.storage.get_step_data("2")
-        tournament.num_teams = int(storage_data.get("2-num_teams"))
-        tournament.num_novice_debaters = int(storage_data.get("2-num_novices"))
-        tournament.save()
+        with transaction.atomic():
+            debater_actions, team_actions = create_entities(
+                schools, debaters, response["teams"]
+            )
 
-        round_actions = create_rounds(team_actions, tournament, response["rounds"])
-        create_round_stats(
-            debater_actions, round_actions, tournament, response["stats"]
-        )
+            storage_data = self.storage.get_step_data("0")
+            tournament = Tournament.objects.get(
+                id=int(storage_data.get("0-tournament"))
+            )
 
-        create_speaker_awards(
-            debater_actions, response["speaker_results"], Debater.VARSITY, tournament
-        )
+            dirty = DirtySet(tournament.season)
 
-        create_speaker_awards(
-            debater_actions,
-            response["novice_speaker_results"],
-            Debater.NOVICE,
-            tournament,
-        )
+            storage_data = self.storage.get_step_data("2")
+            set_tournament_size(
+                tournament,
+                int(storage_data.get("2-num_teams")),
+                int(storage_data.get("2-num_novices")),
+                dirty,
+            )
+            tournament.save()
 
-        create_team_awards(
-            team_actions, response["team_results"], Debater.VARSITY, tournament
-        )
+            import_results(debater_actions, team_actions, tournament, response, dirty)
 
-        create_team_awards(
-            team_actions, response["novice_team_results"], Debater.NOVICE, tournament
-        )
+        enqueue_recompute(dirty, tournament=tournament)
 
         return redirect(tournament.get_absolute_url())
 
@@ -647,6 +638,10 @@ class TournamentDataEntryWizardView(CustomMixin, SessionWizardView):
     ]
     template_name = "tournaments/data_entry.html"
 
+    # Per-request result indexes, see team_result_index
+    team_results = None
+    speaker_results = None
+
     def get_template_names(self):
         if self.steps.current == "0":
             return ["tournaments/tournament_entry.html"]
@@ -665,17 +660,67 @@ class TournamentDataEntryWizardView(CustomMixin, SessionWizardView):
 
         return super().get_template_names()
 
+    def team_result_index(self, tournament_id):
+        """
+        Loads the tournament's team results once per request, with their teams
+        and debaters, keyed by (type_of_place, place). Non-placing results are
+        kept in a list under -1.
+        """
+        if self.team_results is None:
+            self.team_results = {}
+
+            for result in (
+                TeamResult.objects.filter(tournament_id=tournament_id)
+                .select_related("team")
+                .prefetch_related(
+                    Prefetch("team__debaters", queryset=Debater.objects.order_by("id"))
+                )
+                .order_by("id")
+            ):
+                if result.place == -1:
+                    self.team_results.setdefault(-1, []).append(result)
+                else:
+                    self.team_results.setdefault(
+                        (result.type_of_place, result.place), result
+                    )
+
+        return self.team_results
+
+    def speaker_result_index(self, tournament_id):
+        if self.speaker_results is None:
+            self.speaker_results = {}
+
+            for result in (
+                SpeakerResult.objects.filter(tournament_id=tournament_id)
+                .select_related("debater")
+                .order_by("id")
+            ):
+                self.speaker_results.setdefault(
+                    (result.type_of_place, result.place), result
+                )
+
+        return self.speaker_results
+
+    def team_initial(self, result, ghost_points=False):
+        debaters = result.team.debaters.all()
+        initial = {
+            "debater_one": debaters[0] if debaters else None,
+            "debater_two": debaters[len(debaters) - 1] if debaters else None,
+        }
+
+        if ghost_points:
+            initial["ghost_points"] = result.ghost_points
+
+        return initial
+
     def get_form_initial(self, step):
-        storage_data = None
-        tournament = None
+        tournament_id = None
 
         initial = []
 
         if not step == "0":
             storage_data = self.storage.get_step_data("0")
-            tournament = Tournament.objects.get(
-                id=int(storage_data.get("0-tournament"))
-            )
+            tournament_id = int(storage_data.get("0-tournament"))
 
         if step == "0" and "tournament" in self.request.GET:
             tournament = Tournament.objects.filter(
@@ -686,91 +731,40 @@ class TournamentDataEntryWizardView(CustomMixin, SessionWizardView):
                 initial = {"tournament": tournament}
 
         if step == "1":
+            tournament = Tournament.objects.get(id=tournament_id)
             initial = {
                 "num_teams": tournament.num_teams,
                 "num_novices": tournament.num_novice_debaters,
             }
 
-        if step == "2":
-            results = TeamResult.objects.filter(
-                tournament=tournament, type_of_place=Debater.VARSITY
-            )
-
-            for i in range(1, 21):
-                if results.filter(place=i).exists():
-                    initial += [
-                        {
-                            "debater_one": results.filter(place=i)
-                            .first()
-                            .team.debaters.first(),
-                            "debater_two": results.filter(place=i)
-                            .first()
-                            .team.debaters.last(),
-                            "ghost_points": results.filter(place=i)
-                            .first()
-                            .ghost_points,
-                        }
-                    ]
-
-        if step == "3":
-            results = SpeakerResult.objects.filter(
-                tournament=tournament,
-                type_of_place=Debater.VARSITY,
-            )
-
-            for i in range(1, 11):
-                if results.filter(place=i).exists():
-                    initial += [
-                        {
-                            "speaker": results.filter(place=i).first().debater,
-                            "tie": results.filter(place=i).first().tie,
-                        }
-                    ]
+        team_steps = {"2": (Debater.VARSITY, 20), "4": (Debater.NOVICE, 10)}
+        speaker_steps = {"3": (Debater.VARSITY, 10), "5": (Debater.NOVICE, 16)}
 
-        if step == "4":
-            results = TeamResult.objects.filter(
-                tournament=tournament, type_of_place=Debater.NOVICE
-            )
+        if step in team_steps:
+            type_of_place, places = team_steps[step]
+            results = self.team_result_index(tournament_id)
 
-            for i in range(1, 11):
-                if results.filter(place=i).exists():
+            for i in range(1, places + 1):
+                if (type_of_place, i) in results:
                     initial += [
-                        {
-                            "debater_one": results.filter(place=i)
-                            .first()
-                            .team.debaters.first(),
-                            "debater_two": results.filter(place=i)
-                            .first()
-                            .team.debaters.last(),
-                        }
+                        self.team_initial(
+                            results[(type_of_place, i)],
+                            ghost_points=type_of_place == Debater.VARSITY,
+                        )
                     ]
 
-        if step == "5":
-            results = SpeakerResult.objects.filter(
-                tournament=tournament, type_of_place=Debater.NOVICE
-            )
+        if step in speaker_steps:
+            type_of_place, places = speaker_steps[step]
+            results = self.speaker_result_index(tournament_id)
 
-            for i in range(1, 17):
-                if results.filter(place=i).exists():
-                    initial += [
-                        {
-                            "speaker": results.filter(place=i).first().debater,
-                            "tie": results.filter(place=i).first().tie,
-                        }
-                    ]
+            for i in range(1, places + 1):
+                if (type_of_place, i) in results:
+                    result = results[(type_of_place, i)]
+                    initial += [{"speaker": result.debater, "tie": result.tie}]
 
         if step == "6":
-            results = TeamResult.objects.filter(
-                tournament=tournament, place=-1
-            )
-
-            for result in results:
-                initial += [
-                    {
-                        "debater_one": result.team.debaters.first(),
-                        "debater_two": result.team.debaters.last()
-                    }
-                ]
+            for result in self.team_result_index(tournament_id).get(-1, []):
+                initial += [self.team_initial(result)]
 
         return initial
 
@@ -782,221 +776,78 @@ class TournamentDataEntryWizardView(CustomMixin, SessionWizardView):
 
         return context
 
-    def done(self, form_list, form_dict):
-        tournament = form_dict["0"].cleaned_data["tournament"]
-
-        tournament.num_teams = form_dict["1"].cleaned_data["num_teams"]
-        tournament.num_novice_debaters = form_dict["1"].cleaned_data["num_novices"]
-
-        tournament.save()
-
-        update_otys = settings.CURRENT_SEASON == tournament.season
-
-        teams_to_update = []
-        speakers_to_update = []
-        novices_to_update = []
-
-        ## THIS DOESN'T DO INITIAL
-
-        for result in TeamResult.objects.filter(tournament=tournament).all():
-            teams_to_update += [result.team]
-
-            result.delete()
-
-        for result in SpeakerResult.objects.filter(tournament=tournament).all():
-            if result.type_of_place == Debater.VARSITY:
-                speakers_to_update += [result.debater]
-            else:
-                novices_to_update += [result.debater]
-            result.delete()
-
-        QUAL.objects.filter(tournament=tournament).delete()
-
-        ## VARSITY TEAM AWARDS ##
-        for i in range(len(form_dict["2"].cleaned_data)):
-            if (
-                "debater_one" not in form_dict["2"].cleaned_data[i]
-                or "debater_two" not in form_dict["2"].cleaned_data[i]
-            ):
-                continue
-
-            if (
-                not form_dict["2"].cleaned_data[i]["debater_one"]
-                or not form_dict["2"].cleaned_data[i]["debater_two"]
-            ):
-                continue
-
-            team = get_or_create_team_for_debaters(
-                form_dict["2"].cleaned_data[i]["debater_one"],
-                form_dict["2"].cleaned_data[i]["debater_two"],
-            )
-
-            if not team:
-                continue
-
-            place = i + 1
-            type_of_place = Debater.VARSITY
-            ghost_points = form_dict["2"].cleaned_data[i]["ghost_points"]
-
-            TeamResult.objects.create(
-                tournament=tournament,
-                team=team,
-                type_of_place=type_of_place,
-                place=place,
-                ghost_points=ghost_points,
-            )
-
-            teams_to_update += [team]
-
-        for i in range(len(form_dict["3"].cleaned_data)):
-            if "speaker" not in form_dict["3"].cleaned_data[i]:
-                continue
-
-            place = i + 1
-            type_of_place = Debater.VARSITY
-            speaker = form_dict["3"].cleaned_data[i]["speaker"]
-            tie = form_dict["3"].cleaned_data[i]["tie"]
-
-            if not speaker:
-                continue
-
-            SpeakerResult.objects.create(
-                tournament=tournament,
-                debater=speaker,
-                type_of_place=type_of_place,
-                place=place,
-                tie=tie,
-            )
-
-            speakers_to_update += [speaker]
-
-        for i in range(len(form_dict["4"].cleaned_data)):
-            if (
-                "debater_one" not in form_dict["4"].cleaned_data[i]
-                or "debater_two" not in form_dict["4"].cleaned_data[i]
-            ):
-                continue
-
-            if (
-                not form_dict["4"].cleaned_data[i]["debater_one"]
-                or not form_dict["4"].cleaned_data[i]["debater_two"]
-            ):
-                continue
+    def team_entries(self, form, type_of_place, placed=True):
+        rows = [
+            (i, data)
+            for i, data in enumerate(form.cleaned_data)
+            if data.get("debater_one") and data.get("debater_two")
+        ]
+        teams = get_or_create_teams(
+            [(data["debater_one"], data["debater_two"]) for _, data in rows]
+        )
 
-            team = get_or_create_team_for_debaters(
-                form_dict["4"].cleaned_data[i]["debater_one"],
-                form_dict["4"].cleaned_data[i]["debater_two"],
+        return [
+            (
+                team.id,
+                type_of_place,
+                i + 1 if placed else -1,
+                data.get("ghost_points", False),
             )
+            for (i, data), team in zip(rows, teams)
+        ]
 
-            if not team:
-                continue
-
-            place = i + 1
-            type_of_place = Debater.NOVICE
+    def speaker_entries(self, form, type_of_place):
+        return [
+            (data["speaker"].id, type_of_place, i + 1, data["tie"])
+            for i, data in enumerate(form.cleaned_data)
+            if data.get("speaker")
+        ]
 
-            TeamResult.objects.create(
-                tournament=tournament,
-                team=team,
-                type_of_place=type_of_place,
-                place=place,
+    def done(self, form_list, form_dict):
+        tournament = form_dict["0"].cleaned_data["tournament"]
+        dirty = DirtySet(tournament.season)
+
+        with transaction.atomic():
+            set_tournament_size(
+                tournament,
+                form_dict["1"].cleaned_data["num_teams"],
+                form_dict["1"].cleaned_data["num_novices"],
+                dirty,
             )
+            tournament.save()
 
-            teams_to_update += [team]
-
-        for i in range(len(form_dict["5"].cleaned_data)):
-            if "speaker" not in form_dict["5"].cleaned_data[i]:
-                continue
-
-            place = i + 1
-            type_of_place = Debater.NOVICE
-            speaker = form_dict["5"].cleaned_data[i]["speaker"]
-            tie = form_dict["5"].cleaned_data[i]["tie"]
-
-            if not speaker:
-                continue
-
-            SpeakerResult.objects.create(
-                tournament=tournament,
-                debater=speaker,
-                type_of_place=type_of_place,
-                place=place,
-                tie=tie,
+            team_results = (
+                self.team_entries(form_dict["2"], Debater.VARSITY)
+                + self.team_entries(form_dict["4"], Debater.NOVICE)
+                + self.team_entries(form_dict["6"], Debater.VARSITY, placed=False)
             )
-
-            novices_to_update += [speaker]
-
-        ## NON-PLACING TEAMS ##
-        for i in range(len(form_dict["6"].cleaned_data)):
-            if (
-                "debater_one" not in form_dict["6"].cleaned_data[i]
-                or "debater_two" not in form_dict["6"].cleaned_data[i]
-            ):
-                continue
-
-            if (
-                not form_dict["6"].cleaned_data[i]["debater_one"]
-                or not form_dict["6"].cleaned_data[i]["debater_two"]
-            ):
-                continue
-
-            team = get_or_create_team_for_debaters(
-                form_dict["6"].cleaned_data[i]["debater_one"],
-                form_dict["6"].cleaned_data[i]["debater_two"],
+            speaker_results = self.speaker_entries(
+                form_dict["3"], Debater.VARSITY
+            ) + self.speaker_entries(form_dict["5"], Debater.NOVICE)
+
+            # The engine only prunes stale quals in the current season, so
+            # this tournament's are dropped here; the recompute rebuilds them
+            # (and their COTY bonus) through the holders' teams
+            qual_debaters = list(
+                QUAL.objects.filter(tournament=tournament).values_list(
+                    "debater_id", flat=True
+                )
             )
+            QUAL.objects.filter(tournament=tournament).delete()
 
-            if not team:
-                continue
-
-            place = -1
-            type_of_place = Debater.VARSITY
+            sync_team_results(tournament, team_results, dirty)
+            sync_speaker_results(tournament, speaker_results, dirty)
 
-            TeamResult.objects.create(
-                tournament=tournament,
-                team=team,
-                type_of_place=type_of_place,
-                place=place,
+            dirty.add_teams(
+                Team.objects.filter(
+                    debaters__in=qual_debaters,
+                    team_results__tournament__season=tournament.season,
+                )
+                .values_list("id", flat=True)
+                .distinct()
             )
 
-            teams_to_update += [team]
-
-        teams_to_update = list(set(teams_to_update))
-        speakers_to_update = list(set(speakers_to_update))
-        novices_to_update = list(set(novices_to_update))
-
-        if update_otys:
-            for team in teams_to_update:
-                update_toty(team)
-                update_qual_points(team)
-                update_online_quals(team)
-            for debater in speakers_to_update:
-                update_soty(debater)
-            for debater in novices_to_update:
-                update_noty(debater)
-
-            redo_rankings(
-                TOTY.objects.filter(season=settings.CURRENT_SEASON),
-                season=settings.CURRENT_SEASON,
-                cache_type="toty",
-            )
-            redo_rankings(
-                SOTY.objects.filter(season=settings.CURRENT_SEASON),
-                season=settings.CURRENT_SEASON,
-                cache_type="soty",
-            )
-            redo_rankings(
-                NOTY.objects.filter(season=settings.CURRENT_SEASON),
-                season=settings.CURRENT_SEASON,
-                cache_type="noty",
-            )
-            redo_rankings(
-                COTY.objects.filter(season=settings.CURRENT_SEASON),
-                season=settings.CURRENT_SEASON,
-                cache_type="coty",
-            )
-            redo_rankings(
-                OnlineQUAL.objects.filter(season=settings.CURRENT_SEASON),
-                season=settings.CURRENT_SEASON,
-                cache_type="online_quals",
-            )
+        if settings.CURRENT_SEASON == tournament.season:
+            enqueue_recompute(dirty, tournament=tournament)
 
         return redirect("core:tournament_detail", pk=tournament.id)
@@ -3,25 +3,17 @@ from tqdm import tqdm
 
 from core.models import COTY, SOTY, TOTY, Debater, Team
 from core.utils.rankings import *
+from core.utils.standings import update_season_standings
 
 season = settings.CURRENT_SEASON
 
-for team in tqdm(Team.objects.all()):
-    print(f"Updating {team}")
-    update_toty(team)
+print("Updating TOTY, SOTY and NOTY")
+update_season_standings(season)
 
 for team in tqdm(Team.objects.all()):
     print(f"Updating {team}")
     update_qual_points(team)
 
-for debater in tqdm(Debater.objects.all()):
-    print(f"Updating {debater}")
-    update_soty(debater)
-
-for debater in tqdm(Debater.objects.all()):
-    print(f"Updating {debater}")
-    update_noty(debater)
-
 
 print("Ranking TOTY")
 redo_rankings(TOTY.objects.filter(season=season).all(), cache_type="toty")